@@ -1,6 +1,10 @@
-from flask import Blueprint, request, jsonify
-from domain.person import Person
-from domain.company import Company
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from domain.bulk_import import CompanyImport, PersonImport
+from domain.customer import CustomerType
+from domain.customer_directory import CustomerDirectory
+from domain.person import Person, PersonNameIndex
+from domain.company import Company, CompanyNameIndex
+from domain.order import Order
 
 # Create a Flask Blueprint for customer-related routes
 customer = Blueprint('customer', __name__)
@@ -52,8 +56,10 @@ def get_delete_private(id):
         - Returns the customer's data and a 200 status code.
 
     For DELETE requests:
-        - Deletes the private customer with the specified ID.
-        - Returns the deleted customer's ID and a 200 status code.
+        - Deletes the private customer with the specified ID, and its orders first
+          when the "cascade" query parameter is true.
+        - Returns the deleted customer's ID and a 200 status code, or an
+          error message and a 409 status code if orders still refer to it.
 
     Args:
         id (str): The unique identifier of the private customer.
@@ -72,8 +78,15 @@ def get_delete_private(id):
             person.find()
             return jsonify(person.to_dict()), 200  # OK
         case "DELETE":
-            # Delete the customer and return their ID
-            person.delete()
+            # Delete the orders of the customer first when cascading
+            if request.args.get("cascade", "").lower() == "true":
+                Order.delete_by_customer(id)
+
+            # Delete the customer and return their ID, unless orders refer to it
+            try:
+                person.delete()
+            except ValueError as error:
+                return jsonify({"error": str(error)}), 409  # Conflict
             return jsonify({"id": id}), 200  # OK
 
 
@@ -123,8 +136,10 @@ def get_delete_corporate(id):
         - Returns the customer's data and a 200 status code.
 
     For DELETE requests:
-        - Deletes the corporate customer with the specified ID.
-        - Returns the deleted customer's ID and a 200 status code.
+        - Deletes the corporate customer with the specified ID, and its orders first
+          when the "cascade" query parameter is true.
+        - Returns the deleted customer's ID and a 200 status code, or an
+          error message and a 409 status code if orders still refer to it.
 
     Args:
         id (str): The unique identifier of the corporate customer.
@@ -143,6 +158,107 @@ def get_delete_corporate(id):
             company.find()
             return jsonify(company.to_dict()), 200  # OK
         case "DELETE":
-            # Delete the customer and return their ID
-            company.delete()
+            # Delete the orders of the customer first when cascading
+            if request.args.get("cascade", "").lower() == "true":
+                Order.delete_by_customer(id)
+
+            # Delete the customer and return their ID, unless orders refer to it
+            try:
+                company.delete()
+            except ValueError as error:
+                return jsonify({"error": str(error)}), 409  # Conflict
             return jsonify({"id": id}), 200  # OK
+
+
+@customer.route("/search", methods=['GET'])
+def search():
+    """
+    Searches private and corporate customers by a part of their name.
+
+    Expects:
+        Query parameters:
+        - "q": A part of the name, possibly misspelled.
+        - "limit" (optional): The maximum number of results, 20 by default.
+
+    Returns:
+        Response: A JSON response with the matching customers, best match
+        first, and a 200 status code, or an error message with a 400 status
+        code.
+    """
+    query = request.args.get("q", "")
+    if query.strip() == "" or not request.args.get("limit", "20").isdigit():
+        return jsonify({"error": "Missing data"}), 400
+    limit = int(request.args.get("limit", "20"))
+
+    # Search both name indexes and merge the results by score
+    results = [
+        {"id": id, "type": customer_type.name, "name": name, "score": score}
+        for index_class, customer_type in ((PersonNameIndex, CustomerType.PRIVATE),
+                                           (CompanyNameIndex, CustomerType.COMPANY))
+        for id, name, score in index_class.get().search(query, limit)
+    ]
+    results.sort(key=lambda result: (-result["score"], len(result["name"])))
+
+    return jsonify(results[:limit]), 200
+
+
+@customer.route("/<id>", methods=['GET'])
+def get_any(id):
+    """
+    Retrieves a customer by ID, whether private or corporate.
+
+    Args:
+        id (str): The unique identifier of the customer.
+
+    Returns:
+        Response: A JSON response with the customer's type and data, without
+        any password, and a 200 status code, or an error message with a 404
+        status code.
+    """
+    # Resolve the type of the customer with the customer directory
+    customer = CustomerDirectory.find(id)
+    if customer is None:
+        return jsonify({"error": f"Customer with id {id} does not exist"}), 404
+
+    data = customer.to_dict()
+    data.pop("password", None)
+    data["type"] = customer.type.name
+    return jsonify(data), 200
+
+
+@customer.route("/private/bulk", methods=['POST'])
+def bulk_create_private():
+    """
+    Imports private customers from an NDJSON body, one JSON object per line.
+
+    Rows are validated, checked against the stored IDs and written in
+    batches. The body is read as it arrives, so uploads of any size are
+    imported in constant memory.
+
+    Returns:
+        Response: An NDJSON response with the result of each row, its line
+        number and the ID and status "created", or status "error" and the
+        error, streamed as the batches are written, and a 200 status code.
+    """
+    importer = PersonImport(is_user=False)
+    return Response(stream_with_context(importer.stream(request.stream)),
+                    mimetype="application/x-ndjson")
+
+
+@customer.route("/corporate/bulk", methods=['POST'])
+def bulk_create_corporate():
+    """
+    Imports corporate customers from an NDJSON body, one JSON object per line.
+
+    Rows are validated, checked against the stored IDs and written in
+    batches. The body is read as it arrives, so uploads of any size are
+    imported in constant memory.
+
+    Returns:
+        Response: An NDJSON response with the result of each row, its line
+        number and the ID and status "created", or status "error" and the
+        error, streamed as the batches are written, and a 200 status code.
+    """
+    importer = CompanyImport()
+    return Response(stream_with_context(importer.stream(request.stream)),
+                    mimetype="application/x-ndjson")
@@ -1,45 +1,65 @@
 from flask import Blueprint, request, jsonify
-import uuid
 from datetime import datetime
-from domain.order import Order, OrderStatus
+from domain.consolidation import ShipmentConsolidator
+from domain.customer_directory import CustomerDirectory
+from domain.order import Order, OrderStatus, OrderStatusIndex, OrderStatusLog
+from domain.pricing import PricingEngine
 from domain.vehicle import Vehicle
+from helpers.id_generator import IdGenerator
 
 # Create a Flask Blueprint for order-related routes
 order = Blueprint('order', __name__)
 
-def from_data_to_order(data: dict):
+def from_data_to_order(data: dict, allocate: bool = True):
     """
     Converts raw data into an Order object by initializing and setting its properties.
 
     Args:
         data (dict): A dictionary containing order details, such as items, weights, 
         and other relevant fields.
+        allocate (bool): Whether to assign a vehicle now, or leave the order
+        pending for the consolidation of its dispatch window.
 
     Returns:
         Order: A fully initialized Order object with total weight, order ID, 
         vehicle assignment, and status set.
 
+    Raises:
+        ValueError: If the customer doesn't exist, or an item of the order
+        is not in the catalog.
+
     Note:
         This function assigns the first available vehicle based on the number of items 
         and total weight of the order.
     """
-    # Generate a unique order ID (first 4 characters of a UUID)
-    data["id"] = str(uuid.uuid4())[:4]
+    # The customer can be a person or a company, found with one lookup
+    customer_id = data.get("customer_id")
+    if customer_id and CustomerDirectory.locate(customer_id) is None:
+        raise ValueError(f"[i] Customer with id {customer_id} not found")
+
+    # Generate a unique, time-ordered order ID
+    data["id"] = IdGenerator.new_id()
     data["total_weight"] = 0  # Initialize total weight
     data["vehicle_id"] = ""  # Initialize vehicle assignment
     data["order_status"] = OrderStatus.PROCESSING.value  # Set initial status
     data["order_date"] = datetime.today().strftime("%Y%m%d")  # Current date
 
+    # Calculate total weight of all items in the order
+    data["total_weight"], _ = PricingEngine.get().quote(data.get("items"))
+
     # Initialize the Order object
     order = Order()
     order.from_dict_to_self(data)
     
-    # Calculate total weight of all items in the order
-    order.total_weight = round(sum([item.weight for item in order.items]), 2)
-    
-    # Assign the first available vehicle based on items and weight
+    # Pending orders are allocated together by the consolidation stage
+    if not allocate:
+        return order
+
+    # Assign the first available vehicle based on items, weight and volume
     # Comment the following line to test shipment scenarios below.
-    order.vehicle = Vehicle().get_first_available(len(order.items), order.total_weight)
+    order.vehicle = Vehicle().get_first_available(
+        len(order.items), order.total_weight, order.get_total_volume()
+    )
 
 
     #### TESTS ####
@@ -57,23 +77,112 @@ def create():
     """
     Creates a new order from request data and adds it to the database.
 
+    When "defer_allocation" is true in the request data, the order is saved
+    without a vehicle and allocated later by POST /order/consolidate.
+
     Returns:
         Response: A JSON response containing the created order's details 
-        and a 201 status code.
+        and a 201 status code, or an error and a 500 status code when the
+        order could not be stored.
     """
     # Extract order data from the request body
     data = request.get_json()
 
     # Create and initialize an Order object
-    order = from_data_to_order(data)
+    defer_allocation = bool(data.pop("defer_allocation", False))
+    try:
+        order = from_data_to_order(data, allocate=not defer_allocation)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
 
-    # Add the order to the database
-    order.add()
+    # Add the order to the database, its generated ID is always new, and
+    # take its capacity from the assigned vehicle. A failed add reserves
+    # nothing, and a failed reservation removes the order again
+    if not order.place(skip_existence_check=True):
+        return jsonify({"error": f"Failed to add order with id {order.id}"}), 500
 
     # Return the order details in the response
     return jsonify(order.to_dict()), 201
 
 
+@order.route("/", methods=['GET'])
+def get_all():
+    """
+    Retrieves a list of orders with their customers and vehicles.
+
+    Expects:
+        An optional "ids" query parameter with comma separated order IDs.
+        All orders are returned when it is missing.
+
+    Returns:
+        Response: A JSON response containing the orders and a 200 status code.
+    """
+    # Load the requested orders and their relationships in bulk
+    ids = request.args.get("ids")
+    orders = Order.find_many(ids.split(",") if ids else None)
+
+    return jsonify([order.to_dict() for order in orders]), 200
+
+
+@order.route("/quote", methods=['POST'])
+def quote():
+    """
+    Computes the total weight and price of one order or a batch of orders.
+
+    Expects:
+        JSON data containing either:
+        - "items": The items of one order, as a list of item IDs, item IDs
+          mapped to quantities, or the encoded form of the order records.
+        - "orders": A list of such items, one entry per order.
+
+    Returns:
+        Response: A JSON response with the totals and a 200 status code,
+        or an error message with a 400 status code.
+    """
+    # Extract data from the request body
+    data = request.get_json()
+
+    try:
+        engine = PricingEngine.get()
+        if "orders" in data:
+            # Price the whole batch at once
+            total_weights, total_prices = engine.quote_many(data["orders"])
+            return jsonify([
+                {"total_weight": float(total_weight), "total_price": float(total_price)}
+                for total_weight, total_price in zip(total_weights, total_prices)
+            ]), 200
+        if "items" in data:
+            total_weight, total_price = engine.quote(data["items"])
+            return jsonify({"total_weight": total_weight,
+                            "total_price": total_price}), 200
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    return jsonify({"error": "Missing data"}), 400
+
+
+@order.route("/consolidate", methods=['POST'])
+def consolidate():
+    """
+    Allocates the pending orders grouped by delivery city and date.
+
+    Expects:
+        Optional JSON data containing:
+        - "delivery_date": Only consolidate orders for this date (yyyymmdd).
+
+    Returns:
+        Response: A JSON response with a summary per delivery group and a
+        200 status code.
+    """
+    # Extract the optional dispatch window from the request body
+    data = request.get_json(silent=True) or {}
+
+    # Allocate each group of pending orders to as few vehicles as possible
+    summaries = ShipmentConsolidator().consolidate(data.get("delivery_date"))
+
+    return jsonify(summaries), 200
+
+
 @order.route("/status", methods=['PUT'])
 def put_status():
     """
@@ -86,7 +195,8 @@ def put_status():
 
     Returns:
         Response: A JSON response with the updated order details and a 
-        200 status code, or an error message with a 400 or 404 status code.
+        200 status code, or an error message with a 400, 404 or 500 status
+        code.
     """
     # Extract data from the request body
     data = request.get_json()
@@ -103,19 +213,39 @@ def put_status():
         # Return an error if the order does not exist
         return jsonify({"error": f"Order with id {data['order_id']} does not exist"}), 404
 
-    # Update the order status and save changes
-    order.order_status = OrderStatus(data["order_status"])
-    order.update()
+    # Update the order status, save changes and adjust the vehicle capacity
+    if not order.change_status(OrderStatus(data["order_status"])):
+        return jsonify({"error": f"Failed to update order with id {order.id}"}), 500
 
     # Return the updated order details
     return jsonify(order.to_dict()), 200
 
 
+@order.route("/status/times", methods=['GET'])
+def get_status_times():
+    """
+    Retrieves the total time the orders have spent in each status.
+
+    The totals are kept up to date by the order status log, the orders are
+    not read.
+
+    Returns:
+        Response: A JSON response with the seconds spent in each status and
+        a 200 status code.
+    """
+    time_in_status = OrderStatusLog.get().get_time_in_status()
+    return jsonify({order_status.name: round(milliseconds / 1000, 3)
+                    for order_status, milliseconds in time_in_status.items()}), 200
+
+
 @order.route("/status/<id>", methods=['GET'])
 def get_status(id):
     """
     Retrieves the status of an order by its ID.
 
+    Only the status log and the status index of the orders are read, the
+    order itself is not loaded.
+
     Args:
         id (str): The unique identifier of the order.
 
@@ -124,13 +254,35 @@ def get_status(id):
         a 200 status code, or an error message with a 404 status code 
         if the order does not exist.
     """
-    # Initialize an Order object and check its existence
-    order = Order(id)
-    order_exists = order.find()
+    # Look up the status without loading the order
+    order_status = OrderStatusIndex.get().get_status(id)
 
-    if not order_exists:
+    if order_status is None:
         # Return an error if the order does not exist
         return jsonify({"error": f"Order with id {id} does not exist"}), 404
 
     # Return the order's status in the response
-    return jsonify({"order_status": order.order_status.name}), 200
+    return jsonify({"order_status": order_status.name}), 200
+
+
+@order.route("/<id>", methods=['DELETE'])
+def delete(id):
+    """
+    Deletes an order, giving its capacity back to its vehicle if it is open.
+
+    Args:
+        id (str): The unique identifier of the order.
+
+    Returns:
+        Response: A JSON response containing the deleted order's ID and a
+        200 status code, or an error message with a 404 status code if the
+        order does not exist, or a 500 status code if it was not deleted.
+    """
+    # Load the order to know its vehicle and load
+    order = Order(id)
+    if not order.find():
+        return jsonify({"error": f"Order with id {id} does not exist"}), 404
+
+    if not order.delete():
+        return jsonify({"error": f"Failed to delete order with id {id}"}), 500
+    return jsonify({"id": id}), 200
@@ -1,5 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from domain.bulk_import import PersonImport
+from domain.company import Company
+from domain.order import Order
 from domain.person import Person
+from domain.session import SessionStore
 
 # Create a Flask Blueprint for user-related routes
 user = Blueprint('user', __name__)
@@ -51,8 +55,10 @@ def get_delete(id):
         - Returns the user's data and a 200 status code.
 
     For DELETE requests:
-        - Deletes the user with the specified ID.
-        - Returns the deleted user's ID and a 200 status code.
+        - Deletes the user with the specified ID, and its orders first
+          when the "cascade" query parameter is true.
+        - Returns the deleted user's ID and a 200 status code, or an
+          error message and a 409 status code if orders still refer to it.
 
     Args:
         id (str): The unique identifier of the user.
@@ -71,6 +77,149 @@ def get_delete(id):
             person.find()
             return jsonify(person.to_dict()), 200  # OK
         case "DELETE":
-            # Delete the user and return their ID
-            person.delete()
+            # Delete the orders of the user first when cascading
+            if request.args.get("cascade", "").lower() == "true":
+                Order.delete_by_customer(id)
+
+            # Delete the user and return their ID, unless orders refer to it
+            try:
+                person.delete()
+            except ValueError as error:
+                return jsonify({"error": str(error)}), 409  # Conflict
             return jsonify({"id": id}), 200  # OK
+
+
+@user.route("/<id>/companies", methods=['GET'])
+def get_companies(id):
+    """
+    Retrieves the companies a user is related to.
+
+    Args:
+        id (str): The unique identifier of the user.
+
+    Returns:
+        Response: A JSON response with the IDs of the companies and a 200
+        status code.
+    """
+    # Look the companies up in the reverse index of the related users
+    return jsonify({"id": id,
+                    "company_ids": Company.find_company_ids_by_user(id)}), 200
+
+
+def get_session_token() -> str:
+    """
+    Reads the session token of the request.
+
+    Returns:
+        str: The token of the "Authorization: Bearer <token>" header, or None.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or token == "":
+        return None
+    return token.strip()
+
+
+def to_public_dict(person: Person) -> dict:
+    """
+    Converts a user to a dictionary without the password.
+
+    Args:
+        person (Person): The user.
+
+    Returns:
+        dict: The user data.
+    """
+    data = person.to_dict()
+    data.pop("password")
+    return data
+
+
+@user.route("/login", methods=['POST'])
+def login():
+    """
+    Logs a user in and starts a session.
+
+    Expects:
+        JSON data containing:
+        - "id" or "email": The personal number or the email of the user.
+        - "password": The password of the user.
+
+    Returns:
+        Response: A JSON response with the session token, its lifetime in
+        seconds and the user, and a 200 status code, or an error message
+        with a 400 or 401 status code.
+    """
+    data = request.get_json()
+    identifier = data.get("id") or data.get("email")
+    if not identifier or "password" not in data:
+        return jsonify({"error": "Missing data"}), 400
+
+    # Find the user in the person index, without reading the table
+    person = Person.authenticate(identifier, data["password"])
+    if person is None:
+        return jsonify({"error": "Wrong user name or password"}), 401
+
+    session_store = SessionStore.get()
+    return jsonify({
+        "token": session_store.create(person),
+        "expires_in": session_store.ttl,
+        "user": to_public_dict(person),
+    }), 200
+
+
+@user.route("/me", methods=['GET'])
+def me():
+    """
+    Retrieves the user of the session of the request.
+
+    Expects:
+        An "Authorization: Bearer <token>" header with a session token.
+
+    Returns:
+        Response: A JSON response with the user and a 200 status code, or an
+        error message with a 401 status code.
+    """
+    token = get_session_token()
+    person = SessionStore.get().resolve(token) if token else None
+    if person is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    return jsonify(to_public_dict(person)), 200
+
+
+@user.route("/logout", methods=['POST'])
+def logout():
+    """
+    Ends the session of the request.
+
+    Expects:
+        An "Authorization: Bearer <token>" header with a session token.
+
+    Returns:
+        Response: An empty JSON response with a 200 status code, or an error
+        message with a 401 status code.
+    """
+    token = get_session_token()
+    if token is None or not SessionStore.get().revoke(token):
+        return jsonify({"error": "Not logged in"}), 401
+
+    return jsonify({}), 200
+
+
+@user.route("/bulk", methods=['POST'])
+def bulk_create():
+    """
+    Imports users from an NDJSON body, one JSON object per line.
+
+    Rows are validated, checked against the stored IDs and written in
+    batches. The body is read as it arrives, so uploads of any size are
+    imported in constant memory.
+
+    Returns:
+        Response: An NDJSON response with the result of each row, its line
+        number and the ID and status "created", or status "error" and the
+        error, streamed as the batches are written, and a 200 status code.
+    """
+    importer = PersonImport(is_user=True)
+    return Response(stream_with_context(importer.stream(request.stream)),
+                    mimetype="application/x-ndjson")
@@ -1,8 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from domain.bulk_import import VehicleImport
 from domain.bike import Bike
 from domain.truck import Truck
 from domain.ship import Ship
-from domain.location import LocationList
+from domain.location import LocationRegistry
+from domain.vehicle import Vehicle
 
 # Create a Flask Blueprint for vehicle-related routes
 vehicle = Blueprint('vehicle', __name__)
@@ -49,7 +51,7 @@ def create_update(type):
 
     # Set the vehicle's ID and current position
     vehicle.id = data['id']
-    vehicle.current_position = LocationList().get_city_by_name(
+    vehicle.current_position = LocationRegistry.get().find(
         data['current_position']
     )
 
@@ -65,6 +67,37 @@ def create_update(type):
             return jsonify(vehicle.to_dict()), 200  # OK
 
 
+@vehicle.route("/nearest", methods=['GET'])
+def nearest():
+    """
+    Finds the nearest free vehicles with room for a load.
+
+    The query string gives the "city", the number of vehicles "k" (default
+    1), and the load: "number_of_items", "weight" and "volume" (default 0).
+
+    Returns:
+        Response: A JSON response with the list of vehicles, their "id" and
+        "distance" in km, nearest first, and a 200 status code, or an
+        error message with a 400 status code if the city is not known or
+        a number is invalid.
+    """
+    location = LocationRegistry.get().find(request.args.get("city"))
+    if location is None:
+        return {"error": f"City {request.args.get('city')} does not exist"}, 400
+
+    try:
+        k = int(request.args.get("k", 1))
+        number_of_items = int(request.args.get("number_of_items", 0))
+        weight = float(request.args.get("weight", 0))
+        volume = float(request.args.get("volume", 0))
+    except ValueError:
+        return {"error": "k, number_of_items, weight and volume must be numbers"}, 400
+
+    vehicles = Vehicle.find_nearest_free(location, k, number_of_items, weight, volume)
+    return jsonify([{"id": id, "distance": round(distance, 3)}
+                    for id, distance in vehicles]), 200  # OK
+
+
 @vehicle.route("/<type>/<id>", methods=['GET'])
 def get(type, id):
     """
@@ -101,3 +134,25 @@ def get(type, id):
             # Find the vehicle and return its data
             vehicle.find()
             return jsonify(vehicle.to_dict()), 200  # OK
+
+
+@vehicle.route("/bulk", methods=['POST'])
+def bulk_create():
+    """
+    Imports vehicles of any type from an NDJSON body, one JSON object per line.
+
+    The "type" field of each row is bike, ship or truck, and
+    "current_position" is a city name.
+
+    Rows are validated, checked against the stored IDs and written in
+    batches. The body is read as it arrives, so uploads of any size are
+    imported in constant memory.
+
+    Returns:
+        Response: An NDJSON response with the result of each row, its line
+        number and the ID and status "created", or status "error" and the
+        error, streamed as the batches are written, and a 200 status code.
+    """
+    importer = VehicleImport()
+    return Response(stream_with_context(importer.stream(request.stream)),
+                    mimetype="application/x-ndjson")
@@ -1,5 +1,7 @@
 import csv
+import os
 import os.path
+import threading
 
 class Database:
     """
@@ -9,8 +11,13 @@ class Database:
         path (str): The path to the CSV file.
         dictionary (dict): Data structure to hold record data.
         object_name (str): Name of the object being managed in the database.
+        locks (dict): The lock of each table, by absolute path, held while a
+            record is read and written back.
     """
 
+    locks = {}
+    locks_lock = threading.Lock()
+
     def __init__(self, path: str = None, dictionary: dict = None, 
                  object_name: str = None):
         """
@@ -27,9 +34,16 @@ class Database:
         if not file_exists:
             self.create_database()
 
-    def add(self):
+    def add(self, skip_existence_check: bool = False) -> bool:
         """
         Adds a new record to the database if it doesn't already exist.
+
+        Args:
+            skip_existence_check (bool): Append without scanning the file for
+                the ID, for records with an ID that is unique by construction.
+
+        Returns:
+            bool: True if the record was added.
         
         Raises:
             ValueError: If the record ID already exists in the database.
@@ -40,7 +54,9 @@ class Database:
             record_id = record_values[0]
             if self.is_valid_database():
                 # Check if a record with the same ID already exists
-                existing_record = self.find_by_id(record_values[0])
+                existing_record = None
+                if not skip_existence_check:
+                    existing_record = self.find_by_id(record_values[0])
 
                 if existing_record:
                     raise ValueError(
@@ -53,9 +69,38 @@ class Database:
                     csv_writer = csv.DictWriter(my_csv, delimiter=',', 
                                                 fieldnames=fieldnames)
                     csv_writer.writerow(self.dictionary)
+                return True
         except Exception as error:
             print(f"[i] Failed to add {self.object_name.lower()} with id: "
                   f"{record_id}. \n{error}")
+        return False
+
+    def add_many(self, records: list) -> int:
+        """
+        Appends several new records at once, without checking their IDs.
+
+        The records are deduplicated by the caller, usually against an index
+        of the table.
+
+        Args:
+            records (list): The record dictionaries, keyed like the
+                dictionary of the database.
+
+        Returns:
+            int: The number of records added.
+        """
+        try:
+            if self.is_valid_database():
+                # Append every record with a single open of the file
+                with open(self.path, mode='a', newline='') as my_csv:
+                    csv_writer = csv.DictWriter(my_csv, delimiter=',',
+                                                fieldnames=self.dictionary.keys())
+                    csv_writer.writerows(records)
+                return len(records)
+        except Exception as error:
+            print(f"[i] Failed to add {len(records)} "
+                  f"{self.object_name.lower()} records. \n{error}")
+        return 0
 
     def create_database(self):
         """
@@ -84,29 +129,60 @@ class Database:
             # Retrieve record ID for deletion
             record_values = list(self.dictionary.values())
             record_id = record_values[0]
-            if self.is_valid_database():
-                content = list()  # Store all records except the deleted one
-                record_found = False
+            with self.get_lock():
+                if self.is_valid_database():
+                    content = list()  # Store all records except the deleted one
+                    record_found = False
+
+                    # Read records and identify target for deletion
+                    with open(self.path, mode='r') as csv_file:
+                        csv_reader = csv.reader(csv_file, delimiter=',')
+                        for row in csv_reader:
+                            if row[0] == record_id:
+                                record_found = True
+                            else:
+                                content.append(row)
+
+                    # Save updated content without the deleted record
+                    if record_found:
+                        self.save_content(content)
+                        print(f"[i] Successfully deleted {self.object_name.lower()} "
+                              f"with id {record_id}")
+                        return True
+                    else:
+                        print(f"[i] {self.object_name} with id {record_id} not found")
+        except Exception as error:
+            print(f"[i] Failed to delete {self.object_name.lower()} with id: "
+                  f"{record_id}. \n{error}")
+        return False
 
-                # Read records and identify target for deletion
+    def delete_many(self, ids: list) -> int:
+        """
+        Deletes several records with a single rewrite of the file.
+
+        Args:
+            ids (list): The IDs of the records.
+
+        Returns:
+            int: The number of records deleted.
+        """
+        ids = {str(id) for id in ids}
+        deleted = 0
+        with self.get_lock():
+            if len(ids) > 0 and self.is_valid_database():
+                content = list()  # Store all records except the deleted ones
                 with open(self.path, mode='r') as csv_file:
                     csv_reader = csv.reader(csv_file, delimiter=',')
+                    content.append(next(csv_reader))  # Keep the header row
                     for row in csv_reader:
-                        if row[0] == record_id:
-                            record_found = True
+                        if row[0] in ids:
+                            deleted += 1
                         else:
                             content.append(row)
 
-                # Save updated content without the deleted record
-                if record_found:
+                if deleted > 0:
                     self.save_content(content)
-                    print(f"[i] Successfully deleted {self.object_name.lower()} "
-                          f"with id {record_id}")
-                else:
-                    print(f"[i] {self.object_name} with id {record_id} not found")
-        except Exception as error:
-            print(f"[i] Failed to delete {self.object_name.lower()} with id: "
-                  f"{record_id}. \n{error}")
+        return deleted
 
     def find_by_id(self, id: str) -> dict:
         """
@@ -138,6 +214,25 @@ class Database:
 
         return None
 
+    def find_by_ids(self, ids) -> dict:
+        """
+        Finds several records by their IDs in a single pass over the file.
+
+        Args:
+            ids (iterable): The IDs to search for.
+
+        Returns:
+            dict: The found IDs mapped to their record data.
+        """
+        ids = set(ids)
+        response = {}
+        if len(ids) > 0:
+            id_field = next(iter(self.dictionary))  # The ID is the first field
+            for record in self.iter_records():
+                if record[id_field] in ids:
+                    response[record[id_field]] = record
+        return response
+
     def find_by_field_name(self, field: str, value: str) -> list:
         """
         Finds records by a specified field and value.
@@ -169,6 +264,21 @@ class Database:
 
         return None
 
+    def iter_records(self):
+        """
+        Streams the records of the database one at a time.
+
+        Yields:
+            dict: The record data mapped to the dictionary keys.
+        """
+        if self.is_valid_database():
+            headers = list(self.dictionary.keys())
+            with open(self.path, 'r') as my_file:
+                csv_reader = csv.reader(my_file, delimiter=',')
+                next(csv_reader)  # Skip the header row
+                for row in csv_reader:
+                    yield dict(zip(headers, row))
+
     def update(self) -> bool:
         """
         Updates an existing record with new values.
@@ -179,30 +289,136 @@ class Database:
         record_new_values = list(self.dictionary.values())
         record_id = record_new_values[0]
         try:
-            if self.is_valid_database():
-                content = list()
-                record_found = False
+            with self.get_lock():
+                if self.is_valid_database():
+                    content = list()
+                    record_found = False
+
+                    # Identify and replace record with new values
+                    with open(self.path, mode='r') as csv_file:
+                        csv_reader = csv.reader(csv_file, delimiter=',')
+                        for existing_record_values in csv_reader:
+                            if existing_record_values[0] == record_new_values[0]:
+                                record_found = True
+                                content.append(record_new_values)
+                            else:
+                                content.append(existing_record_values)
+
+                    # Save updated records back to file
+                    if record_found:
+                        self.save_content(content)
+                        print(f"[i] {self.object_name} with id: {record_id} "
+                              "successfully updated")
+                        return True
+                    else:
+                        print(f"[i] {self.object_name} with id {record_id} not found")
+        except:
+            print(f"[i] Failed to update {self.object_name.lower()} with id: "
+                  f"{record_id}")
+        return False
+
+    def update_many(self, records: list) -> int:
+        """
+        Updates several existing records with a single rewrite of the file.
 
-                # Identify and replace record with new values
+        Args:
+            records (list): The new record dictionaries, keyed like the
+                dictionary of the database.
+
+        Returns:
+            int: The number of records updated.
+        """
+        new_values = {
+            str(record[next(iter(record))]): list(record.values())
+            for record in records
+        }
+        updated = 0
+        with self.get_lock():
+            if len(new_values) > 0 and self.is_valid_database():
+                content = list()
                 with open(self.path, mode='r') as csv_file:
                     csv_reader = csv.reader(csv_file, delimiter=',')
+                    content.append(next(csv_reader))  # Keep the header row
                     for existing_record_values in csv_reader:
-                        if existing_record_values[0] == record_new_values[0]:
-                            record_found = True
-                            content.append(record_new_values)
+                        record_values = new_values.get(existing_record_values[0])
+                        if record_values is not None:
+                            updated += 1
+                            content.append(record_values)
                         else:
                             content.append(existing_record_values)
 
-                # Save updated records back to file
-                if record_found:
+                if updated > 0:
                     self.save_content(content)
-                    print(f"[i] {self.object_name} with id: {record_id} "
-                          "successfully updated")
-                else:
-                    print(f"[i] {self.object_name} with id {record_id} not found")
-        except:
-            print(f"[i] Failed to update {self.object_name.lower()} with id: "
-                  f"{record_id}")
+        return updated
+
+    def adjust(self, id: str, deltas: dict, maximums: dict = None) -> dict:
+        """
+        Adds amounts to numeric fields of a stored record.
+
+        The amounts are added to the values read from the file while the
+        lock of the table is held, so adjustments made at the same time
+        through other copies of the record are never lost.
+
+        Args:
+            id (str): The ID of the record.
+            deltas (dict): Field names mapped to the amount to add.
+            maximums (dict, optional): Field names mapped to a value the
+                field never grows above.
+
+        Returns:
+            dict: The record as stored after the change, or None if it was
+            not found or could not be saved.
+        """
+        try:
+            with self.get_lock():
+                record = self.find_by_id(str(id))
+                if record is None:
+                    print(f"[i] {self.object_name} with id {id} not found")
+                    return None
+
+                record = Database.apply_deltas(record, deltas, maximums)
+                if self.update_many([record]) > 0:
+                    return record
+        except Exception as error:
+            print(f"[i] Failed to adjust {self.object_name.lower()} with id: "
+                  f"{id}. \n{error}")
+        return None
+
+    def get_lock(self) -> threading.RLock:
+        """
+        Gets the lock of the table, shared by every database on its file.
+
+        Returns:
+            threading.RLock: The lock of the table.
+        """
+        path = os.path.abspath(self.path)
+        with Database.locks_lock:
+            return Database.locks.setdefault(path, threading.RLock())
+
+    @staticmethod
+    def apply_deltas(record: dict, deltas: dict, maximums: dict = None) -> dict:
+        """
+        Adds amounts to numeric fields of a record.
+
+        Args:
+            record (dict): The record, with numbers or numeric strings.
+            deltas (dict): Field names mapped to the amount to add.
+            maximums (dict, optional): Field names mapped to a value the
+                field never grows above.
+
+        Returns:
+            dict: A copy of the record with the new values. Whole numbers
+            stay whole, others are rounded to 2 decimals.
+        """
+        record = dict(record)
+        for field, delta in deltas.items():
+            value = str(record[field]).strip()
+            value = int(value) if value.lstrip("-").isdigit() else float(value)
+            value = round(value + delta, 2)
+            if maximums is not None and field in maximums:
+                value = min(value, maximums[field])
+            record[field] = value
+        return record
 
     def get_existing_field_names(self) -> list:
         """
@@ -234,10 +450,13 @@ class Database:
         Returns:
             bool: True if save is successful.
         """
-        # Write updated content to the CSV file
-        with open(self.path, mode='w', newline="") as csv_file:
+        # Write to a temporary file first and swap it in, so readers never
+        # see a partially written file
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, mode='w', newline="") as csv_file:
             csv_writer = csv.writer(csv_file, delimiter=',')
             csv_writer.writerows(content)
+        os.replace(temporary_path, self.path)
 
         return True
 
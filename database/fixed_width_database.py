@@ -0,0 +1,441 @@
+import csv
+import mmap
+import os
+from database.database import Database
+from database.index import TableIndex
+
+
+class RecordSlots(TableIndex):
+    """
+    The row number of every record of a fixed-width table, by ID.
+    """
+
+    COLUMNS = ("id",)
+
+    def clear(self) -> None:
+        self.rows = {}
+
+    def add_record(self, record: dict) -> None:
+        # Records keep their row, new ones go after the last row
+        self.rows.setdefault(str(record['id']), len(self.rows))
+
+
+class FixedWidthDatabase(Database):
+    """
+    A CSV database where every field is padded to a fixed width.
+
+    Every line of the file, the header included, has the same length, so a
+    record starts at a known offset and a field at a known position in the
+    record. Updates are written in place through mmap, without rewriting
+    the file. The file stays a valid CSV file, with padded values.
+
+    A file in another layout, a plain CSV file or one written with other
+    widths, is rewritten once to the layout when it is opened.
+
+    Attributes:
+        widths (dict): The width of each field.
+        record_length (int): The length of a line, end of line included.
+    """
+
+    def __init__(self, path: str = None, dictionary: dict = None,
+                 object_name: str = None, widths: dict = None):
+        """
+        Initializes the database and converts the file to the layout if
+        needed.
+
+        Args:
+            path (str): The path to the CSV file.
+            dictionary (dict): The record data.
+            object_name (str): Name of the object managed in the database.
+            widths (dict): The width of each field of the dictionary. Fields
+                are at least as wide as their name.
+        """
+        self.widths = {name: max(len(name), widths[name]) for name in dictionary}
+        self.record_length = sum(self.widths.values()) + len(self.widths)
+        super().__init__(path, dictionary, object_name)
+
+        if not self.has_layout():
+            self.convert()
+
+    def has_layout(self) -> bool:
+        """
+        Checks if the file is written with the widths of the database.
+
+        Returns:
+            bool: True if the header of the file has the expected line.
+        """
+        with open(self.path, mode='rb') as csv_file:
+            header = csv_file.readline()
+        return header == self.encode_row(list(self.dictionary.keys()))
+
+    def convert(self) -> None:
+        """
+        Rewrites the file in the fixed-width layout, keeping its records.
+        """
+        content = [list(self.dictionary.keys())]
+        with open(self.path, mode='r') as csv_file:
+            csv_reader = csv.DictReader(csv_file, delimiter=',')
+            csv_reader.fieldnames = [name.strip()
+                                     for name in csv_reader.fieldnames or []]
+            for record in csv_reader:
+                content.append([(record.get(name) or "").strip()
+                                for name in self.dictionary])
+        self.save_content(content)
+        print(f"[i] {self.object_name} database converted to fixed width")
+
+    def encode_row(self, values: list) -> bytes:
+        """
+        Pads the values of a row to the widths of their fields.
+
+        Args:
+            values (list): The values, in the order of the fields.
+
+        Returns:
+            bytes: The line of the row.
+
+        Raises:
+            ValueError: If a value does not fit in its field.
+        """
+        fields = [self.encode_field(name, value)
+                  for name, value in zip(self.widths, values)]
+        return b",".join(fields) + b"\n"
+
+    def encode_field(self, name: str, value) -> bytes:
+        """
+        Pads a value to the width of its field.
+
+        Args:
+            name (str): The name of the field.
+            value: The value.
+
+        Returns:
+            bytes: The padded value. Widths are in bytes, so the offsets
+            hold for any text.
+
+        Raises:
+            ValueError: If the value does not fit in the field.
+        """
+        text = "" if value is None else str(value)
+        encoded = text.encode()
+        if len(encoded) > self.widths[name] or "," in text or "\n" in text:
+            raise ValueError(f"[i] Value {text} does not fit in field {name}")
+        return encoded.ljust(self.widths[name])
+
+    def create_database(self):
+        """
+        Creates a new database with the padded header.
+
+        Returns:
+            bool: True if the database is created successfully.
+        """
+        if self.is_valid_path_and_dictionary():
+            with open(self.path, mode='wb') as csv_file:
+                csv_file.write(self.encode_row(list(self.dictionary.keys())))
+            return True
+
+    def get_rows(self) -> dict:
+        """
+        Gets the row number of every record, up to date with the file.
+
+        Returns:
+            dict: Record IDs mapped to their row number.
+        """
+        return RecordSlots.get(self.path).rows
+
+    def add(self, skip_existence_check: bool = False) -> bool:
+        """
+        Appends a new record if its ID doesn't exist yet. The existence check
+        is a lookup in the row numbers instead of a scan.
+
+        Args:
+            skip_existence_check (bool): Append without looking up the ID.
+
+        Returns:
+            bool: True if the record was added.
+        """
+        record_id = str(next(iter(self.dictionary.values())))
+        try:
+            if not skip_existence_check and record_id in self.get_rows():
+                raise ValueError(
+                    f"[i] {self.object_name} with id {record_id} already exists"
+                )
+
+            line = self.encode_row(list(self.dictionary.values()))
+
+            def append() -> bool:
+                with open(self.path, mode='ab') as csv_file:
+                    csv_file.write(line)
+                return True
+
+            return RecordSlots.write(self.dictionary, append, self.path)
+        except Exception as error:
+            print(f"[i] Failed to add {self.object_name.lower()} with id: "
+                  f"{record_id}. \n{error}")
+        return False
+
+    def add_many(self, records: list) -> int:
+        """
+        Appends several new records at once, without checking their IDs.
+
+        Args:
+            records (list): The record dictionaries, keyed like the
+                dictionary of the database.
+
+        Returns:
+            int: The number of records added.
+        """
+        try:
+            lines = b"".join(self.encode_row(list(record.values()))
+                             for record in records)
+
+            def append() -> int:
+                with open(self.path, mode='ab') as csv_file:
+                    csv_file.write(lines)
+                return len(records)
+
+            return RecordSlots.write_many(records, append, self.path)
+        except Exception as error:
+            print(f"[i] Failed to add {len(records)} "
+                  f"{self.object_name.lower()} records. \n{error}")
+        return 0
+
+    def delete(self) -> bool:
+        """
+        Deletes a record by rewriting the file without it.
+
+        Returns:
+            bool: True if deletion is successful, False otherwise.
+        """
+        record_id = str(next(iter(self.dictionary.values())))
+        try:
+            if record_id not in self.get_rows():
+                print(f"[i] {self.object_name} with id {record_id} not found")
+                return False
+
+            content = [list(self.dictionary.keys())]
+            content += [list(record.values()) for record in self.iter_records()
+                        if record[next(iter(record))] != record_id]
+            self.save_content(content)
+            print(f"[i] Successfully deleted {self.object_name.lower()} "
+                  f"with id {record_id}")
+            return True
+        except Exception as error:
+            print(f"[i] Failed to delete {self.object_name.lower()} with id: "
+                  f"{record_id}. \n{error}")
+        return False
+
+    def delete_many(self, ids: list) -> int:
+        """
+        Deletes several records by rewriting the file once without them.
+
+        Args:
+            ids (list): The IDs of the records.
+
+        Returns:
+            int: The number of records deleted.
+        """
+        ids = {str(id) for id in ids}
+        with self.get_lock():
+            deleted = len(ids & set(self.get_rows()))
+            if deleted > 0:
+                content = [list(self.dictionary.keys())]
+                content += [list(record.values()) for record in self.iter_records()
+                            if record[next(iter(record))] not in ids]
+                self.save_content(content)
+        return deleted
+
+    def convert_to_csv(self) -> None:
+        """
+        Rewrites the file as a plain CSV file, to stop using the layout.
+        """
+        content = [list(self.dictionary.keys())]
+        content += [list(record.values()) for record in self.iter_records()]
+        Database.save_content(self, content)
+
+    def read_row(self, row: int) -> list:
+        """
+        Reads one record by its row number.
+
+        Args:
+            row (int): The row number of the record.
+
+        Returns:
+            list: The stripped values of the record.
+        """
+        with open(self.path, mode='rb') as csv_file:
+            csv_file.seek((row + 1) * self.record_length)
+            line = csv_file.read(self.record_length)
+        return [value.decode().strip() for value in line[:-1].split(b",")]
+
+    def find_by_id(self, id: str) -> dict:
+        """
+        Finds a record by its ID, reading only its line.
+
+        Args:
+            id (str): The ID to search for.
+
+        Returns:
+            dict: The record data if found, None otherwise.
+        """
+        row = self.get_rows().get(str(id))
+        if row is None:
+            return None
+        return dict(zip(self.dictionary.keys(), self.read_row(row)))
+
+    def find_by_field_name(self, field: str, value: str) -> list:
+        """
+        Finds records by a specified field and value.
+
+        Args:
+            field (str): The field name to search within.
+            value (str): The value to match.
+
+        Returns:
+            list: Records that match the field and value.
+        """
+        rows = super().find_by_field_name(field, value)
+        return [[value.strip() for value in row] for row in rows]
+
+    def iter_records(self):
+        """
+        Streams the records of the database one at a time.
+
+        Yields:
+            dict: The record data, with stripped values.
+        """
+        for record in super().iter_records():
+            yield {name: value.strip() for name, value in record.items()}
+
+    def write_in_place(self, records: list) -> int:
+        """
+        Writes existing records over their lines, through mmap.
+
+        Args:
+            records (list): The new values of each record, ID first.
+
+        Returns:
+            int: The number of records written.
+        """
+        rows = self.get_rows()
+        lines = [(rows[str(values[0])], self.encode_row(values))
+                 for values in records if str(values[0]) in rows]
+        if len(lines) == 0:
+            return 0
+
+        with open(self.path, mode='r+b') as csv_file, \
+             mmap.mmap(csv_file.fileno(), 0) as mapped_file:
+            for row, line in lines:
+                offset = (row + 1) * self.record_length
+                mapped_file[offset:offset + self.record_length] = line
+            mapped_file.flush()
+        os.utime(self.path)  # Let readers of the file see the change
+        return len(lines)
+
+    def update(self) -> bool:
+        """
+        Updates an existing record in place.
+
+        Returns:
+            bool: True if the update is successful, False otherwise.
+        """
+        record_id = next(iter(self.dictionary.values()))
+        try:
+            values = list(self.dictionary.values())
+            with self.get_lock():
+                written = RecordSlots.write(self.dictionary,
+                                            lambda: self.write_in_place([values]),
+                                            self.path)
+            if written:
+                print(f"[i] {self.object_name} with id: {record_id} "
+                      "successfully updated")
+                return True
+            print(f"[i] {self.object_name} with id {record_id} not found")
+        except Exception as error:
+            print(f"[i] Failed to update {self.object_name.lower()} with id: "
+                  f"{record_id}. \n{error}")
+        return False
+
+    def update_many(self, records: list) -> int:
+        """
+        Updates several existing records in place.
+
+        Args:
+            records (list): The new record dictionaries, keyed like the
+                dictionary of the database.
+
+        Returns:
+            int: The number of records updated.
+        """
+        values = [list(record.values()) for record in records]
+        with self.get_lock():
+            return RecordSlots.write_many(records,
+                                          lambda: self.write_in_place(values),
+                                          self.path) or 0
+
+    def update_field(self, id: str, field: str, value) -> bool:
+        """
+        Updates a single field of a record in place.
+
+        Args:
+            id (str): The ID of the record.
+            field (str): The name of the field.
+            value: The new value.
+
+        Returns:
+            bool: True if the record was found and updated.
+
+        Raises:
+            ValueError: If the field is unknown or the value does not fit.
+        """
+        if field not in self.widths:
+            raise ValueError(f"[i] Field '{field}' not found in the database headers")
+
+        names = list(self.widths)
+        position = names.index(field)
+        encoded = self.encode_field(field, value)
+
+        def write_field() -> bool:
+            row = self.get_rows().get(str(id))
+            if row is None:
+                return False
+            offset = ((row + 1) * self.record_length + position
+                      + sum(self.widths[name] for name in names[:position]))
+            with open(self.path, mode='r+b') as csv_file, \
+                 mmap.mmap(csv_file.fileno(), 0) as mapped_file:
+                mapped_file[offset:offset + len(encoded)] = encoded
+                mapped_file.flush()
+            os.utime(self.path)
+            return True
+
+        return RecordSlots.write({'id': id}, write_field, self.path)
+
+    def get_existing_field_names(self) -> list:
+        """
+        Retrieves the header field names, without their padding.
+
+        Returns:
+            list: List of header field names.
+        """
+        return [name.strip() for name in super().get_existing_field_names()]
+
+    def save_content(self, content: list) -> bool:
+        """
+        Saves the content to the file with every row padded.
+
+        Args:
+            content (list): The rows to write, header first. Padded values
+                are stripped before they are padded again.
+
+        Returns:
+            bool: True if save is successful.
+        """
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, mode='wb') as csv_file:
+            for row in content:
+                csv_file.write(self.encode_row(
+                    [value.strip() if isinstance(value, str) else value
+                     for value in row]
+                ))
+        os.replace(temporary_path, self.path)
+
+        return True
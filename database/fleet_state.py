@@ -0,0 +1,376 @@
+import atexit
+import csv
+import sys
+import threading
+import time
+import traceback
+from array import array
+import numpy as np
+from database.database import Database
+from helpers.allocation import Allocation
+
+
+class FleetState:
+    """
+    An in-memory state engine for the vehicle table.
+
+    All vehicles are kept in column arrays, so lookups, allocation and updates
+    never touch the CSV file. Every change is appended to a journal next to
+    the CSV file, and the CSV file itself is only rewritten on a checkpoint,
+    which happens every `checkpoint_interval` seconds or once
+    `dirty_threshold` changes are waiting, whichever comes first. On startup
+    the last checkpoint is loaded and the journal is replayed on top of it.
+
+    The engine owns the vehicle table, so it must only be enabled in a single
+    process at a time.
+
+    Attributes:
+        NUMERIC_COLUMNS (dict): Numeric columns mapped to their array type code.
+        active (FleetState): The engine serving the vehicle operations, or
+            None when the vehicles are read from the CSV file.
+    """
+
+    NUMERIC_COLUMNS = {
+        'status': 'b',
+        'remaining_item_capacity': 'l',
+        'remaining_kg_capacity': 'd',
+        'remaining_volume_capacity': 'd',
+        'type': 'b',
+    }
+
+    active = None
+
+    def __init__(self, database: Database,
+                 checkpoint_interval: float = 60.0,
+                 dirty_threshold: int = 1000) -> None:
+        """
+        Initializes the engine and loads the fleet from the database.
+
+        Args:
+            database (Database): The vehicle database used for checkpoints.
+            checkpoint_interval (float): Maximum seconds between checkpoints.
+            dirty_threshold (int): Number of changes that forces a checkpoint.
+        """
+        self.database = database
+        self.headers = list(database.dictionary.keys())
+        self.journal_path = f"{database.path}.journal"
+        self.checkpoint_interval = checkpoint_interval
+        self.dirty_threshold = dirty_threshold
+
+        # One array or list per column, and the row of each vehicle id
+        self.columns = {
+            header: array(self.NUMERIC_COLUMNS[header])
+            if header in self.NUMERIC_COLUMNS else list()
+            for header in self.headers
+        }
+        self.rows = {}
+
+        self.dirty = 0
+        self.last_checkpoint = time.monotonic()
+        self.lock = threading.RLock()
+        self.load()
+        self.journal = open(self.journal_path, mode='a', newline='')
+
+    @classmethod
+    def enable(cls, database: Database, checkpoint_interval: float = 60.0,
+               dirty_threshold: int = 1000) -> "FleetState":
+        """
+        Loads the fleet in memory and serves the vehicle operations from it.
+
+        Args:
+            database (Database): The vehicle database used for checkpoints.
+            checkpoint_interval (float): Maximum seconds between checkpoints.
+            dirty_threshold (int): Number of changes that forces a checkpoint.
+
+        Returns:
+            FleetState: The active engine.
+        """
+        if cls.active is None:
+            cls.active = cls(database, checkpoint_interval, dirty_threshold)
+            cls.active.start_checkpoint_timer()
+            atexit.register(cls.disable)
+        return cls.active
+
+    @classmethod
+    def disable(cls) -> None:
+        """
+        Writes a last checkpoint and goes back to reading the CSV file.
+        """
+        if cls.active is not None:
+            cls.active.close()
+            cls.active = None
+
+    def load(self) -> None:
+        """
+        Loads the last checkpoint and replays the journal on top of it.
+        """
+        for record in self.database.iter_records():
+            self.apply("add", list(record.values()))
+
+        try:
+            with open(self.journal_path, mode='r', newline='') as journal:
+                for row in csv.reader(journal, delimiter=','):
+                    # A torn last line from a crash is skipped
+                    if len(row) == len(self.headers) + 1:
+                        self.apply(row[0], row[1:])
+        except FileNotFoundError:
+            pass
+
+    def apply(self, operation: str, values: list) -> bool:
+        """
+        Applies a change to the in-memory columns.
+
+        Args:
+            operation (str): Either "add" or "update".
+            values (list): The record values in header order.
+
+        Returns:
+            bool: True if the change was applied, False if the vehicle
+            already exists for an add or doesn't exist for an update.
+        """
+        id = values[0]
+        row = self.rows.get(id)
+        if operation == "add" and row is None:
+            self.rows[id] = len(self.columns['id'])
+            for header, value in zip(self.headers, values):
+                self.columns[header].append(self.convert(header, value))
+            return True
+        if operation == "update" and row is not None:
+            for header, value in zip(self.headers, values):
+                self.columns[header][row] = self.convert(header, value)
+            return True
+        return False
+
+    def convert(self, header: str, value):
+        """
+        Converts a value to the type stored in a column.
+
+        Args:
+            header (str): The column name.
+            value: The value to convert.
+
+        Returns:
+            The converted value.
+        """
+        type_code = self.NUMERIC_COLUMNS.get(header)
+        if type_code == 'd':
+            return float(value)
+        if type_code is not None:
+            return int(value)
+        # Cities and countries repeat a lot, so share one string per value
+        return sys.intern(str(value)) if value is not None else ""
+
+    def get_record(self, row: int) -> dict:
+        """
+        Builds the record of a vehicle from the columns.
+
+        Args:
+            row (int): The row of the vehicle.
+
+        Returns:
+            dict: The vehicle record.
+        """
+        return {header: self.columns[header][row] for header in self.headers}
+
+    def iter_records(self):
+        """
+        Iterates over all the vehicle records.
+
+        Yields:
+            dict: The vehicle record.
+        """
+        with self.lock:
+            records = [self.get_record(row) for row in range(len(self.rows))]
+        yield from records
+
+    def find_by_id(self, id: str) -> dict:
+        """
+        Finds a vehicle by its ID.
+
+        Args:
+            id (str): The ID to search for.
+
+        Returns:
+            dict: The vehicle record if found, None otherwise.
+        """
+        with self.lock:
+            row = self.rows.get(id)
+            return self.get_record(row) if row is not None else None
+
+    def find_by_ids(self, ids) -> dict:
+        """
+        Finds several vehicles by their IDs.
+
+        Args:
+            ids (iterable): The IDs to search for.
+
+        Returns:
+            dict: The found IDs mapped to their vehicle record.
+        """
+        with self.lock:
+            return {id: self.get_record(self.rows[id])
+                    for id in set(ids) if id in self.rows}
+
+    def find_first_available(self, status: int, number_of_items: int,
+                             weight: float, volume: float,
+                             max_capacities: dict) -> dict:
+        """
+        Finds the vehicle with the given status that the load fills the most.
+
+        Args:
+            status (int): The status value of a free vehicle.
+            number_of_items (int): The number of items to load.
+            weight (float): The weight to load in kg.
+            volume (float): The volume to load.
+            max_capacities (dict): Vehicle type values mapped to their
+                maximum item, kg and volume capacity.
+
+        Returns:
+            dict: The vehicle record if found, None otherwise.
+        """
+        with self.lock:
+            if len(self.rows) == 0:
+                return None
+
+            # Zero-copy views of the columns. An array with a view cannot
+            # grow, so the views are released even when the search fails
+            columns = {
+                header: np.frombuffer(self.columns[header], dtype=type_code)
+                for header, type_code in self.NUMERIC_COLUMNS.items()
+            }
+            try:
+                index = Allocation.best_fit(
+                    columns['remaining_item_capacity'],
+                    columns['remaining_kg_capacity'],
+                    columns['remaining_volume_capacity'],
+                    Allocation.max_capacities_by_type(columns['type'],
+                                                      max_capacities),
+                    number_of_items, weight, volume,
+                    mask=columns['status'] == status,
+                )
+            except BaseException as error:
+                # The frames of the traceback would keep views alive too
+                traceback.clear_frames(error.__traceback__)
+                raise
+            finally:
+                del columns
+            return self.get_record(index) if index >= 0 else None
+
+    def add(self, record: dict) -> bool:
+        """
+        Adds a new vehicle.
+
+        Args:
+            record (dict): The vehicle record.
+
+        Returns:
+            bool: True if the vehicle was added, False if it already exists.
+        """
+        return self.write("add", record)
+
+    def update(self, record: dict) -> bool:
+        """
+        Updates an existing vehicle.
+
+        Args:
+            record (dict): The vehicle record.
+
+        Returns:
+            bool: True if the vehicle was updated, False if it doesn't exist.
+        """
+        return self.write("update", record)
+
+    def adjust(self, id: str, deltas: dict, maximums: dict = None) -> dict:
+        """
+        Adds amounts to numeric fields of a vehicle, like Database.adjust().
+
+        Args:
+            id (str): The ID of the vehicle.
+            deltas (dict): Field names mapped to the amount to add.
+            maximums (dict, optional): Field names mapped to a value the
+                field never grows above.
+
+        Returns:
+            dict: The vehicle record after the change, or None if the
+            vehicle doesn't exist.
+        """
+        with self.lock:
+            record = self.find_by_id(id)
+            if record is None:
+                print(f"[i] Failed to update vehicle with id: {id}")
+                return None
+
+            record = Database.apply_deltas(record, deltas, maximums)
+            return record if self.write("update", record) else None
+
+    def write(self, operation: str, record: dict) -> bool:
+        """
+        Applies a change, appends it to the journal and checkpoints if due.
+
+        Args:
+            operation (str): Either "add" or "update".
+            record (dict): The vehicle record.
+
+        Returns:
+            bool: True if the change was applied.
+        """
+        values = [record.get(header) for header in self.headers]
+        with self.lock:
+            if not self.apply(operation, values):
+                print(f"[i] Failed to {operation} vehicle with id: {values[0]}")
+                return False
+
+            csv.writer(self.journal, delimiter=',').writerow([operation] + values)
+            self.journal.flush()
+            self.dirty += 1
+            if self.dirty >= self.dirty_threshold or self.is_checkpoint_due():
+                self.checkpoint()
+        return True
+
+    def is_checkpoint_due(self) -> bool:
+        """
+        Checks if the checkpoint interval has passed.
+
+        Returns:
+            bool: True if a checkpoint should be written.
+        """
+        return time.monotonic() - self.last_checkpoint >= self.checkpoint_interval
+
+    def checkpoint(self) -> None:
+        """
+        Writes the whole fleet to the CSV file and empties the journal.
+        """
+        with self.lock:
+            content = [self.headers]
+            for row in range(len(self.rows)):
+                content.append(list(self.get_record(row).values()))
+            self.database.save_content(content)
+
+            # The checkpoint holds every change, so the journal starts over
+            self.journal.seek(0)
+            self.journal.truncate()
+            self.dirty = 0
+            self.last_checkpoint = time.monotonic()
+
+    def start_checkpoint_timer(self) -> None:
+        """
+        Starts a background thread that checkpoints idle changes on time.
+        """
+        def run() -> None:
+            while FleetState.active is self:
+                time.sleep(self.checkpoint_interval)
+                with self.lock:
+                    if self.dirty > 0 and not self.journal.closed:
+                        self.checkpoint()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def close(self) -> None:
+        """
+        Writes a last checkpoint and closes the journal.
+        """
+        with self.lock:
+            if not self.journal.closed:
+                if self.dirty > 0:
+                    self.checkpoint()
+                self.journal.close()
@@ -0,0 +1,158 @@
+from contextvars import ContextVar
+
+
+class IdentityMap:
+    """
+    Keeps a single loaded object per class and ID for a unit of work.
+
+    A unit of work is usually one API request: every lazy reference to the
+    same customer or vehicle during the request resolves to the same object,
+    and each of them is read from its table at most once. Outside of a unit
+    of work nothing is cached and every reference loads its own object.
+
+    Attributes:
+        current_map (ContextVar): The identity map of the running unit of work.
+    """
+
+    current_map = ContextVar("identity_map", default=None)
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty identity map.
+        """
+        self.objects = {}
+
+    @classmethod
+    def begin(cls):
+        """
+        Starts a unit of work with a new identity map.
+
+        Returns:
+            Token: The token to pass to end().
+        """
+        return cls.current_map.set(IdentityMap())
+
+    @classmethod
+    def end(cls, token) -> None:
+        """
+        Ends a unit of work and drops its identity map.
+
+        Args:
+            token (Token): The token returned by begin().
+        """
+        cls.current_map.reset(token)
+
+    @classmethod
+    def current(cls) -> "IdentityMap":
+        """
+        Gets the identity map of the running unit of work.
+
+        Returns:
+            IdentityMap: The identity map, or None outside of a unit of work.
+        """
+        return cls.current_map.get()
+
+    def add(self, object) -> None:
+        """
+        Registers a loaded object.
+
+        Args:
+            object: An object with an `id` attribute.
+        """
+        self.objects[(type(object).__name__, object.id)] = object
+
+    def get(self, class_name: str, id: str):
+        """
+        Gets a registered object.
+
+        Args:
+            class_name (str): The class name of the object.
+            id (str): The ID of the object.
+
+        Returns:
+            The registered object, or None if it is not loaded yet.
+        """
+        return self.objects.get((class_name, id))
+
+
+class LazyReference:
+    """
+    An attribute that refers to another object by ID and loads it on access.
+
+    The owner stores the ID in `_<name>_id` and the loaded object in
+    `_<name>`. Setting the attribute to an object stores both, so an object
+    built in memory never hits the database.
+    """
+
+    def __init__(self, target_class, loader=None) -> None:
+        """
+        Initializes the reference.
+
+        Args:
+            target_class: The class of the referenced object. It is built
+                with the ID and populated with its find() method.
+            loader (optional): Loads the referenced object from its ID
+                instead, for references to objects of several classes. It
+                returns None when the object doesn't exist.
+        """
+        self.target_class = target_class
+        self.loader = loader
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.object_attribute = f"_{name}"
+        self.id_attribute = f"_{name}_id"
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        object = getattr(instance, self.object_attribute, None)
+        id = getattr(instance, self.id_attribute, None)
+        if object is None and id:
+            object = self.load(id)
+            setattr(instance, self.object_attribute, object)
+        return object
+
+    def __set__(self, instance, object) -> None:
+        setattr(instance, self.object_attribute, object)
+        setattr(instance, self.id_attribute,
+                object.id if object is not None else None)
+
+    def set_id(self, instance, id: str) -> None:
+        """
+        Points the reference to an ID without loading the object.
+
+        Args:
+            instance: The owner of the reference.
+            id (str): The ID of the referenced object.
+        """
+        setattr(instance, self.object_attribute, None)
+        setattr(instance, self.id_attribute, id or None)
+
+    def load(self, id: str):
+        """
+        Loads the referenced object, through the identity map if any.
+
+        Args:
+            id (str): The ID of the referenced object.
+
+        Returns:
+            The loaded object, or None if it doesn't exist.
+        """
+        if self.loader is not None:
+            return self.loader(id)
+
+        identity_map = IdentityMap.current()
+        class_name = self.target_class.__name__
+        if identity_map is not None:
+            object = identity_map.get(class_name, id)
+            if object is not None:
+                return object
+
+        object = self.target_class(id)
+        if not object.find():
+            return None
+
+        if identity_map is not None:
+            identity_map.add(object)
+        return object
@@ -0,0 +1,362 @@
+import csv
+import functools
+import io
+import os
+import threading
+
+
+class TableIndex:
+    """
+    An in-memory index over a few columns of a CSV table.
+
+    Only the columns in COLUMNS are read. The index is checked against the
+    file before each use: rows appended since the last check are read from
+    where the previous read stopped. A file that has been rewritten is read
+    again from the start. Writes made through write() keep the index in
+    step without reading the table again. Writes made by other processes
+    are seen through the file check.
+
+    Subclasses set COLUMNS and implement clear() and add_record(), and
+    remove_record() to support delete().
+
+    Attributes:
+        COLUMNS (tuple): The names of the columns to read.
+        instances (dict): The index of each class and table of the process.
+    """
+
+    COLUMNS = ()
+
+    instances = {}
+    instances_lock = threading.Lock()
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes an empty index over a table.
+
+        Args:
+            path (str): The path to the CSV file of the table.
+        """
+        self.path = path
+        self.lock = threading.RLock()
+        self.signature = None  # Signature of the file at the last read
+        self.offset = 0        # Number of bytes of the file read so far
+        self.positions = None  # Position of each of COLUMNS in a row
+        self.clear()
+
+    @classmethod
+    def get(cls, path: str = None) -> "TableIndex":
+        """
+        Gets the index of the process over a table, up to date with its file.
+
+        Args:
+            path (str, optional): The path to the table. Defaults to the
+                DB_LOCATION of the class.
+
+        Returns:
+            TableIndex: The index.
+        """
+        key = (cls, os.path.abspath(path or cls.DB_LOCATION))
+        index = cls.instances.get(key)
+        if index is None:
+            with cls.instances_lock:
+                index = cls.instances.setdefault(key, cls(key[1]))
+        index.refresh()
+        return index
+
+    @classmethod
+    def get_loaded(cls, path: str = None) -> "TableIndex":
+        """
+        Gets the index of a table only if it has been loaded already.
+
+        Args:
+            path (str, optional): The path to the table.
+
+        Returns:
+            TableIndex: The index, or None.
+        """
+        return cls.instances.get((cls, os.path.abspath(path or cls.DB_LOCATION)))
+
+    @classmethod
+    def write(cls, record: dict, write_function, path: str = None):
+        """
+        Writes a record to the table and applies it to the loaded index.
+
+        The index is brought up to date before the write, so after the
+        write it can take the new file as read.
+
+        Args:
+            record (dict): The record as written to the table.
+            write_function: Writes the record. It returns a falsy value when
+                nothing was written.
+            path (str, optional): The path to the table.
+
+        Returns:
+            The return value of write_function.
+        """
+        return cls.write_many([record], write_function, path)
+
+    @classmethod
+    def write_many(cls, records: list, write_function, path: str = None):
+        """
+        Writes several records to the table and applies them to the loaded
+        index, like write().
+
+        Args:
+            records (list): The records as written to the table.
+            write_function: Writes the records. It returns a falsy value
+                when nothing was written.
+            path (str, optional): The path to the table.
+
+        Returns:
+            The return value of write_function.
+        """
+        index = cls.get_loaded(path)
+        if index is None:
+            return write_function()
+
+        with index.lock:
+            index.refresh()
+            written = write_function()
+            if written:
+                for record in records:
+                    index.add_record(record)
+                index.signature, index.offset = index.get_signature()
+        return written
+
+    @classmethod
+    def delete(cls, id: str, write_function, path: str = None):
+        """
+        Deletes a record from the table and from the loaded index, like
+        write().
+
+        Args:
+            id (str): The ID of the deleted record.
+            write_function: Deletes the record. It returns a falsy value when
+                nothing was deleted.
+            path (str, optional): The path to the table.
+
+        Returns:
+            The return value of write_function.
+        """
+        index = cls.get_loaded(path)
+        if index is None:
+            return write_function()
+
+        with index.lock:
+            index.refresh()
+            deleted = write_function()
+            if deleted:
+                index.remove_record(id)
+                index.signature, index.offset = index.get_signature()
+        return deleted
+
+    @classmethod
+    def delete_many(cls, ids: list, write_function, path: str = None):
+        """
+        Deletes several records from the table and from the loaded index,
+        like write().
+
+        Args:
+            ids (list): The IDs of the deleted records.
+            write_function: Deletes the records. It returns a falsy value
+                when nothing was deleted.
+            path (str, optional): The path to the table.
+
+        Returns:
+            The return value of write_function.
+        """
+        index = cls.get_loaded(path)
+        if index is None:
+            return write_function()
+
+        with index.lock:
+            index.refresh()
+            deleted = write_function()
+            if deleted:
+                for id in ids:
+                    index.remove_record(id)
+                index.signature, index.offset = index.get_signature()
+        return deleted
+
+    @staticmethod
+    def write_through(index_classes: tuple, record: dict, write_function):
+        """
+        Writes a record to a table and applies it to several of its indexes.
+
+        Args:
+            index_classes (tuple): The index classes of the table.
+            record (dict): The record as written to the table.
+            write_function: Writes the record.
+
+        Returns:
+            The return value of write_function.
+        """
+        for index_class in index_classes:
+            write_function = functools.partial(index_class.write, record,
+                                               write_function)
+        return write_function()
+
+    @staticmethod
+    def write_many_through(index_classes: tuple, records: list, write_function):
+        """
+        Writes several records to a table and applies them to several of its
+        indexes.
+
+        Args:
+            index_classes (tuple): The index classes of the table.
+            records (list): The records as written to the table.
+            write_function: Writes the records.
+
+        Returns:
+            The return value of write_function.
+        """
+        for index_class in index_classes:
+            write_function = functools.partial(index_class.write_many, records,
+                                               write_function)
+        return write_function()
+
+    @staticmethod
+    def delete_through(index_classes: tuple, id: str, write_function):
+        """
+        Deletes a record from a table and from several of its indexes.
+
+        Args:
+            index_classes (tuple): The index classes of the table.
+            id (str): The ID of the deleted record.
+            write_function: Deletes the record.
+
+        Returns:
+            The return value of write_function.
+        """
+        for index_class in index_classes:
+            write_function = functools.partial(index_class.delete, id,
+                                               write_function)
+        return write_function()
+
+    @staticmethod
+    def delete_many_through(index_classes: tuple, ids: list, write_function):
+        """
+        Deletes several records from a table and from several of its indexes.
+
+        Args:
+            index_classes (tuple): The index classes of the table.
+            ids (list): The IDs of the deleted records.
+            write_function: Deletes the records.
+
+        Returns:
+            The return value of write_function.
+        """
+        for index_class in index_classes:
+            write_function = functools.partial(index_class.delete_many, ids,
+                                               write_function)
+        return write_function()
+
+    def get_signature(self) -> tuple:
+        """
+        Gets the signature of the file and its size.
+
+        Returns:
+            tuple: The (inode, modification time, size) signature and the
+            size, or (None, 0) if the file doesn't exist.
+        """
+        try:
+            status = os.stat(self.path)
+        except FileNotFoundError:
+            return None, 0
+        return ((status.st_ino, status.st_mtime_ns, status.st_size),
+                status.st_size)
+
+    def refresh(self) -> None:
+        """
+        Brings the index up to date with the file.
+        """
+        signature, size = self.get_signature()
+        if signature == self.signature:
+            return
+
+        with self.lock:
+            signature, size = self.get_signature()
+            if signature == self.signature:
+                return
+
+            appended = (self.signature is not None and signature is not None
+                        and signature[0] == self.signature[0]
+                        and size > self.offset)
+            if not appended:
+                # Rewritten or removed, read it again from the start
+                self.clear()
+                self.offset = 0
+                self.positions = None
+            if signature is not None:
+                self.read()
+            self.signature = signature
+
+    def read(self) -> None:
+        """
+        Reads the complete rows from the offset to the end of the file.
+        """
+        with open(self.path, mode='rb') as csv_file:
+            csv_file.seek(self.offset)
+            content = csv_file.read()
+
+        # A row still being appended is left for the next read
+        end = content.rfind(b"\n") + 1
+        self.offset += end
+        csv_reader = csv.reader(io.StringIO(content[:end].decode()),
+                                delimiter=',')
+
+        if self.positions is None:
+            header = next(csv_reader, None)
+            if header is None:
+                return
+            header = [name.strip() for name in header]
+            self.positions = [(column, header.index(column))
+                              for column in self.COLUMNS]
+
+        # Values are stripped, for tables with padded fields
+        for row in csv_reader:
+            if len(row) > 0:
+                self.add_record({column: row[position].strip()
+                                 for column, position in self.positions})
+
+    def clear(self) -> None:
+        """
+        Removes all entries from the index.
+        """
+        raise NotImplementedError
+
+    def add_record(self, record: dict) -> None:
+        """
+        Adds or replaces the entry of a record.
+
+        Args:
+            record (dict): The record, with at least the COLUMNS.
+        """
+        raise NotImplementedError
+
+    def remove_record(self, id: str) -> None:
+        """
+        Removes the entry of a record.
+
+        Args:
+            id (str): The ID of the record.
+        """
+        raise NotImplementedError
+
+
+class IdIndex(TableIndex):
+    """
+    The IDs of the records of a table, to check if a record exists without
+    reading the table.
+    """
+
+    COLUMNS = ("id",)
+
+    def clear(self) -> None:
+        self.ids = set()
+
+    def add_record(self, record: dict) -> None:
+        self.ids.add(str(record['id']))
+
+    def remove_record(self, id: str) -> None:
+        self.ids.discard(id)
@@ -0,0 +1,211 @@
+import heapq
+import math
+import unicodedata
+from database.index import TableIndex
+
+
+class NameIndex(TableIndex):
+    """
+    A search index over a name column of a table, by prefix and by trigram.
+
+    Names are normalized, case folded and without accents, and split in
+    words. Each distinct word maps to the IDs of the names that contain it,
+    and the words themselves are indexed by trigram, so a query is matched
+    against the words, far fewer than the names, before it is expanded to
+    IDs. Words of one or two characters are matched by prefix.
+
+    Each word of the query is scored against the words it matches: 1 for
+    the same word, 0.9 for a word starting with it, 0.7 for a word
+    containing it and up to 0.6 for a similar word, which lets a query with
+    a typo still find the name. A name must match every word of the query,
+    and its score is the average of the scores of the query words.
+
+    Subclasses set COLUMNS to the ID and the name column, and NAME_COLUMN.
+
+    Attributes:
+        NAME_COLUMN (str): The column with the names.
+        MIN_SIMILARITY (float): Share of the trigrams of a query word a
+            similar word must have.
+    """
+
+    NAME_COLUMN = None
+    MIN_SIMILARITY = 0.5
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """
+        Normalizes a name for the search.
+
+        Args:
+            name (str): The name.
+
+        Returns:
+            str: The name case folded, without accents and with single spaces.
+        """
+        decomposed = unicodedata.normalize("NFKD", name.casefold())
+        name = "".join(character for character in decomposed
+                       if not unicodedata.combining(character))
+        return " ".join(name.split())
+
+    @staticmethod
+    def get_trigrams(word: str) -> set:
+        """
+        Splits a word in trigrams, padded with spaces.
+
+        Args:
+            word (str): The normalized word.
+
+        Returns:
+            set: The trigrams.
+        """
+        padded = f"  {word} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def get_prefixes(word: str) -> set:
+        """
+        Gets the first one and two characters of a word.
+
+        Args:
+            word (str): The normalized word.
+
+        Returns:
+            set: The prefixes.
+        """
+        return {word[:1], word[:2]}
+
+    def clear(self) -> None:
+        self.names = {}        # ID mapped to the name as stored
+        self.words_by_id = {}  # ID mapped to the normalized words of the name
+        self.ids_by_word = {}
+        self.words_by_trigram = {}
+        self.words_by_prefix = {}
+
+    def add_record(self, record: dict) -> None:
+        id = str(record['id'])
+        self.remove_record(id)
+
+        name = str(record[self.NAME_COLUMN] or "")
+        words = set(self.normalize(name).split())
+        if len(words) == 0:
+            return
+
+        self.names[id] = name
+        self.words_by_id[id] = words
+        for word in words:
+            ids = self.ids_by_word.get(word)
+            if ids is None:
+                # First name with this word
+                ids = self.ids_by_word[word] = set()
+                for trigram in self.get_trigrams(word):
+                    self.words_by_trigram.setdefault(trigram, set()).add(word)
+                for prefix in self.get_prefixes(word):
+                    self.words_by_prefix.setdefault(prefix, set()).add(word)
+            ids.add(id)
+
+    def remove_record(self, id: str) -> None:
+        words = self.words_by_id.pop(id, None)
+        if words is None:
+            return
+
+        del self.names[id]
+        for word in words:
+            ids = self.ids_by_word[word]
+            ids.discard(id)
+            if len(ids) > 0:
+                continue
+            # Last name with this word
+            del self.ids_by_word[word]
+            for postings, keys in ((self.words_by_trigram, self.get_trigrams(word)),
+                                   (self.words_by_prefix, self.get_prefixes(word))):
+                for key in keys:
+                    postings[key].discard(word)
+                    if len(postings[key]) == 0:
+                        del postings[key]
+
+    def match_word(self, query_word: str) -> dict:
+        """
+        Finds the words of the index matching a word of a query.
+
+        Args:
+            query_word (str): The normalized word of the query.
+
+        Returns:
+            dict: The matching words mapped to their score.
+        """
+        if len(query_word) < 3:
+            return {word: 1.0 if word == query_word else 0.9
+                    for word in self.words_by_prefix.get(query_word, ())}
+
+        query_trigrams = self.get_trigrams(query_word)
+        trigrams = sorted(query_trigrams,
+                          key=lambda trigram: len(self.words_by_trigram.get(trigram, ())))
+        # A word with enough trigrams in common has one of the rarest ones
+        required = max(1, math.ceil(len(trigrams) * self.MIN_SIMILARITY))
+        candidates = set()
+        for trigram in trigrams[:len(trigrams) - required + 1]:
+            candidates.update(self.words_by_trigram.get(trigram, ()))
+
+        # A word containing the query word has all of its inner trigrams
+        inner_postings = sorted((self.words_by_trigram.get(query_word[i:i + 3], set())
+                                 for i in range(len(query_word) - 2)), key=len)
+        candidates.update(inner_postings[0].intersection(*inner_postings[1:]))
+
+        matches = {}
+        for word in candidates:
+            if word == query_word:
+                matches[word] = 1.0
+            elif word.startswith(query_word):
+                matches[word] = 0.9
+            elif query_word in word:
+                matches[word] = 0.7
+            else:
+                word_trigrams = self.get_trigrams(word)
+                common = len(query_trigrams & word_trigrams)
+                if common >= len(query_trigrams) * self.MIN_SIMILARITY:
+                    matches[word] = 0.6 * common / len(query_trigrams | word_trigrams)
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """
+        Finds the names matching a query, best first.
+
+        Args:
+            query (str): Parts of the words of a name, possibly misspelled.
+            limit (int): The maximum number of results.
+
+        Returns:
+            list: (ID, name, score) tuples, with a score from 0 to 1.
+        """
+        query_words = list(dict.fromkeys(self.normalize(query).split()))
+        if len(query_words) == 0 or limit <= 0:
+            return []
+        matches = [self.match_word(query_word) for query_word in query_words]
+
+        if len(matches) == 1:
+            # Names share the score of their word, best words first
+            results = {}
+            for word, score in sorted(matches[0].items(),
+                                      key=lambda match: (-match[1], len(match[0]), match[0])):
+                # A name with several matching words keeps its best one
+                ids = heapq.nsmallest(limit, self.ids_by_word[word].difference(results),
+                                      key=lambda id: (len(self.names[id]), id))
+                for id in ids[:limit - len(results)]:
+                    results[id] = (id, self.names[id], round(score, 4))
+                if len(results) == limit:
+                    break
+            return list(results.values())
+
+        # Names with a match for every query word, smallest sets first
+        id_sets = sorted((set().union(*(self.ids_by_word[word] for word in match))
+                          for match in matches), key=len)
+        results = []
+        for id in id_sets[0].intersection(*id_sets[1:]):
+            words = self.words_by_id[id]
+            score = sum(max(match.get(word, 0.0) for word in words)
+                        for match in matches) / len(matches)
+            results.append((id, self.names[id], round(score, 4)))
+
+        # Best score first, then shortest name
+        results.sort(key=lambda result: (-result[2], len(result[1]), result[0]))
+        return results[:limit]
@@ -0,0 +1,342 @@
+import math
+import traceback
+from array import array
+import numpy as np
+from helpers.allocation import Allocation
+from helpers.geo import Geo
+
+
+class GridSite:
+    """
+    The entries of a spatial grid at one position.
+
+    Vehicles gather at a few positions, like the cities, so the entries of
+    a position share one distance. The capacities are kept in one array,
+    three values per entry, and an entry is removed by moving the last
+    entry into its place, so the array stays packed and is read by NumPy
+    without copies. The largest capacities let a query skip the sites
+    where no entry can take the load.
+    """
+
+    __slots__ = ("latitude", "longitude", "cos_latitude", "ids", "capacities",
+                 "max_capacities", "is_max_stale")
+
+    def __init__(self, latitude: float, longitude: float) -> None:
+        """
+        Initializes an empty site.
+
+        Args:
+            latitude (float): The latitude in degrees.
+            longitude (float): The longitude in degrees.
+        """
+        self.latitude = math.radians(latitude)
+        self.longitude = math.radians(longitude)
+        self.cos_latitude = math.cos(self.latitude)
+        self.ids = []
+        self.capacities = array('d')  # Item, kg and volume capacity per entry
+        self.max_capacities = (-math.inf, -math.inf, -math.inf)
+        self.is_max_stale = False     # Removals may have lowered the maxima
+
+    def can_fit(self, number_of_items: int, weight: float, volume: float) -> bool:
+        """
+        Checks if an entry of the site may have room for a load.
+
+        Args:
+            number_of_items (int): The number of items to load.
+            weight (float): The weight to load in kg.
+            volume (float): The volume to load.
+
+        Returns:
+            bool: False if no entry has room for the load.
+        """
+        max_items, max_kg, max_volume = self.max_capacities
+        return number_of_items <= max_items and weight <= max_kg \
+            and volume <= max_volume
+
+    def get_distance(self, latitude: float, longitude: float,
+                     cos_latitude: float) -> float:
+        """
+        Computes the distance to a point with the haversine formula.
+
+        Args:
+            latitude (float): The latitude of the point in radians.
+            longitude (float): The longitude of the point in radians.
+            cos_latitude (float): The cosine of the latitude of the point.
+
+        Returns:
+            float: The distance in km.
+        """
+        a = math.sin((self.latitude - latitude) / 2) ** 2 \
+            + cos_latitude * self.cos_latitude \
+            * math.sin((self.longitude - longitude) / 2) ** 2
+        return 2 * Geo.EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+class SpatialGrid:
+    """
+    A grid index over points with capacities, for k-nearest queries.
+
+    The points are kept in square cells of CELL_SIZE degrees, and within a
+    cell by position. A query visits the cells in rings around the cell of
+    the queried point, and the sites of a ring from the nearest. It stops
+    once no point of the next ring can be nearer than the k nearest points
+    found so far. The capacity filter of a site runs as NumPy operations
+    over its entries. Points are added, moved and removed one at a time,
+    without rebuilding the grid.
+
+    Longitudes are not wrapped, so points on both sides of the 180th
+    meridian are not seen as neighbours.
+
+    Attributes:
+        CELL_SIZE (float): The side of a cell in degrees.
+        SMALL_SITE_SIZE (int): Sites up to this size are filtered without
+            NumPy, whose overhead is larger than the work.
+    """
+
+    CELL_SIZE = 0.25
+    SMALL_SITE_SIZE = 16
+
+    def __init__(self, cell_size: float = CELL_SIZE) -> None:
+        """
+        Initializes an empty grid.
+
+        Args:
+            cell_size (float): The side of a cell in degrees.
+        """
+        self.cell_size = cell_size
+        self.cells = {}      # Cell key mapped to its sites by position
+        self.positions = {}  # ID mapped to its cell key, position and row
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def get_cell_key(self, latitude: float, longitude: float) -> tuple:
+        """
+        Gets the cell of a point.
+
+        Args:
+            latitude (float): The latitude in degrees.
+            longitude (float): The longitude in degrees.
+
+        Returns:
+            tuple: The row and column of the cell.
+        """
+        return (math.floor(latitude / self.cell_size),
+                math.floor(longitude / self.cell_size))
+
+    def add(self, id: str, latitude: float, longitude: float,
+            capacities: tuple) -> None:
+        """
+        Adds a point, or moves it if the ID is in the grid already.
+
+        Args:
+            id (str): The ID of the point.
+            latitude (float): The latitude in degrees.
+            longitude (float): The longitude in degrees.
+            capacities (tuple): The remaining item, kg and volume capacity.
+        """
+        self.remove(id)
+        key = self.get_cell_key(latitude, longitude)
+        sites = self.cells.setdefault(key, {})
+        site = sites.get((latitude, longitude))
+        if site is None:
+            site = sites[(latitude, longitude)] = GridSite(latitude, longitude)
+
+        self.positions[id] = (key, (latitude, longitude), len(site.ids))
+        site.ids.append(id)
+        site.capacities.extend(capacities)
+        site.max_capacities = tuple(max(maximum, capacity) for maximum, capacity
+                                    in zip(site.max_capacities, capacities))
+
+    def remove(self, id: str) -> bool:
+        """
+        Removes a point.
+
+        Args:
+            id (str): The ID of the point.
+
+        Returns:
+            bool: True if the point was in the grid.
+        """
+        position = self.positions.pop(id, None)
+        if position is None:
+            return False
+        key, site_key, row = position
+        sites = self.cells[key]
+        site = sites[site_key]
+
+        # Move the last entry of the site into the freed row
+        last_id = site.ids.pop()
+        last_capacities = site.capacities[-3:]
+        del site.capacities[-3:]
+        if last_id != id:
+            site.ids[row] = last_id
+            site.capacities[row * 3:row * 3 + 3] = last_capacities
+            self.positions[last_id] = (key, site_key, row)
+
+        if len(site.ids) > 0:
+            site.is_max_stale = True
+        elif len(sites) > 1:
+            del sites[site_key]
+        else:
+            del self.cells[key]
+        return True
+
+    def get_ring_keys(self, center: tuple, ring: int) -> list:
+        """
+        Gets the occupied cells of a ring around a cell.
+
+        Args:
+            center (tuple): The key of the center cell.
+            ring (int): The distance of the ring in cells.
+
+        Returns:
+            list: The keys of the occupied cells of the ring.
+        """
+        row, column = center
+        if ring == 0:
+            keys = [center]
+        else:
+            keys = [(row + delta, column + side)
+                    for delta in range(-ring, ring + 1) for side in (-ring, ring)]
+            keys += [(row + side, column + delta)
+                     for delta in range(-ring + 1, ring) for side in (-ring, ring)]
+        return [key for key in keys if key in self.cells]
+
+    def get_min_distance(self, latitude: float, ring: int) -> float:
+        """
+        Bounds the distance from a point to the cells of a ring from below.
+
+        Args:
+            latitude (float): The latitude of the point in degrees.
+            ring (int): The distance of the ring in cells.
+
+        Returns:
+            float: No point of the ring is nearer than this, in km.
+        """
+        gap = math.radians(max(ring - 1, 0) * self.cell_size)
+        # Degrees of longitude shrink towards the poles
+        max_latitude = math.radians(min(abs(latitude) + (ring + 1) * self.cell_size, 90))
+        along_latitude = gap * Geo.EARTH_RADIUS_KM
+        along_longitude = 2 * Geo.EARTH_RADIUS_KM * math.asin(
+            min(math.cos(max_latitude) * math.sin(min(gap, math.pi) / 2), 1.0)
+        )
+        return min(along_latitude, along_longitude)
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1,
+                number_of_items: int = 0, weight: float = 0,
+                volume: float = 0) -> list:
+        """
+        Finds the k nearest points with room for a load.
+
+        Args:
+            latitude (float): The latitude of the point in degrees.
+            longitude (float): The longitude of the point in degrees.
+            k (int): The number of points to find.
+            number_of_items (int): The number of items to load.
+            weight (float): The weight to load in kg.
+            volume (float): The volume to load.
+
+        Returns:
+            list: The IDs of the points and their distances in km, as
+            (id, distance) pairs, nearest first. Points at the same
+            position come by least remaining kg capacity, see search_site.
+        """
+        if k <= 0 or len(self.cells) == 0:
+            return []
+
+        center = self.get_cell_key(latitude, longitude)
+        point = (math.radians(latitude), math.radians(longitude),
+                 math.cos(math.radians(latitude)))
+        found = []  # The nearest (id, distance) pairs so far, nearest first
+        visited = 0
+        ring = 0
+        while visited < len(self.cells):
+            if len(found) >= k \
+                    and self.get_min_distance(latitude, ring) > found[-1][1]:
+                break
+
+            if 8 * ring >= len(self.cells) - visited:
+                # The ring is larger than what is left, visit the rest at once
+                keys = [key for key in self.cells
+                        if max(abs(key[0] - center[0]), abs(key[1] - center[1])) >= ring]
+            else:
+                keys = self.get_ring_keys(center, ring)
+            visited += len(keys)
+            ring += 1
+
+            # The sites of the ring that may take the load, from the nearest
+            sites = sorted(
+                ((site.get_distance(*point), site)
+                 for key in keys for site in self.cells[key].values()
+                 if site.can_fit(number_of_items, weight, volume)),
+                key=lambda candidate: candidate[0]
+            )
+            for distance, site in sites:
+                if len(found) >= k and distance > found[-1][1]:
+                    break
+                ids = self.search_site(site, k, number_of_items, weight, volume)
+                if len(ids) > 0:
+                    found = sorted(found + [(id, distance) for id in ids],
+                                   key=lambda pair: pair[1])[:k]
+        return found
+
+    def search_site(self, site: GridSite, k: int, number_of_items: int,
+                    weight: float, volume: float) -> list:
+        """
+        Finds k points of a site with room for a load.
+
+        The points of a site are at the same distance, so they are ranked
+        by their remaining kg capacity, least first: the smallest vehicle
+        that takes the load comes first, as in the best fit of the
+        allocation. Points with the same kg capacity come in any order.
+
+        Args:
+            site (GridSite): The site.
+            k (int): The number of points to find.
+            number_of_items (int): The number of items to load.
+            weight (float): The weight to load in kg.
+            volume (float): The volume to load.
+
+        Returns:
+            list: The IDs of up to k points, ranked.
+        """
+        if len(site.ids) <= self.SMALL_SITE_SIZE:
+            capacities = [site.capacities[row * 3:row * 3 + 3]
+                          for row in range(len(site.ids))]
+            if site.is_max_stale:
+                site.max_capacities = tuple(max(column) for column in zip(*capacities))
+                site.is_max_stale = False
+            fitting = [(kg_capacity, id) for id, (item_capacity, kg_capacity, volume_capacity)
+                       in zip(site.ids, capacities)
+                       if item_capacity >= number_of_items and kg_capacity >= weight
+                       and volume_capacity >= volume]
+            if len(fitting) > 1:
+                fitting.sort()
+            return [id for _, id in fitting[:k]]
+
+        # Zero-copy view of the capacities. An array with a view cannot
+        # change size, so the view is released even when the search fails
+        capacities = np.frombuffer(site.capacities, dtype=np.float64).reshape(-1, 3)
+        try:
+            if site.is_max_stale:
+                site.max_capacities = tuple(float(maximum)
+                                            for maximum in capacities.max(axis=0))
+                site.is_max_stale = False
+            rows = np.flatnonzero(Allocation.fits(capacities[:, 0], capacities[:, 1],
+                                                  capacities[:, 2], number_of_items,
+                                                  weight, volume))
+            kg_capacities = capacities[rows, 1]
+        except BaseException as error:
+            # The frames of the traceback would keep the view alive too
+            traceback.clear_frames(error.__traceback__)
+            raise
+        finally:
+            del capacities
+
+        if len(rows) > k:
+            # The k least kg capacities, without sorting the whole site
+            nearest = np.argpartition(kg_capacities, k - 1)[:k]
+            rows, kg_capacities = rows[nearest], kg_capacities[nearest]
+        rows = rows[np.argsort(kg_capacities, kind='stable')]
+        return [site.ids[row] for row in rows]
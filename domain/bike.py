@@ -9,17 +9,26 @@ class Bike(Vehicle):
     Attributes:
         MAX_ITEM_CAPACITY (int): Maximum item capacity of the bike.
         MAX_KG_CAPACITY (int): Maximum weight capacity in kg for the bike.
+        MAX_VOLUME_CAPACITY (int): Maximum volume capacity in litres for the
+            bike, the unit of the item volumes.
+        TYPE (VehicleType): The vehicle type of the bike.
     """
     
     MAX_ITEM_CAPACITY = 2  # Maximum items the bike can carry
     MAX_KG_CAPACITY = 10   # Maximum weight the bike can carry in kg
+    # A 60 l cargo box: two 36 l items of 5 kg fit the weight, not the box
+    MAX_VOLUME_CAPACITY = 60  # Maximum volume the bike can carry in litres
+    TYPE = VehicleType.BIKE
+
+    __slots__ = ()  # The attributes are the slots of Vehicle
 
     def __init__(self,
                  id: str = None,
                  current_position: Location = None,
                  status: VehicleStatusType = VehicleStatusType.FREE,
                  remaining_item_capacity: int = MAX_ITEM_CAPACITY,
-                 remaining_kg_capacity: int = MAX_KG_CAPACITY):
+                 remaining_kg_capacity: int = MAX_KG_CAPACITY,
+                 remaining_volume_capacity: float = MAX_VOLUME_CAPACITY):
         """
         Initializes a Bike instance with specific capacities and status.
         
@@ -29,6 +38,7 @@ class Bike(Vehicle):
             status (VehicleStatusType): The current status of the bike.
             remaining_item_capacity (int): Remaining item capacity.
             remaining_kg_capacity (int): Remaining weight capacity in kg.
+            remaining_volume_capacity (float): Remaining volume capacity.
         """
         
         # Initialize parent class Vehicle with type set to BIKE
@@ -37,7 +47,5 @@ class Bike(Vehicle):
                          status=status,
                          remaining_item_capacity=remaining_item_capacity,
                          remaining_kg_capacity=remaining_kg_capacity,
+                         remaining_volume_capacity=remaining_volume_capacity,
                          type=VehicleType.BIKE)
-        
-        # Initialize the database connection
-        self.get_database()
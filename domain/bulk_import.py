@@ -0,0 +1,378 @@
+import io
+import json
+from domain.bike import Bike
+from domain.company import Company
+from domain.customer import CorporateCustomerIndex, PrivateCustomerIndex
+from domain.location import LocationRegistry
+from domain.person import Person
+from domain.ship import Ship
+from domain.truck import Truck
+from domain.vehicle import Vehicle
+from helpers.validate import Validate
+
+
+class BulkImport:
+    """
+    Imports records sent as NDJSON, one JSON object per line, in batches.
+
+    The rows are read BATCH_SIZE at a time. The fields of VALIDATED_FIELDS
+    are validated a column of the batch at a time, then each row is built,
+    and its ID is checked against an index of the stored IDs and against
+    the IDs of the pending batch. The valid rows of a batch are written
+    with one append to the table and its indexes. A result is produced for
+    every row, in the order of the rows, once the batch of the row is
+    written. Only one batch is held in memory, whatever the size of the
+    upload.
+
+    Subclasses set OBJECT_NAME and VALIDATED_FIELDS and implement build(),
+    exists() and add_many().
+
+    Attributes:
+        BATCH_SIZE (int): Number of rows written at once.
+        OBJECT_NAME (str): Name of the imported objects, for the messages.
+        VALIDATED_FIELDS (dict): The kind of value of each field validated
+            by column, see Validate.column(), and whether it is optional.
+    """
+
+    BATCH_SIZE = 500
+    OBJECT_NAME = None
+    VALIDATED_FIELDS = {}
+
+    def __init__(self, batch_size: int = BATCH_SIZE,
+                 processes: int = None) -> None:
+        """
+        Initializes an import.
+
+        Args:
+            batch_size (int): Number of rows written at once.
+            processes (int, optional): Validate the columns of the batches
+                over this many processes. Batches then hold at least
+                Validate.POOL_MIN_SIZE rows, so their columns reach the pool.
+        """
+        self.batch_size = batch_size
+        self.processes = processes
+        if processes is not None and processes > 1:
+            self.batch_size = max(batch_size, Validate.POOL_MIN_SIZE)
+
+    @staticmethod
+    def is_text(value) -> bool:
+        """
+        Checks if a value is a non-empty string.
+
+        Args:
+            value: The value of a field of a row.
+
+        Returns:
+            bool: True if the value is a string with some text.
+        """
+        return isinstance(value, str) and value.strip() != ""
+
+    @staticmethod
+    def check(errors: list) -> None:
+        """
+        Rejects a row with invalid fields.
+
+        Args:
+            errors (list): The names of the invalid fields.
+
+        Raises:
+            ValueError: If there is any invalid field.
+        """
+        if len(errors) > 0:
+            raise ValueError(f"[i] Invalid {', '.join(errors)}")
+
+    def validate(self, rows: list) -> list:
+        """
+        Validates the fields of VALIDATED_FIELDS of a batch, a column at a
+        time.
+
+        Args:
+            rows (list): The rows of the batch.
+
+        Returns:
+            list: The names of the invalid fields of each row.
+        """
+        errors = [[] for _ in rows]
+        for field, (kind, is_optional) in self.VALIDATED_FIELDS.items():
+            _, column_errors = Validate.column([row.get(field) for row in rows],
+                                               kind, is_optional, self.processes)
+            for position, _ in column_errors:
+                errors[position].append(field)
+        return errors
+
+    def build(self, data: dict, errors: list):
+        """
+        Builds the object of a row and completes its validation.
+
+        Args:
+            data (dict): The row.
+            errors (list): The invalid fields found by validate().
+
+        Returns:
+            The object to add.
+
+        Raises:
+            ValueError: If the row is not valid.
+        """
+        raise NotImplementedError
+
+    def exists(self, id: str) -> bool:
+        """
+        Checks if an object with the ID is stored already.
+
+        Args:
+            id (str): The ID of the object.
+
+        Returns:
+            bool: True if the ID is taken.
+        """
+        raise NotImplementedError
+
+    def add_many(self, objects: list) -> int:
+        """
+        Writes a batch of new objects.
+
+        Args:
+            objects (list): The objects.
+
+        Returns:
+            int: The number of objects written.
+        """
+        raise NotImplementedError
+
+    def run(self, lines):
+        """
+        Imports the rows of an NDJSON stream.
+
+        Args:
+            lines (iterable): The lines of the stream, as bytes or strings,
+                or a raw binary stream like the body of a request.
+
+        Yields:
+            dict: The result of each non-empty line: its line number, the ID
+            and status "created", or status "error" and the error.
+        """
+        if isinstance(lines, io.RawIOBase):
+            lines = io.BufferedReader(lines)  # Read lines by chunks, not by bytes
+
+        rows = []     # Parsed rows of the pending batch
+        results = []  # Results of the lines of the pending batch
+
+        for line_number, line in enumerate(lines, start=1):
+            if isinstance(line, bytes):
+                line = line.decode()
+            if line.strip() == "":
+                continue
+
+            result = {"line": line_number}
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as error:
+                result.update(status="error", error=f"[i] Invalid JSON: {error}")
+            else:
+                if isinstance(data, dict):
+                    result["status"] = "pending"
+                    rows.append(data)
+                else:
+                    result.update(status="error",
+                                  error="[i] A row must be a JSON object")
+            results.append(result)
+
+            if len(results) >= self.batch_size:
+                yield from self.flush(rows, results)
+                rows, results = [], []
+
+        yield from self.flush(rows, results)
+
+    def flush(self, rows: list, results: list):
+        """
+        Validates, builds and writes a batch, and completes the results of
+        its lines.
+
+        Args:
+            rows (list): The parsed rows of the batch.
+            results (list): The results of the lines of the batch, pending
+                for the parsed rows, in the same order.
+
+        Yields:
+            dict: The result of each line.
+        """
+        batch = []
+        pending_ids = set()
+        pending_results = (result for result in results
+                           if result["status"] == "pending")
+        for data, errors, result in zip(rows, self.validate(rows), pending_results):
+            try:
+                object = self.build(data, errors)
+                if object.id in pending_ids or self.exists(object.id):
+                    raise ValueError(
+                        f"[i] {self.OBJECT_NAME} with id {object.id} already exists"
+                    )
+            except ValueError as error:
+                result.update(status="error", error=str(error))
+            else:
+                result["id"] = object.id
+                batch.append(object)
+                pending_ids.add(object.id)
+
+        written = self.add_many(batch) if len(batch) > 0 else 0
+        for result in results:
+            if result["status"] == "pending":
+                if written:
+                    result["status"] = "created"
+                else:
+                    result.update(status="error",
+                                  error="[i] Failed to write the batch")
+            yield result
+
+    def stream(self, lines):
+        """
+        Imports the rows of an NDJSON stream and streams the results.
+
+        Args:
+            lines (iterable): The lines of the stream.
+
+        Yields:
+            str: The result of each row, as a line of NDJSON.
+        """
+        for result in self.run(lines):
+            yield json.dumps(result) + "\n"
+
+
+class PersonImport(BulkImport):
+    """
+    Imports private customers or users.
+    """
+
+    OBJECT_NAME = Person.__name__
+    VALIDATED_FIELDS = {
+        "id": ("personal_number", False),
+        "full_name": ("person_full_name", False),
+        "mobile_number": ("mobile", True),
+        "email": ("email", True),
+    }
+
+    def __init__(self, is_user: bool = False,
+                 batch_size: int = BulkImport.BATCH_SIZE,
+                 processes: int = None) -> None:
+        """
+        Initializes an import of persons.
+
+        Args:
+            is_user (bool): Import users, with a password, instead of
+                private customers.
+            batch_size (int): Number of rows written at once.
+            processes (int, optional): Number of processes validating the
+                columns of the batches, see BulkImport.
+        """
+        super().__init__(batch_size, processes)
+        self.is_user = is_user
+
+    def build(self, data: dict, errors: list) -> Person:
+        person = Person(id=data.get("id"),
+                        full_name=data.get("full_name"),
+                        address=data.get("address"),
+                        mobile_number=data.get("mobile_number"),
+                        email=data.get("email"),
+                        password=data.get("password"),
+                        is_user=self.is_user)
+
+        if person.address is not None and not isinstance(person.address, dict):
+            errors.append("address")
+        if self.is_user and not self.is_text(person.password):
+            errors.append("password")
+        self.check(errors)
+        return person
+
+    def exists(self, id: str) -> bool:
+        return id in PrivateCustomerIndex.get().ids
+
+    def add_many(self, objects: list) -> int:
+        return Person.add_many(objects)
+
+
+class CompanyImport(BulkImport):
+    """
+    Imports corporate customers.
+    """
+
+    OBJECT_NAME = Company.__name__
+    VALIDATED_FIELDS = {
+        "id": ("company_number", False),
+        "invoice_email": ("email", True),
+    }
+
+    def build(self, data: dict, errors: list) -> Company:
+        company = Company(id=data.get("id"),
+                          company_name=data.get("company_name"),
+                          company_address=data.get("company_address"),
+                          reference_person=data.get("reference_person"),
+                          invoice_email=data.get("invoice_email"),
+                          related_users=data.get("related_users") or [])
+
+        if not self.is_text(company.company_name) or "  " in company.company_name:
+            errors.append("company_name")
+        if company.company_address is not None \
+                and not isinstance(company.company_address, dict):
+            errors.append("company_address")
+        if company.reference_person is not None \
+                and not isinstance(company.reference_person, dict):
+            errors.append("reference_person")
+        if not isinstance(company.related_users, list) \
+                or not all(self.is_text(user_id) for user_id in company.related_users):
+            errors.append("related_users")
+        self.check(errors)
+        return company
+
+    def exists(self, id: str) -> bool:
+        return id in CorporateCustomerIndex.get().ids
+
+    def add_many(self, objects: list) -> int:
+        return Company.add_many(objects)
+
+
+class VehicleImport(BulkImport):
+    """
+    Imports vehicles of any type, given by the "type" field of each row.
+
+    Attributes:
+        VEHICLE_CLASSES (dict): The class of each vehicle type name.
+    """
+
+    OBJECT_NAME = Vehicle.__name__
+    VEHICLE_CLASSES = {"bike": Bike, "ship": Ship, "truck": Truck}
+    VALIDATED_FIELDS = {"id": ("vehicle_number", False)}
+
+    def __init__(self, batch_size: int = BulkImport.BATCH_SIZE,
+                 processes: int = None) -> None:
+        """
+        Initializes an import of vehicles.
+
+        Args:
+            batch_size (int): Number of rows written at once.
+            processes (int, optional): Number of processes validating the
+                columns of the batches, see BulkImport.
+        """
+        super().__init__(batch_size, processes)
+        self.locations = LocationRegistry.get()
+
+    def build(self, data: dict, errors: list) -> Vehicle:
+        vehicle_class = self.VEHICLE_CLASSES.get(str(data.get("type")).lower())
+        if vehicle_class is None:
+            raise ValueError(f"[i] Type {data.get('type')} does not exist")
+
+        vehicle = vehicle_class(data.get("id"))
+        if self.is_text(data.get("current_position")):
+            vehicle.current_position = self.locations.find(
+                data["current_position"]
+            )
+        if vehicle.current_position is None:
+            errors.append("current_position")
+        self.check(errors)
+        return vehicle
+
+    def exists(self, id: str) -> bool:
+        return Vehicle.exists(id)
+
+    def add_many(self, objects: list) -> int:
+        return Vehicle.add_many(objects)
@@ -0,0 +1,91 @@
+from database.fleet_state import FleetState
+from domain.order import Order, OrderStatus
+from domain.vehicle import FreeVehicleIndex, Vehicle
+
+
+class CapacityReconciler:
+    """
+    Recomputes the remaining capacity of every vehicle from the open orders.
+
+    Order status changes keep the vehicle capacities up to date one order at a
+    time. The reconciler is the safety net for data that was changed outside
+    of those paths: it streams the orders once, sums the items, weight and
+    volume of the open orders per vehicle and rewrites the vehicles with the result.
+    """
+
+    def get_used_capacity(self) -> dict:
+        """
+        Sums the capacity used by the open orders of each vehicle.
+
+        Returns:
+            dict: Vehicle IDs mapped to a [number_of_items, weight, volume]
+            list.
+        """
+        item_volumes = {}  # Volume per item id, looked up once per id
+        used_capacity = {}
+        for record in Order.iter_records():
+            order_status = OrderStatus(int(record['order_status']))
+            vehicle_id = record['vehicle_id']
+            if not order_status.is_open() or vehicle_id == "":
+                continue
+
+            used = used_capacity.setdefault(vehicle_id, [0, 0.0, 0.0])
+            load = Order.get_load_from_record(record, item_volumes)
+            for index, value in enumerate(load):
+                used[index] += value
+
+        return used_capacity
+
+    def reconcile(self) -> int:
+        """
+        Rewrites the remaining capacity of every vehicle.
+
+        Returns:
+            int: The number of vehicles whose capacity was corrected.
+        """
+        used_capacity = self.get_used_capacity()
+        fleet_state = FleetState.active
+        if fleet_state is not None:
+            database = fleet_state  # The in-memory fleet owns the vehicles
+        else:
+            database = Vehicle().database
+        content = [list(Vehicle().to_dict())]
+        corrected = 0
+
+        for record in database.iter_records():
+            vehicle = Vehicle()
+            vehicle.from_dict_to_self(record)
+            number_of_items, weight, volume = used_capacity.get(
+                vehicle.id, (0, 0.0, 0.0)
+            )
+            max_item_capacity, max_kg_capacity, max_volume_capacity = \
+                vehicle.get_max_capacity()
+
+            remaining_item_capacity = max_item_capacity - number_of_items
+            remaining_kg_capacity = round(max_kg_capacity - weight, 2)
+            remaining_volume_capacity = round(max_volume_capacity - volume, 2)
+            if remaining_item_capacity != vehicle.remaining_item_capacity \
+                or remaining_kg_capacity != vehicle.remaining_kg_capacity \
+                or remaining_volume_capacity != vehicle.remaining_volume_capacity:
+                    corrected += 1
+
+            vehicle.remaining_item_capacity = remaining_item_capacity
+            vehicle.remaining_kg_capacity = remaining_kg_capacity
+            vehicle.remaining_volume_capacity = remaining_volume_capacity
+            content.append(list(vehicle.to_dict().values()))
+
+        if fleet_state is not None:
+            # Through the free vehicle index, so its grid sees the capacities
+            records = [dict(zip(content[0], values)) for values in content[1:]]
+            FreeVehicleIndex.write_many(
+                records,
+                lambda: sum(fleet_state.update(record) for record in records)
+            )
+        else:
+            database.save_content(content)
+        print(f"[i] Capacity reconciled, {corrected} vehicle(s) corrected")
+        return corrected
+
+
+if __name__ == "__main__":
+    CapacityReconciler().reconcile()
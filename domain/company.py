@@ -1,9 +1,73 @@
 from database.database import Database
-from domain.customer import Customer, CustomerType
+from database.index import TableIndex
+from database.name_index import NameIndex
+from domain.customer import Customer, CustomerType, CorporateCustomerIndex
+from helpers.field_codec import FieldCodec
+
+
+class CompanyUsersIndex(TableIndex):
+    """
+    The companies each user is related to, from the related_users column of
+    the company table.
+
+    The index is kept in both directions, so a company that changes its
+    users only touches the entries of those users, and the companies of a
+    user are found without reading the company table.
+    """
+
+    DB_LOCATION = "database/company.csv"
+    COLUMNS = ("id", "related_users")
+
+    def clear(self) -> None:
+        self.companies_by_user = {}
+        self.users_by_company = {}
+
+    def add_record(self, record: dict) -> None:
+        self.remove_record(record['id'])
+
+        users = set(Company.parse_related_users(record['related_users']))
+        self.users_by_company[record['id']] = users
+        for user_id in users:
+            self.companies_by_user.setdefault(user_id, set()).add(record['id'])
+
+    def remove_record(self, id: str) -> None:
+        for user_id in self.users_by_company.pop(id, ()):
+            companies = self.companies_by_user[user_id]
+            companies.discard(id)
+            if len(companies) == 0:
+                del self.companies_by_user[user_id]
+
+    def get_company_ids(self, user_id: str) -> list:
+        """
+        Gets the companies a user is related to.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            list: The sorted IDs of the companies.
+        """
+        return sorted(self.companies_by_user.get(user_id, ()))
+
+
+class CompanyNameIndex(NameIndex):
+    """
+    The search index over the names of the companies.
+    """
+
+    DB_LOCATION = "database/company.csv"
+    COLUMNS = ("id", "company_name")
+    NAME_COLUMN = "company_name"
+
 
 # Company class inherits from Customer and represents a company/corporate in the system
 class Company(Customer):
     DB_LOCATION = "database/company.csv"
+    INDEXES = (CompanyUsersIndex, CompanyNameIndex, CorporateCustomerIndex)
+
+    __slots__ = ("company_name", "_company_address", "_stored_company_address",
+                 "_reference_person", "_stored_reference_person", "invoice_email",
+                 "related_users")
 
     def __init__(self, id: str = None,
                        company_name: str = None,
@@ -20,17 +84,64 @@ class Company(Customer):
         self.invoice_email: str = invoice_email
         self.related_users: list = related_users
 
-        # Initialize the database connection
-        self.get_database()
-
     def get_database(self) -> Database:
         """
-        Initialize the database object with the company data.
+        Build a database object holding the current company data.
 
         Returns:
             Database: The database object for storing/retrieving company data.
         """
-        self.database = Database(self.DB_LOCATION, self.to_dict(), Company.__name__)
+        return Database(self.DB_LOCATION, self.to_record(), Company.__name__)
+
+    @property
+    def database(self) -> Database:
+        """
+        Database: The database object for the company, built on each access
+        instead of being kept on the company.
+        """
+        return self.get_database()
+
+    @property
+    def company_address(self) -> dict:
+        """
+        dict: The address of the company, decoded from the stored JSON on
+        first access.
+        """
+        if self._stored_company_address is not None:
+            self._company_address = FieldCodec.decode(self._stored_company_address)
+            self._stored_company_address = None
+        return self._company_address
+
+    @company_address.setter
+    def company_address(self, company_address) -> None:
+        # A dictionary, or the stored JSON kept until it is accessed
+        if isinstance(company_address, str):
+            self._company_address, self._stored_company_address = \
+                None, company_address
+        else:
+            self._company_address, self._stored_company_address = \
+                company_address, None
+
+    @property
+    def reference_person(self) -> dict:
+        """
+        dict: The reference person of the company, decoded from the stored
+        JSON on first access.
+        """
+        if self._stored_reference_person is not None:
+            self._reference_person = FieldCodec.decode(self._stored_reference_person)
+            self._stored_reference_person = None
+        return self._reference_person
+
+    @reference_person.setter
+    def reference_person(self, reference_person) -> None:
+        # A dictionary, or the stored JSON kept until it is accessed
+        if isinstance(reference_person, str):
+            self._reference_person, self._stored_reference_person = \
+                None, reference_person
+        else:
+            self._reference_person, self._stored_reference_person = \
+                reference_person, None
 
     def to_dict(self) -> dict:
         """
@@ -45,7 +156,26 @@ class Company(Customer):
             'company_address': self.company_address,
             'reference_person': self.reference_person,
             'invoice_email': self.invoice_email,
-            'related_users': self.related_users
+            'related_users': FieldCodec.decode(self.related_users)
+        }
+
+    def to_record(self) -> dict:
+        """
+        Convert the company details to a record for storage, with the
+        nested fields as JSON.
+
+        Returns:
+            dict: The record of the company.
+        """
+        return {
+            'id': self.id,
+            'company_name': self.company_name,
+            'company_address': FieldCodec.encode(self.company_address),
+            'reference_person': FieldCodec.encode(self.reference_person),
+            'invoice_email': self.invoice_email,
+            'related_users': FieldCodec.encode(
+                FieldCodec.decode(self.related_users)
+            )
         }
 
     def from_dict_to_self(self, dictionary: dict) -> None:
@@ -63,19 +193,82 @@ class Company(Customer):
             self.invoice_email = dictionary.get('invoice_email')
             self.related_users = dictionary.get('related_users')
 
+    @staticmethod
+    def parse_related_users(related_users) -> list:
+        """
+        Reads the related users of a company as stored in the table.
+
+        Args:
+            related_users (list | str): The user IDs, or their list as written
+                in the company table.
+
+        Returns:
+            list: The user IDs.
+        """
+        users = FieldCodec.decode(related_users)
+        return [str(user_id) for user_id in users] \
+            if isinstance(users, (list, tuple)) else []
+
+    @staticmethod
+    def find_company_ids_by_user(user_id: str) -> list:
+        """
+        Find the companies a user is related to.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            list: The sorted IDs of the companies.
+        """
+        return CompanyUsersIndex.get().get_company_ids(user_id)
+
     def add(self) -> None:
         """
         Adds the current company instance to the database.
         """
-        self.get_database()  # Ensure the database is set up
-        self.database.add()  # Add the company data to the database
+        # Add the company data to the database and the loaded indexes
+        TableIndex.write_through(self.INDEXES, self.to_record(), self.database.add)
 
-    def delete(self) -> None:
+    @staticmethod
+    def add_many(companies: list) -> int:
+        """
+        Adds several new companies with one append to the database and its
+        loaded indexes. Their IDs are not checked.
+
+        Args:
+            companies (list): The Company objects.
+
+        Returns:
+            int: The number of companies added.
+        """
+        if len(companies) == 0:
+            return 0
+        records = [company.to_record() for company in companies]
+        database = Database(Company.DB_LOCATION, records[0], Company.__name__)
+        return TableIndex.write_many_through(Company.INDEXES, records,
+                                             lambda: database.add_many(records))
+
+    def delete(self) -> bool:
         """
         Deletes the current company instance from the database.
+
+        A company with orders is kept, its orders must be deleted first.
+        They are found through the order customer index.
+
+        Returns:
+            bool: True if the company was deleted.
+
+        Raises:
+            ValueError: If the company still has orders.
         """
-        self.get_database()  # Ensure the database is set up
-        self.database.delete()  # Delete the company data from the database
+        order_ids = self.get_order_ids()
+        if len(order_ids) > 0:
+            raise ValueError(f"[i] Company with id {self.id} has "
+                             f"{len(order_ids)} orders")
+
+        # Delete the company data from the database and the loaded indexes
+        return bool(TableIndex.delete_through(self.INDEXES, self.id,
+                                              self.database.delete))
 
     def find(self) -> bool:
         """
@@ -84,16 +277,33 @@ class Company(Customer):
         Returns:
             bool: True if the company is found, False otherwise.
         """
-        self.get_database()  # Ensure the database is set up
         response = self.database.find_by_id(self.id)
         if response != None:
             self.from_dict_to_self(response)  # Populate object with found data
             return True
         return False
 
+    @staticmethod
+    def find_many(ids) -> dict:
+        """
+        Find several companies in a single pass over the database.
+
+        Args:
+            ids (iterable): The IDs of the companies.
+
+        Returns:
+            dict: The found IDs mapped to their Company object.
+        """
+        companies = {}
+        for id, record in Company().database.find_by_ids(ids).items():
+            company = Company()
+            company.from_dict_to_self(record)
+            companies[id] = company
+        return companies
+
     def update(self) -> None:
         """
         Update the company in the database with its current details.
         """
-        self.get_database()  # Ensure the database is set up
-        self.database.update()  # Update the company in the database
+        # Update the company in the database and the loaded indexes
+        TableIndex.write_through(self.INDEXES, self.to_record(), self.database.update)
@@ -0,0 +1,212 @@
+import numpy as np
+from database.fleet_state import FleetState
+from domain.order import Order, OrderStatus
+from domain.vehicle import Vehicle, VehicleStatusType, VehicleType
+from helpers.allocation import Allocation
+
+
+class ShipmentConsolidator:
+    """
+    Allocates the pending orders of a dispatch window in groups.
+
+    Pending orders are open orders without a vehicle. They are grouped by
+    delivery city, country and date in one pass over the order table, and
+    each group is packed into as few trucks and bikes as possible instead of
+    looking for a vehicle order by order.
+
+    A vehicle serves one group per run. Once a group uses it, it is left out
+    of the other groups of the run. The capacity taken by the group is
+    reserved on the vehicle, which stays free, so later runs and single
+    allocations only see the capacity it has left.
+
+    Attributes:
+        VEHICLE_TYPES (tuple): The vehicle types used for consolidation.
+    """
+
+    VEHICLE_TYPES = (VehicleType.TRUCK, VehicleType.BIKE)
+
+    def get_pending_groups(self, delivery_date: str = None) -> dict:
+        """
+        Groups the pending orders by delivery city, country and date.
+
+        Args:
+            delivery_date (str, optional): Only group orders for this date.
+
+        Returns:
+            dict: (city, country, delivery date) keys mapped to the list of
+            pending order records.
+        """
+        groups = {}
+        for record in Order.iter_records():
+            order_status = OrderStatus(int(record['order_status']))
+            if not order_status.is_open() or record['vehicle_id'] != "":
+                continue
+            if delivery_date is not None and record['delivery_date'] != delivery_date:
+                continue
+
+            key = (record['delivery_city'].lower(),
+                   record['delivery_country'].lower(),
+                   record['delivery_date'])
+            groups.setdefault(key, []).append(record)
+
+        return groups
+
+    def get_free_vehicles(self) -> list:
+        """
+        Gets the free vehicles of the consolidation types.
+
+        Returns:
+            list: The free Vehicle objects.
+        """
+        if FleetState.active is not None:
+            records = FleetState.active.iter_records()
+        else:
+            records = Vehicle().database.iter_records()
+
+        vehicles = []
+        type_values = [vehicle_type.value for vehicle_type in self.VEHICLE_TYPES]
+        for record in records:
+            if int(record['status']) == VehicleStatusType.FREE.value \
+                and int(record['type']) in type_values:
+                    vehicle = Vehicle()
+                    vehicle.from_dict_to_self(record)
+                    vehicles.append(vehicle)
+        return vehicles
+
+    def pack_group(self, loads: list, capacities: np.ndarray,
+                   max_capacities: np.ndarray, available: np.ndarray) -> list:
+        """
+        Packs the orders of one group into as few vehicles as possible.
+
+        When a single vehicle can take the whole rest of the group, the one
+        that the rest fills the most is used. Otherwise the vehicle covering
+        the largest share of the rest is filled first, heaviest order first.
+
+        Args:
+            loads (list): The (number_of_items, weight, volume) of each order.
+            capacities (np.ndarray): Remaining capacities with one row per
+                vehicle, updated in place as orders are packed.
+            max_capacities (np.ndarray): Maximum capacities per vehicle.
+            available (np.ndarray): Whether each vehicle is still free of
+                other groups, cleared in place for the vehicles used.
+
+        Returns:
+            list: The vehicle index per order, or -1 for orders left pending.
+        """
+        assignments = [-1] * len(loads)
+        remaining = sorted(range(len(loads)), key=lambda i: loads[i][1],
+                           reverse=True)
+        excluded = ~available
+
+        while len(remaining) > 0 and not excluded.all():
+            demand = np.sum([loads[i] for i in remaining], axis=0)
+            index = Allocation.best_fit(capacities[:, 0], capacities[:, 1],
+                                        capacities[:, 2], max_capacities,
+                                        *demand, mask=~excluded)
+            if index < 0:
+                # Share of the remaining demand each vehicle could carry
+                coverage = np.min(capacities / np.maximum(demand, 1e-9), axis=1)
+                index = int(np.argmax(np.where(excluded, -np.inf, coverage)))
+
+            packed = []
+            for order_index in remaining:
+                load = np.array(loads[order_index])
+                if (capacities[index] >= load).all():
+                    capacities[index] -= load
+                    assignments[order_index] = index
+                    packed.append(order_index)
+
+            excluded[index] = True  # Each vehicle is filled once per group
+            if len(packed) > 0:
+                available[index] = False  # And serves no other group
+            remaining = [i for i in remaining if i not in packed]
+
+        return assignments
+
+    def consolidate(self, delivery_date: str = None) -> list:
+        """
+        Allocates all pending orders, one delivery group at a time.
+
+        Args:
+            delivery_date (str, optional): Only allocate orders for this date.
+
+        Returns:
+            list: A summary per group with the delivery location and date,
+            the vehicles used and the orders left pending. The capacity of
+            the orders is reserved on the vehicles used.
+        """
+        groups = self.get_pending_groups(delivery_date)
+        vehicles = self.get_free_vehicles()
+        if len(groups) == 0:
+            return []
+
+        capacities = np.array([
+            [vehicle.remaining_item_capacity, vehicle.remaining_kg_capacity,
+             vehicle.remaining_volume_capacity] for vehicle in vehicles
+        ], dtype=float).reshape(-1, 3)
+        max_capacities = np.array(
+            [vehicle.get_max_capacity() for vehicle in vehicles], dtype=float
+        ).reshape(-1, 3)
+        available = np.ones(len(vehicles), dtype=bool)
+
+        item_volumes = {}
+        loaded = {}  # Vehicle index mapped to its total load
+        packed_groups = []
+        for records in groups.values():
+            loads = [Order.get_load_from_record(record, item_volumes)
+                     for record in records]
+            assignments = [-1] * len(records)
+            if len(vehicles) > 0:
+                assignments = self.pack_group(loads, capacities, max_capacities,
+                                              available)
+
+            for load, index in zip(loads, assignments):
+                if index >= 0:
+                    total = loaded.setdefault(index, [0, 0.0, 0.0])
+                    for dimension, value in enumerate(load):
+                        total[dimension] += value
+            packed_groups.append((records, assignments))
+
+        # The capacity is reserved before any order is assigned, and the
+        # orders of a vehicle that could not be saved are left pending
+        reserved = {
+            index for index, (number_of_items, weight, volume) in loaded.items()
+            if vehicles[index].reserve_capacity(number_of_items, round(weight, 2),
+                                                round(volume, 2))
+        }
+
+        order_updates = []
+        summaries = []
+        for records, assignments in packed_groups:
+            vehicle_ids = set()
+            pending = []
+            for record, index in zip(records, assignments):
+                if index not in reserved:
+                    pending.append(record['id'])
+                    continue
+                record['vehicle_id'] = vehicles[index].id
+                order_updates.append(record)
+                vehicle_ids.add(vehicles[index].id)
+
+            summaries.append({
+                'delivery_city': records[0]['delivery_city'],
+                'delivery_country': records[0]['delivery_country'],
+                'delivery_date': records[0]['delivery_date'],
+                'orders': len(records),
+                'vehicles': sorted(vehicle_ids),
+                'pending_orders': pending,
+            })
+
+        # One rewrite for all orders, the capacity goes back if it fails
+        try:
+            Order().database.update_many(order_updates)
+        except Exception as error:
+            for index in reserved:
+                number_of_items, weight, volume = loaded[index]
+                vehicles[index].release_capacity(
+                    number_of_items, round(weight, 2), round(volume, 2)
+                )
+            print(f"[i] Failed to assign the pending orders. \n{error}")
+            return []
+
+        return summaries
@@ -1,4 +1,5 @@
 from enum import Enum
+from database.index import IdIndex, TableIndex
 
 # Enum to define the types of customers
 class CustomerType(Enum):
@@ -7,7 +8,98 @@ class CustomerType(Enum):
 
 # Customer class represents a general customer with an ID and type
 class Customer:
+    __slots__ = ("id", "type")  # No per-instance __dict__
+
     def __init__(self, id: str = None,  # Customer ID
                        type: CustomerType = None):  # Type (COMPANY or PRIVATE)
-        self.id = id,  # Initialize customer ID (stored as a tuple)
+        self.id = id  # Initialize customer ID
         self.type = type  # Initialize customer type (COMPANY or PRIVATE)
+
+    def get_order_ids(self) -> list:
+        """
+        Gets the orders of the customer, from the order customer index.
+
+        Returns:
+            list: The sorted IDs of the orders.
+        """
+        return OrderCustomerIndex.get().get_order_ids(self.id)
+
+
+class CustomerIndex(IdIndex):
+    """
+    The IDs of the customers of one customer table.
+
+    Each customer table has its own index, and together they form the
+    customer directory: the type and table of any customer ID, without
+    reading either table.
+
+    Attributes:
+        CUSTOMER_TYPE (CustomerType): The type of the customers of the table.
+    """
+
+    CUSTOMER_TYPE = None
+
+
+class PrivateCustomerIndex(CustomerIndex):
+    """
+    The IDs of the private customers, from the person table.
+    """
+
+    DB_LOCATION = "database/person.csv"
+    CUSTOMER_TYPE = CustomerType.PRIVATE
+
+
+class CorporateCustomerIndex(CustomerIndex):
+    """
+    The IDs of the corporate customers, from the company table.
+    """
+
+    DB_LOCATION = "database/company.csv"
+    CUSTOMER_TYPE = CustomerType.COMPANY
+
+
+class OrderCustomerIndex(TableIndex):
+    """
+    The orders of each customer, from the customer_id column of the order
+    table.
+
+    It is the foreign key index of the orders: a customer with orders is
+    found without reading the order table, so deleting a customer can check
+    its orders cheaply.
+    """
+
+    DB_LOCATION = "database/order.csv"
+    COLUMNS = ("id", "customer_id")
+
+    def clear(self) -> None:
+        self.orders_by_customer = {}
+        self.customer_by_order = {}
+
+    def add_record(self, record: dict) -> None:
+        id = str(record['id'])
+        self.remove_record(id)
+
+        customer_id = str(record['customer_id'] or "")
+        if customer_id != "":
+            self.customer_by_order[id] = customer_id
+            self.orders_by_customer.setdefault(customer_id, set()).add(id)
+
+    def remove_record(self, id: str) -> None:
+        customer_id = self.customer_by_order.pop(id, None)
+        if customer_id is not None:
+            orders = self.orders_by_customer[customer_id]
+            orders.discard(id)
+            if len(orders) == 0:
+                del self.orders_by_customer[customer_id]
+
+    def get_order_ids(self, customer_id: str) -> list:
+        """
+        Gets the orders of a customer.
+
+        Args:
+            customer_id (str): The ID of the customer.
+
+        Returns:
+            list: The sorted IDs of the orders.
+        """
+        return sorted(self.orders_by_customer.get(customer_id, ()))
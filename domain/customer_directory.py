@@ -0,0 +1,108 @@
+from database.identity_map import IdentityMap
+from domain.company import Company
+from domain.customer import (Customer, CustomerType, CorporateCustomerIndex,
+                             PrivateCustomerIndex)
+from domain.person import Person
+
+
+class CustomerDirectory:
+    """
+    Resolves a customer ID to a private or a corporate customer.
+
+    The directory is made of the customer index of each customer table,
+    kept in step with the writes to both tables, so the type of a customer
+    is found with a lookup instead of a scan of the person and company
+    tables.
+
+    Attributes:
+        CUSTOMER_CLASSES (dict): The index and the class of each customer type.
+    """
+
+    CUSTOMER_CLASSES = {
+        CustomerType.PRIVATE: (PrivateCustomerIndex, Person),
+        CustomerType.COMPANY: (CorporateCustomerIndex, Company),
+    }
+
+    @staticmethod
+    def locate(id: str) -> tuple:
+        """
+        Finds the type and the table of a customer.
+
+        Args:
+            id (str): The ID of the customer.
+
+        Returns:
+            tuple: The CustomerType and the path to the table of the
+            customer, or None if no customer has the ID.
+        """
+        for customer_type, (index_class, _) in CustomerDirectory.CUSTOMER_CLASSES.items():
+            if str(id) in index_class.get().ids:
+                return customer_type, index_class.DB_LOCATION
+        return None
+
+    @staticmethod
+    def get_type(id: str) -> CustomerType:
+        """
+        Finds the type of a customer.
+
+        Args:
+            id (str): The ID of the customer.
+
+        Returns:
+            CustomerType: The type, or None if no customer has the ID.
+        """
+        location = CustomerDirectory.locate(id)
+        return location[0] if location is not None else None
+
+    @staticmethod
+    def find(id: str) -> Customer:
+        """
+        Loads a customer of either type, through the identity map if any.
+
+        Args:
+            id (str): The ID of the customer.
+
+        Returns:
+            Customer: The Person or Company, or None if it doesn't exist.
+        """
+        customer_type = CustomerDirectory.get_type(id)
+        if customer_type is None:
+            return None
+        customer_class = CustomerDirectory.CUSTOMER_CLASSES[customer_type][1]
+
+        identity_map = IdentityMap.current()
+        if identity_map is not None:
+            customer = identity_map.get(customer_class.__name__, id)
+            if customer is not None:
+                return customer
+
+        customer = customer_class(id)
+        if not customer.find():
+            return None
+        if identity_map is not None:
+            identity_map.add(customer)
+        return customer
+
+    @staticmethod
+    def find_many(ids) -> dict:
+        """
+        Loads several customers of either type, reading each table at most
+        once.
+
+        Args:
+            ids (iterable): The IDs of the customers.
+
+        Returns:
+            dict: The found IDs mapped to their Person or Company object.
+        """
+        ids_by_type = {}
+        for id in set(ids):
+            customer_type = CustomerDirectory.get_type(id) if id else None
+            if customer_type is not None:
+                ids_by_type.setdefault(customer_type, set()).add(id)
+
+        customers = {}
+        for customer_type, type_ids in ids_by_type.items():
+            customer_class = CustomerDirectory.CUSTOMER_CLASSES[customer_type][1]
+            customers.update(customer_class.find_many(type_ids))
+        return customers
@@ -1,12 +1,20 @@
+import csv
+import os
+import threading
+import time
 from enum import Enum
+from types import MappingProxyType
 
 # Enum to define the types of items
 class ItemType(Enum):
     FRAGILE = 1
     SOLID = 2
 
-# Class to represent the volume of an item with width, length, and height
+# Class to represent the volume of an item with width, length, and height,
+# in decimetres so the volume is in litres
 class Volume:
+    __slots__ = ("width", "length", "height")
+
     def __init__(self, 
                  width: float = None,
                  length: float = None,
@@ -16,8 +24,14 @@ class Volume:
         self.length = length
         self.height = height
 
+    # Method to get the space taken by the item
+    def get_volume(self) -> float:
+        return self.width * self.length * self.height
+
 # Class to represent an item to be delivered
 class Item:
+    __slots__ = ("id", "price_per_kg", "volume", "weight", "type")
+
     def __init__(self,
                     id: str = None,
                     price_per_kg: float = None,
@@ -31,23 +45,97 @@ class Item:
         self.weight = weight
         self.type = type
 
+# Class to hold the process-wide, read-only catalog of items
+class ItemCatalog:
+    """
+    The catalog of items, loaded once per process from a CSV data file.
+
+    Items are kept in a read-only mapping keyed by item ID, so lookups take
+    constant time whatever the size of the catalog. The data file is checked
+    at most once every RELOAD_CHECK_INTERVAL seconds and the catalog is only
+    reloaded when the file has changed. A reload builds a new mapping and
+    swaps it in, so readers never see a half loaded catalog.
+
+    Attributes:
+        DB_LOCATION (str): Path to the catalog data file.
+        RELOAD_CHECK_INTERVAL (float): Seconds between checks of the file.
+        instance (ItemCatalog): The catalog shared by the process.
+    """
+
+    DB_LOCATION = "database/items.csv"
+    RELOAD_CHECK_INTERVAL = 1.0
+
+    instance = None
+    lock = threading.Lock()
+
+    def __init__(self, path: str = DB_LOCATION) -> None:
+        self.path = path
+        self.items_by_id = MappingProxyType({})
+        self.items = ()
+        self.signature = None
+        self.last_check = time.monotonic()
+        self.load()
+
+    # Method to get the catalog of the process, loading it on first use
+    @classmethod
+    def get(cls) -> "ItemCatalog":
+        if cls.instance is None:
+            with cls.lock:
+                if cls.instance is None:
+                    cls.instance = cls()
+        else:
+            cls.instance.reload_if_changed()
+        return cls.instance
+
+    # Method to read all items from the data file
+    def load(self) -> None:
+        stat = os.stat(self.path)
+        items = {}
+        with open(self.path, mode='r', newline='') as csv_file:
+            for record in csv.DictReader(csv_file, delimiter=','):
+                volume = Volume(float(record['width']),
+                                float(record['length']),
+                                float(record['height']))
+                items[record['id']] = Item(record['id'],
+                                           float(record['price_per_kg']),
+                                           volume,
+                                           float(record['weight']),
+                                           ItemType[record['type']])
+
+        self.items_by_id = MappingProxyType(items)
+        self.items = tuple(items.values())
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+
+    # Method to reload the catalog if the data file has changed
+    def reload_if_changed(self) -> None:
+        now = time.monotonic()
+        if now - self.last_check < self.RELOAD_CHECK_INTERVAL:
+            return
+        self.last_check = now
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return  # Keep serving the loaded catalog
+
+        if (stat.st_mtime_ns, stat.st_size) != self.signature:
+            with self.lock:
+                self.load()
+
+    # Method to get an item by its unique ID
+    def get_item_by_id(self, item_id: str) -> Item:
+        return self.items_by_id.get(item_id)  # None if not found
+
+
 # Class to represent a collection of items
 class ItemList:
     def __init__(self) -> None:
         self.items = self.add_items()  # Add items to the list upon initialization
 
-    # Method to add predefined items to the item list
-    def add_items(self) -> None:
-        return [
-            Item("0025", 10, Volume(1, 1, 1), 0.25, ItemType.SOLID),
-            Item("0100", 10, Volume(1, 1, 1), 1.00, ItemType.SOLID),
-            Item("0500", 50, Volume(1, 1, 1), 5.00, ItemType.FRAGILE),
-            Item("2100", 50, Volume(1, 1, 1), 21.00, ItemType.FRAGILE),
-            Item("7500", 50, Volume(1, 1, 1), 75.00, ItemType.FRAGILE),
-        ]
+    # Method to add the items of the catalog to the item list
+    def add_items(self) -> tuple:
+        return ItemCatalog.get().items
 
     # Method to get an item by its unique ID
     def get_item_by_id(self, item_id: str) -> Item:
-        # Search for the item in the list by its ID and return it if found
-        item = next((item for item in self.items if item.id == item_id), None)
-        return item  # Return the found item or None if not found
+        return ItemCatalog.get().get_item_by_id(item_id)
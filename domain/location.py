@@ -1,36 +1,126 @@
 class Location:
     """Class to represent a geographical location with a city and a country."""
-    
+
+    __slots__ = ("city", "country", "latitude", "longitude")
+
     def __init__(self,
                  city: str = None,
-                 country: str = None
+                 country: str = None,
+                 latitude: float = None,
+                 longitude: float = None
                 ) -> None:
         self.city: str = city
         self.country: str = country
+        self.latitude: float = latitude    # In degrees, None if unknown
+        self.longitude: float = longitude  # In degrees, None if unknown
+
+
+class LocationRegistry:
+    """
+    The known cities of the process, with their coordinates.
+
+    The registry is built once per process. Cities are found by their name
+    through a dictionary of case-folded names. The Location objects are
+    shared, they must not be changed.
+
+    Attributes:
+        CITIES (tuple): The city, country, latitude and longitude of each
+            known city.
+        instance (LocationRegistry): The registry of the process.
+    """
+
+    CITIES = (
+        ("Gothenburg", "Sweden", 57.7089, 11.9746),
+        ("Lerum", "Sweden", 57.7705, 12.2690),
+        ("Partille", "Sweden", 57.7394, 12.1064),
+        ("Molndal", "Sweden", 57.6554, 12.0138),
+        ("Stockholm", "Sweden", 59.3293, 18.0686),
+        ("Malmo", "Sweden", 55.6050, 13.0038),
+    )
+
+    instance = None
+
+    def __init__(self, cities: tuple = CITIES) -> None:
+        """
+        Builds a registry.
+
+        Args:
+            cities (tuple): The city, country, latitude and longitude of
+                each city.
+        """
+        self.locations = [Location(*city) for city in cities]
+        self.rows = {location.city.casefold(): row
+                     for row, location in enumerate(self.locations)}
+
+    @classmethod
+    def get(cls) -> "LocationRegistry":
+        """
+        Gets the registry of the process, built on first use.
+
+        Returns:
+            LocationRegistry: The registry.
+        """
+        if cls.instance is None:
+            cls.instance = cls()
+        return cls.instance
+
+    def get_row(self, city_name: str) -> int:
+        """
+        Gets the position of a city in the list of locations.
+
+        Args:
+            city_name (str): The name of the city, in any case.
+
+        Returns:
+            int: The row, or None if the city is not known.
+        """
+        if not isinstance(city_name, str):
+            return None
+        return self.rows.get(city_name.strip().casefold())
+
+    def find(self, city_name: str) -> Location:
+        """
+        Finds a city by its name.
+
+        Args:
+            city_name (str): The name of the city, in any case.
+
+        Returns:
+            Location: The shared location, or None if the city is not known.
+        """
+        row = self.get_row(city_name)
+        return self.locations[row] if row is not None else None
+
+    def resolve(self, city: str, country: str) -> Location:
+        """
+        Gets the location of a stored city and country, with its
+        coordinates when the city is known.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+
+        Returns:
+            Location: The shared location of a known city, or a new
+            location without coordinates.
+        """
+        location = self.find(city)
+        if location is not None and location.country == country:
+            return location
+        return Location(city, country)
 
 
 class LocationList:
     """Class to manage a list of locations with various cities."""
-    
+
     def __init__(self) -> None:
         self.cities: list = self.add_cities()
 
-    # Method to add predefined cities to the list of locations
-    def add_cities(self) -> None:
-        return [
-            Location("Gothenburg", "Sweden"),
-            Location("Lerum", "Sweden"),
-            Location("Partille", "Sweden"),
-            Location("Molndal", "Sweden"),
-            Location("Stockholm", "Sweden"),
-            Location("Malmo", "Sweden")
-        ]
-    
+    # Method to add the known cities to the list of locations
+    def add_cities(self) -> list:
+        return LocationRegistry.get().locations
+
     # Method to get a location by the name of the city
     def get_city_by_name(self, city_name: str) -> Location:
-        # Search for the location by city name (case insensitive)
-        location = next((
-            location for location in self.cities
-            if location.city.lower() == city_name.lower()
-        ), None)
-        return location  # Return the found location or None if not found
+        # Case-insensitive lookup in the registry
+        return LocationRegistry.get().find(city_name)
@@ -1,11 +1,19 @@
+import csv
+import json
+import os
+import time
 from enum import Enum
 from database.database import Database
-from domain.customer import Customer
-from domain.item import ItemList
-from domain.location import Location
+from database.fixed_width_database import FixedWidthDatabase
+from database.identity_map import IdentityMap, LazyReference
+from database.index import TableIndex
+from domain.customer import Customer, OrderCustomerIndex
+from domain.customer_directory import CustomerDirectory
+from domain.item import ItemCatalog
+from domain.location import Location, LocationRegistry
 from domain.payment_details import PaymentDetails
-from domain.person import Person
 from domain.vehicle import Vehicle
+from helpers.item_codec import ItemCodec
 
 
 class Priority(Enum):
@@ -25,14 +33,372 @@ class OrderStatus(Enum):
     DELIVERED = 2
     CANCELLED = 3
 
+    def is_open(self) -> bool:
+        """
+        Checks if an order with this status still holds vehicle capacity.
+
+        Returns:
+            bool: True if the order is still being processed.
+        """
+        return self == OrderStatus.PROCESSING
+
+
+class OrderStatusIndex(TableIndex):
+    """
+    The status of every order, read from the id and order_status columns
+    of the order table only.
+
+    It serves status lookups without building and hydrating an Order, with
+    the status of the OrderStatusLog first. Order.update() writes through
+    it, so an update is applied to the index instead of reading the table
+    again.
+    """
+
+    DB_LOCATION = "database/order.csv"
+    COLUMNS = ("id", "order_status")
+
+    # Status of each stored value, to skip the Enum lookup per row
+    STATUSES = {str(order_status.value): order_status
+                for order_status in OrderStatus}
+
+    def clear(self) -> None:
+        self.statuses = {}
+
+    def add_record(self, record: dict) -> None:
+        self.statuses[record['id']] = self.STATUSES[str(record['order_status'])]
+
+    def remove_record(self, id: str) -> None:
+        self.statuses.pop(id, None)
+
+    def get_status(self, id: str) -> OrderStatus:
+        """
+        Gets the status of an order, the latest one of the status log first.
+
+        Args:
+            id (str): The ID of the order.
+
+        Returns:
+            OrderStatus: The status, or None if the order doesn't exist.
+        """
+        if id not in self.statuses:
+            return None  # Never added, or deleted since its last change
+        order_status = OrderStatusLog.get().get_status(id)
+        if order_status is None:
+            order_status = self.statuses[id]
+        return order_status
+
+
+class OrderStatusLog(TableIndex):
+    """
+    The append-only log of order status changes, with the current state
+    compacted in memory.
+
+    A status change is one appended row with its time, instead of a rewrite
+    of the order table. The current status of each order and the total time
+    spent in each open status are updated per event as the log is read, so
+    they never need a scan. Time stops counting once an order is closed
+    (DELIVERED or CANCELLED) or deleted. A row without a status records the
+    deletion of an order.
+
+    compact() brings the order table up to date once COMPACT_THRESHOLD
+    changes are in the log. It saves the state in a snapshot next to the
+    log, with the part of the log it covers, and starts the log over. The
+    log is then read on top of the snapshot, so it only ever holds the
+    changes since the last compaction. Until then the readers of orders
+    overlay the status of the log.
+
+    Attributes:
+        DB_LOCATION (str): Path to the status log.
+        COMPACT_THRESHOLD (int): Status changes between two compactions.
+    """
+
+    DB_LOCATION = "database/order_status_log.csv"
+    COLUMNS = ("order_id", "order_status", "changed_at")
+    COMPACT_THRESHOLD = 1000
+
+    STATUSES = OrderStatusIndex.STATUSES
+
+    def __init__(self, path: str) -> None:
+        self.snapshot_path = f"{path}.snapshot"
+        super().__init__(path)
+
+    def clear(self) -> None:
+        # Order ID mapped to (status, changed at), for the orders changed
+        # since the last compaction and the open orders
+        self.current = {}
+        self.time_in_status = {status: 0 for status in OrderStatus
+                               if status.is_open()}
+        # Open orders in each status, and the sum of their start times
+        self.open_count = {status: 0 for status in self.time_in_status}
+        self.open_since = {status: 0 for status in self.time_in_status}
+        self.pending_changes = 0  # Changes appended since the last compaction
+        self.covered = None       # Inode and size of the log in the snapshot
+        self.load_snapshot()
+
+    def load_snapshot(self) -> None:
+        """
+        Loads the state saved by the last compaction, if any.
+        """
+        try:
+            with open(self.snapshot_path, mode='r') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except FileNotFoundError:
+            return
+
+        for status_value, milliseconds in snapshot['time_in_status'].items():
+            self.time_in_status[self.STATUSES[status_value]] = milliseconds
+        for id, status_value, since in snapshot['open_orders']:
+            order_status = self.STATUSES[str(status_value)]
+            self.current[id] = (order_status, since)
+            self.open_count[order_status] += 1
+            self.open_since[order_status] += since
+        self.covered = (snapshot['log_inode'], snapshot['log_size'])
+
+    def read(self) -> None:
+        if self.offset == 0 and self.covered is not None:
+            # Skip the rows of the log already in the snapshot, when the
+            # compaction stopped before starting the log over
+            try:
+                status = os.stat(self.path)
+            except FileNotFoundError:
+                return
+            if status.st_ino == self.covered[0]:
+                self.positions = [(column, position)
+                                  for position, column in enumerate(self.COLUMNS)]
+                self.offset = self.covered[1]
+        super().read()
+
+    def add_record(self, record: dict) -> None:
+        changed_at = int(record['changed_at'])
+        previous = self.current.pop(record['order_id'], None)
+        if previous is not None and previous[0].is_open():
+            # Close the time of the order in its previous open status
+            previous_status, since = previous
+            self.time_in_status[previous_status] += changed_at - since
+            self.open_count[previous_status] -= 1
+            self.open_since[previous_status] -= since
+        self.pending_changes += 1
+
+        if str(record['order_status']) == "":
+            return  # The order was deleted
+
+        order_status = self.STATUSES[str(record['order_status'])]
+        self.current[record['order_id']] = (order_status, changed_at)
+        if order_status.is_open():
+            self.open_count[order_status] += 1
+            self.open_since[order_status] += changed_at
+
+    @classmethod
+    def append(cls, id: str, order_status: OrderStatus) -> bool:
+        """
+        Appends a status change of an order to the log.
+
+        Args:
+            id (str): The ID of the order.
+            order_status (OrderStatus): The new status, or None when the
+                order is deleted.
+
+        Returns:
+            bool: True if the change was logged.
+        """
+        record = {
+            'order_id': id,
+            'order_status': order_status.value if order_status is not None else "",
+            'changed_at': time.time_ns() // 1_000_000,  # Milliseconds
+        }
+        database = Database(cls.DB_LOCATION, record, "Order status")
+        logged = cls.write(
+            record, lambda: database.add(skip_existence_check=True)
+        )
+
+        status_log = cls.get()
+        if status_log.pending_changes >= cls.COMPACT_THRESHOLD:
+            status_log.compact()
+        return logged
+
+    @classmethod
+    def append_many(cls, ids: list, order_status: OrderStatus) -> bool:
+        """
+        Appends the same status change of several orders to the log, with a
+        single write.
+
+        Args:
+            ids (list): The IDs of the orders.
+            order_status (OrderStatus): The new status, or None when the
+                orders are deleted.
+
+        Returns:
+            bool: True if the changes were logged.
+        """
+        changed_at = time.time_ns() // 1_000_000  # Milliseconds
+        records = [{
+            'order_id': id,
+            'order_status': order_status.value if order_status is not None else "",
+            'changed_at': changed_at,
+        } for id in ids]
+        if len(records) == 0:
+            return True
+
+        database = Database(cls.DB_LOCATION, records[0], "Order status")
+        logged = cls.write_many(records, lambda: database.add_many(records))
+
+        status_log = cls.get()
+        if status_log.pending_changes >= cls.COMPACT_THRESHOLD:
+            status_log.compact()
+        return bool(logged)
+
+    def get_status(self, id: str) -> OrderStatus:
+        """
+        Gets the current status of an order.
+
+        Args:
+            id (str): The ID of the order.
+
+        Returns:
+            OrderStatus: The status, or None if the order has no logged change.
+        """
+        current = self.current.get(id)
+        return current[0] if current is not None else None
+
+    def get_time_in_status(self, now: int = None) -> dict:
+        """
+        Gets the total time the orders have spent in each open status.
+
+        Args:
+            now (int, optional): The time in milliseconds since the epoch up
+                to which the current statuses count. Defaults to now.
+
+        Returns:
+            dict: Each open status mapped to the total milliseconds spent in it.
+        """
+        if now is None:
+            now = time.time_ns() // 1_000_000
+        return {
+            status: self.time_in_status[status]
+                    + self.open_count[status] * now - self.open_since[status]
+            for status in self.time_in_status
+        }
+
+    def overlay(self, record: dict) -> dict:
+        """
+        Puts the current status of the log in an order record.
+
+        Args:
+            record (dict): The order record, read from the order table.
+
+        Returns:
+            dict: The same record.
+        """
+        current = self.current.get(record['id'])
+        if current is not None:
+            record['order_status'] = current[0].value
+        return record
+
+    def compact(self) -> int:
+        """
+        Writes the current statuses of the log to the order table, saves
+        the state in the snapshot and starts the log over.
+
+        Each step leaves a state that is read back correctly: a crash after
+        the table is written replays the same statuses, and a crash after
+        the snapshot is saved skips the part of the log it covers.
+
+        Returns:
+            int: The number of orders updated in the table.
+        """
+        with self.lock:
+            self.refresh()
+            records = []
+            for record in Order().database.iter_records():
+                table_status = record['order_status']
+                if str(self.overlay(record)['order_status']) != table_status:
+                    records.append(record)
+
+            # One rewrite of the table for the whole batch
+            updated = Order().database.update_many(records)
+
+            # The table holds the closed statuses now, the open orders are
+            # kept for the time they spend in their status
+            self.current = {id: current for id, current in self.current.items()
+                            if current[0].is_open()}
+            self.save_snapshot()
+
+            # Start the log over, unless another process appended meanwhile
+            if self.get_signature()[0] == self.signature:
+                temporary_path = f"{self.path}.tmp"
+                with open(temporary_path, mode='w', newline='') as log_file:
+                    csv.writer(log_file, delimiter=',').writerow(self.COLUMNS)
+                os.replace(temporary_path, self.path)
+                self.covered = None
+                self.positions = [(column, position)
+                                  for position, column in enumerate(self.COLUMNS)]
+                self.signature, self.offset = self.get_signature()
+            self.pending_changes = 0
+        return updated
+
+    def save_snapshot(self) -> None:
+        """
+        Saves the time in each status, the open orders and the part of the
+        log read so far.
+        """
+        inode = self.signature[0] if self.signature is not None else None
+        snapshot = {
+            'time_in_status': {str(status.value): milliseconds for status,
+                               milliseconds in self.time_in_status.items()},
+            'open_orders': [[id, order_status.value, since] for id,
+                            (order_status, since) in self.current.items()],
+            'log_inode': inode,
+            'log_size': self.offset,
+        }
+        # Write to a temporary file first and swap it in
+        temporary_path = f"{self.snapshot_path}.tmp"
+        with open(temporary_path, mode='w') as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+        os.replace(temporary_path, self.snapshot_path)
+
 
 class Order:
     """
     A class to represent an order, including all relevant details 
     and interactions with the database.
+
+    The customer and vehicle are lazy references: an order read from the
+    database only knows their IDs, and loads them on first access.
+
+    Orders are slotted, without a per-instance __dict__, so large batches of
+    orders can be kept in memory. The lazy references keep their state in
+    the underscore slots.
     """
 
     DB_LOCATION = "database/order.csv"
+    INDEXES = (OrderStatusIndex, OrderCustomerIndex)
+
+    # Optional fixed-width layout of the table, with in-place updates. The
+    # width of the items grows with the item catalog, see get_field_widths
+    FIXED_WIDTH = False
+    FIELD_WIDTHS = {
+        'id': 18,
+        'priority': 1,
+        'customer_id': 32,
+        'delivery_city': 32,
+        'delivery_country': 32,
+        'payment_details': 32,
+        'items': 240,
+        'total_weight': 16,
+        'order_status': 1,
+        'order_date': 8,
+        'delivery_date': 8,
+        'vehicle_id': 16,
+    }
+    field_widths = None  # The catalog items and the widths built for them
+
+    __slots__ = ("id", "priority", "_customer", "_customer_id",
+                 "delivery_location", "payment_details", "items",
+                 "total_weight", "order_status", "order_date", "delivery_date",
+                 "_vehicle", "_vehicle_id")
+
+    customer = LazyReference(Customer, CustomerDirectory.find)
+    vehicle = LazyReference(Vehicle)
 
     def __init__(self,
                     id: str = None,
@@ -58,17 +424,50 @@ class Order:
         self.delivery_date = delivery_date
         self.vehicle = vehicle
 
-        # Initialize the database connection
-        self.get_database()
-
     def get_database(self) -> Database:
         """
-        Initialize the database object with the order data.
+        Build a database object holding the current order data.
 
         Returns:
             Database: The database object for storing/retrieving order data.
         """
-        self.database = Database(self.DB_LOCATION, self.to_dict(), Order.__name__)
+        if Order.FIXED_WIDTH:
+            return FixedWidthDatabase(self.DB_LOCATION, self.to_dict(),
+                                      Order.__name__, Order.get_field_widths())
+        return Database(self.DB_LOCATION, self.to_dict(), Order.__name__)
+
+    @staticmethod
+    def get_field_widths() -> dict:
+        """
+        Gets the widths of the fixed-width layout.
+
+        The items field is wide enough for every item of the catalog at the
+        largest item capacity of a vehicle, and never narrower than in
+        FIELD_WIDTHS. The widths are built again when the catalog is
+        reloaded, and a wider layout converts the table on its next access.
+
+        Returns:
+            dict: Field names mapped to their widths.
+        """
+        catalog_items = ItemCatalog.get().items
+        if Order.field_widths is None or Order.field_widths[0] is not catalog_items:
+            max_quantity = max(capacities[0] for capacities
+                               in Vehicle.get_max_capacities().values())
+            items_width = ItemCodec.get_max_length(
+                [item.id for item in catalog_items], max_quantity
+            )
+            widths = dict(Order.FIELD_WIDTHS)
+            widths['items'] = max(widths['items'], items_width)
+            Order.field_widths = (catalog_items, widths)
+        return Order.field_widths[1]
+
+    @property
+    def database(self) -> Database:
+        """
+        Database: The database object for the order, built on each access
+        instead of being kept on the order.
+        """
+        return self.get_database()
 
     def to_dict(self) -> dict:
         """
@@ -77,9 +476,8 @@ class Order:
         Returns:
             dict: A dictionary containing all relevant order data.
         """
-        customer_id = None
-        if self.customer is not None:
-            customer_id = self.customer.id
+        # Use the referenced IDs so the customer and vehicle are not loaded
+        customer_id = self._customer_id
 
         delivery_city = None
         delivery_country = None
@@ -87,14 +485,11 @@ class Order:
             delivery_city = self.delivery_location.city
             delivery_country = self.delivery_location.country
 
-        items = []
+        items = ""
         if self.items is not None:
-            for item in self.items:
-                items.append(item.id)
+            items = ItemCodec.encode([item.id for item in self.items])
 
-        vehicle_id = None
-        if self.vehicle is not None:
-            vehicle_id = self.vehicle.id
+        vehicle_id = self._vehicle_id
 
         return {
             'id': self.id,
@@ -111,28 +506,35 @@ class Order:
             'vehicle_id': vehicle_id,
         }
 
-    def from_dict_to_self(self, dictionary: dict) -> None:
+    def from_dict_to_self(self, dictionary: dict, customers: dict = None,
+                          vehicles: dict = None) -> None:
         """
         Populate the order's attributes from a dictionary.
 
         Args:
             dictionary (dict): A dictionary containing order data.
+            customers (dict, optional): Preloaded customers by ID. When given,
+                the customer is taken from it instead of being loaded lazily.
+            vehicles (dict, optional): Preloaded vehicles by ID. When given,
+                the vehicle is taken from it instead of being loaded lazily.
         """
         if dictionary is not None:
-            # Set the customer by looking up the customer ID
-            customer = Person(dictionary.get('customer_id'))
-            if customer.find():
-                self.customer = customer
+            # Set the customer, or only its ID to load it on first access
+            if customers is not None:
+                self.customer = customers.get(dictionary.get('customer_id'))
+            else:
+                Order.customer.set_id(self, dictionary.get('customer_id'))
 
-            # Set the vehicle by looking up the vehicle ID
-            vehicle = Vehicle(dictionary.get('vehicle_id'))
-            if vehicle.find():
-                self.vehicle = vehicle
+            # Set the vehicle, or only its ID to load it on first access
+            if vehicles is not None:
+                self.vehicle = vehicles.get(dictionary.get('vehicle_id'))
+            else:
+                Order.vehicle.set_id(self, dictionary.get('vehicle_id'))
 
             # Set the other order attributes from the dictionary
             self.id = dictionary.get('id')
             self.priority = Priority(int(dictionary.get('priority')))
-            self.delivery_location = Location(
+            self.delivery_location = LocationRegistry.get().resolve(
                 dictionary.get('delivery_city'), dictionary.get('delivery_country')
             )
             self.payment_details = None
@@ -144,36 +546,195 @@ class Order:
 
     def from_list_record_to_items_list(self, items_ids_record: str) -> list:
         """
-        Convert a list of item IDs to a list of item objects.
+        Convert encoded item IDs to a list of item objects.
+
+        Each distinct item is looked up once and repeated by its quantity.
 
         Args:
-            items_ids_record (str): A string representation of item IDs.
+            items_ids_record (str): The items encoded with ItemCodec.
 
         Returns:
             list: A list of item objects.
         """
+        item_catalog = ItemCatalog.get()
         items = []
-        items_ids_string = items_ids_record.strip("[]").split(", ") if items_ids_record is not None else None
-        items_ids = []
-        if items_ids_string is not None:
-            items_ids = [item_id.strip("'") for item_id in items_ids_string]
-            for item_id in items_ids:
-                items.append(ItemList().get_item_by_id(item_id))
+        for item_id, quantity in ItemCodec.decode(items_ids_record):
+            items.extend([item_catalog.get_item_by_id(item_id)] * quantity)
         return items
 
-    def add(self) -> None:
+    def get_total_volume(self) -> float:
+        """
+        Calculate the total volume of the items in the order.
+
+        Returns:
+            float: The sum of the volumes of all items.
+        """
+        return round(sum([item.volume.get_volume() for item in self.items]), 2)
+
+    @staticmethod
+    def get_load_from_record(record: dict, item_volumes: dict) -> tuple:
+        """
+        Calculate the load of an order straight from its database record.
+
+        Args:
+            record (dict): The order record.
+            item_volumes (dict): Volume per item ID, filled as items are seen
+                so each item is only looked up once across records.
+
+        Returns:
+            tuple: The number of items, total weight and total volume.
+        """
+        number_of_items = 0
+        volume = 0
+        for item_id, quantity in ItemCodec.decode(record['items']):
+            if item_id not in item_volumes:
+                item = ItemCatalog.get().get_item_by_id(item_id)
+                item_volumes[item_id] = item.volume.get_volume() if item else 0
+            number_of_items += quantity
+            volume += item_volumes[item_id] * quantity
+
+        return number_of_items, float(record['total_weight']), round(volume, 2)
+
+    def add(self, skip_existence_check: bool = False) -> bool:
         """
         Adds the current order instance to the database.
+
+        Args:
+            skip_existence_check (bool): Skip the scan for an order with the
+                same ID, when the ID comes from IdGenerator.
+
+        Returns:
+            bool: True if the order was added.
+        """
+        # Add the order data to the database and the loaded indexes, and
+        # start its status history
+        database = self.database
+        added = TableIndex.write_through(self.INDEXES, self.to_dict(),
+                                         lambda: database.add(skip_existence_check))
+        if added:
+            OrderStatusLog.append(self.id, self.order_status)
+        return bool(added)
+
+    def place(self, skip_existence_check: bool = False) -> bool:
+        """
+        Adds the current order and takes its capacity from its vehicle.
+
+        The order and the vehicle are saved in different tables, so both
+        writes cannot be done at once. When the vehicle cannot be saved the
+        order is removed again, so no stored order holds a vehicle without
+        its capacity.
+
+        Args:
+            skip_existence_check (bool): Skip the scan for an order with the
+                same ID, when the ID comes from IdGenerator.
+
+        Returns:
+            bool: True if the order was added and its capacity reserved.
+        """
+        if not self.add(skip_existence_check):
+            return False
+        if self.vehicle is None or self.vehicle.reserve_capacity(
+                len(self.items), self.total_weight, self.get_total_volume()):
+            return True
+
+        # Compensate the add, the vehicle was left as it was
+        self.remove()
+        print(f"[i] Order with id: {self.id} removed, its vehicle could not be "
+              "updated")
+        return False
+
+    def remove(self) -> bool:
+        """
+        Deletes the current order from the database and ends its status
+        history, without changing its vehicle.
+
+        Returns:
+            bool: True if the order was deleted.
         """
-        self.get_database()  # Ensure the database is set up
-        self.database.add()  # Add the order data to the database
+        # Delete the order data from the database and the loaded indexes
+        deleted = TableIndex.delete_through(self.INDEXES, self.id,
+                                            self.database.delete)
+        if deleted:
+            OrderStatusLog.append(self.id, None)  # Ends its status history
+        return bool(deleted)
 
-    def delete(self) -> None:
+    def delete(self) -> bool:
         """
-        Deletes the current company instance from the database.
+        Deletes the current order instance from the database.
+
+        An open order gives its items, weight and volume back to its vehicle.
+        When the vehicle cannot be saved the order is added back, so the
+        order and its vehicle stay in step.
+
+        Returns:
+            bool: True if the order was deleted.
         """
-        self.get_database()  # Ensure the database is set up
-        self.database.delete() # Delete the order data from the database
+        if not self.remove():
+            return False
+        if not self.order_status.is_open() or self.vehicle is None \
+                or self.vehicle.release_capacity(len(self.items), self.total_weight,
+                                                 self.get_total_volume()):
+            return True
+
+        # Compensate the delete, the vehicle was left as it was
+        self.add(skip_existence_check=True)
+        print(f"[i] Order with id: {self.id} restored, its vehicle could not be "
+              "updated")
+        return False
+
+    @staticmethod
+    def delete_by_customer(customer_id: str) -> int:
+        """
+        Deletes all orders of a customer, found with the order customer index.
+
+        The orders are deleted with a single rewrite of the order table, and
+        the open ones give their capacity back with one save per vehicle.
+        When a vehicle cannot be saved its orders are added back, like in
+        delete().
+
+        Args:
+            customer_id (str): The ID of the customer.
+
+        Returns:
+            int: The number of orders deleted.
+        """
+        order_ids = OrderCustomerIndex.get().get_order_ids(customer_id)
+        orders = Order.find_many(order_ids)
+        ids = [order.id for order in orders]
+        if len(ids) == 0:
+            return 0
+
+        database = Order().database
+        deleted = TableIndex.delete_many_through(Order.INDEXES, ids,
+                                                 lambda: database.delete_many(ids))
+        if not deleted:
+            return 0
+        OrderStatusLog.append_many(ids, None)  # Ends their status histories
+
+        # Vehicle ID mapped to the vehicle, the load to give back and its orders
+        releases = {}
+        for order in orders:
+            if order.order_status.is_open() and order.vehicle is not None:
+                vehicle, load, vehicle_orders = releases.setdefault(
+                    order.vehicle.id, (order.vehicle, [0, 0.0, 0.0], [])
+                )
+                load[0] += len(order.items)
+                load[1] += order.total_weight
+                load[2] += order.get_total_volume()
+                vehicle_orders.append(order)
+
+        for vehicle, (number_of_items, weight, volume), vehicle_orders \
+                in releases.values():
+            if vehicle.release_capacity(number_of_items, round(weight, 2),
+                                        round(volume, 2)):
+                continue
+            # Compensate the delete, the vehicle was left as it was
+            for order in vehicle_orders:
+                order.add(skip_existence_check=True)
+            deleted -= len(vehicle_orders)
+            print(f"[i] {len(vehicle_orders)} order(s) of vehicle {vehicle.id} "
+                  "restored, the vehicle could not be updated")
+        return deleted
 
     def find(self) -> bool:
         """
@@ -182,16 +743,117 @@ class Order:
         Returns:
             bool: True if the order is found, False otherwise.
         """
-        self.get_database()  # Ensure the database is set up
         response = self.database.find_by_id(self.id)
         if response is not None:
+            OrderStatusLog.get().overlay(response)  # Latest logged status
             self.from_dict_to_self(response)  # Populate object with found data
             return True
         return False
 
+    @staticmethod
+    def iter_records():
+        """
+        Streams the order records with the latest logged status.
+
+        Yields:
+            dict: The order record.
+        """
+        status_log = OrderStatusLog.get()
+        for record in Order().database.iter_records():
+            yield status_log.overlay(record)
+
+    @staticmethod
+    def find_many(ids: list = None) -> list:
+        """
+        Find several orders and load their customers and vehicles in bulk.
+
+        The order, customer and vehicle tables are each read once for the
+        whole batch, instead of once per order for every relationship.
+
+        Args:
+            ids (list, optional): The IDs of the orders. All orders are
+                loaded when not given.
+
+        Returns:
+            list: The found Order objects, in the order of the table.
+        """
+        status_log = OrderStatusLog.get()
+        if ids is not None:
+            records = [status_log.overlay(record) for record
+                       in Order().database.find_by_ids(ids).values()]
+        else:
+            records = list(Order.iter_records())
+
+        # Fetch every related customer and vehicle once
+        customers = CustomerDirectory.find_many(
+            {record['customer_id'] for record in records}
+        )
+        vehicles = Vehicle.find_many(
+            {record['vehicle_id'] for record in records}
+        )
+
+        # Share the loaded objects with the lazy references of the request
+        identity_map = IdentityMap.current()
+        if identity_map is not None:
+            for object in list(customers.values()) + list(vehicles.values()):
+                identity_map.add(object)
+
+        orders = []
+        for record in records:
+            order = Order()
+            order.from_dict_to_self(record, customers, vehicles)
+            orders.append(order)
+        return orders
+
     def update(self) -> None:
         """
         Update the order in the database with its current details.
         """
-        self.get_database()  # Ensure the database is set up
-        self.database.update()
+        # Keep the loaded indexes in step with the table
+        TableIndex.write_through(self.INDEXES, self.to_dict(), self.database.update)
+
+    def change_status(self, order_status: OrderStatus) -> bool:
+        """
+        Change the status of the order and adjust the vehicle capacity.
+
+        Closing an order (DELIVERED or CANCELLED) gives its items, weight and
+        volume back to the vehicle, and reopening it takes them again. Only the
+        delta of this order is applied, the other orders are not read.
+
+        The change is appended to the status log, the order table is
+        updated by the next compaction of the log. When the vehicle cannot
+        be saved the previous status is logged again, so the order and its
+        vehicle stay in step.
+
+        Args:
+            order_status (OrderStatus): The new status of the order.
+
+        Returns:
+            bool: True if the status was changed.
+        """
+        previous_status = self.order_status
+        if not OrderStatusLog.append(self.id, order_status):
+            return False
+        self.order_status = order_status
+
+        was_open = previous_status.is_open()
+        if self.vehicle is None or was_open == order_status.is_open():
+            return True
+
+        number_of_items = len(self.items)
+        total_volume = self.get_total_volume()
+        if was_open:
+            updated = self.vehicle.release_capacity(number_of_items,
+                                                    self.total_weight, total_volume)
+        else:
+            updated = self.vehicle.reserve_capacity(number_of_items,
+                                                    self.total_weight, total_volume)
+        if updated:
+            return True
+
+        # Compensate the status change, the vehicle was left as it was
+        OrderStatusLog.append(self.id, previous_status)
+        self.order_status = previous_status
+        print(f"[i] Status of order with id: {self.id} kept, its vehicle could "
+              "not be updated")
+        return False
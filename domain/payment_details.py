@@ -25,17 +25,22 @@ class PaymentDetails:
         self.payment_status = payment_status
         self.card_information = card_information
 
-        # Initialize the database connection
-        self.get_database()
-
     def get_database(self) -> Database:
         """
-        Initialize the database object with the payment details data.
+        Build a database object holding the current payment details data.
 
         Returns:
             Database: The database object for storing/retrieving payment details data.
         """
-        self.database = Database(self.DB_LOCATION, self.to_dict(), PaymentDetails.__name__)
+        return Database(self.DB_LOCATION, self.to_dict(), PaymentDetails.__name__)
+
+    @property
+    def database(self) -> Database:
+        """
+        Database: The database object for the payment details, built on each access
+        instead of being kept on the payment details.
+        """
+        return self.get_database()
 
     def to_dict(self) -> dict:
         """
@@ -70,14 +75,12 @@ class PaymentDetails:
         """
         Adds the current payment details instance to the database.
         """
-        self.get_database()  # Ensure the database is set up
         self.database.add()  # Add the payment details data to the database
 
     def delete(self) -> None:
         """
         Deletes the current payment details instance from the database.
         """
-        self.get_database()  # Ensure the database is set up
         self.database.delete()  # Delete the payment details data from the database
 
     def find(self) -> bool:
@@ -87,7 +90,6 @@ class PaymentDetails:
         Returns:
             bool: True if the payment detail is found, False otherwise.
         """
-        self.get_database()  # Ensure the database is set up
         response = self.database.find_by_id(self.transaction_id)
         if response is not None:
             self.from_dict_to_self(response)  # Populate object with found data
@@ -98,5 +100,4 @@ class PaymentDetails:
         """
         Update the payment details in the database with its current details.
         """
-        self.get_database()  # Ensure the database is set up
         self.database.update()  # Update the payment details in the database
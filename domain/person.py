@@ -1,6 +1,84 @@
+import hmac
 from database.database import Database
+from database.index import TableIndex
+from database.name_index import NameIndex
 from helpers.convert import Convert
-from domain.customer import Customer, CustomerType
+from helpers.field_codec import FieldCodec
+from domain.company import Company
+from domain.customer import Customer, CustomerType, PrivateCustomerIndex
+
+
+class PersonIndex(TableIndex):
+    """
+    The records of the person table, by ID and by email.
+
+    The person table is read once and then kept up to date as it changes,
+    so finding a person, by ID for a lazy customer reference or by email for
+    a login, is a dictionary lookup instead of a scan of the table.
+    """
+
+    DB_LOCATION = "database/person.csv"
+    COLUMNS = ("id", "full_name", "address", "mobile_number", "email",
+               "password", "is_user")
+
+    def clear(self) -> None:
+        self.records = {}
+        self.ids_by_email = {}
+
+    def add_record(self, record: dict) -> None:
+        # Keep the values as they are read back from the table
+        record = {column: "" if record.get(column) is None else str(record[column])
+                  for column in self.COLUMNS}
+
+        previous = self.records.get(record['id'])
+        if previous is not None:
+            self.ids_by_email.pop(previous['email'].lower(), None)
+
+        self.records[record['id']] = record
+        if record['email'] != "":
+            self.ids_by_email[record['email'].lower()] = record['id']
+
+    def remove_record(self, id: str) -> None:
+        record = self.records.pop(id, None)
+        if record is not None:
+            self.ids_by_email.pop(record['email'].lower(), None)
+
+    def get_record(self, id: str) -> dict:
+        """
+        Gets the record of a person by ID.
+
+        Args:
+            id (str): The ID of the person.
+
+        Returns:
+            dict: A copy of the record, or None if the person doesn't exist.
+        """
+        record = self.records.get(id)
+        return dict(record) if record is not None else None
+
+    def get_record_by_email(self, email: str) -> dict:
+        """
+        Gets the record of a person by email, ignoring case.
+
+        Args:
+            email (str): The email of the person.
+
+        Returns:
+            dict: A copy of the record, or None if no person has the email.
+        """
+        id = self.ids_by_email.get(email.lower())
+        return self.get_record(id) if id is not None else None
+
+
+class PersonNameIndex(NameIndex):
+    """
+    The search index over the full names of the persons.
+    """
+
+    DB_LOCATION = "database/person.csv"
+    COLUMNS = ("id", "full_name")
+    NAME_COLUMN = "full_name"
+
 
 # Person class inherits from Customer and represents a private person in the system
 class Person(Customer):
@@ -12,6 +90,10 @@ class Person(Customer):
     """
 
     DB_LOCATION = "database/person.csv"
+    INDEXES = (PersonIndex, PersonNameIndex, PrivateCustomerIndex)
+
+    __slots__ = ("full_name", "_address", "_stored_address", "mobile_number",
+                 "email", "password", "is_user")
 
     def __init__(self, id: str = None,
                  full_name: str = None,
@@ -33,17 +115,41 @@ class Person(Customer):
         self.password: str = password
         self.is_user: bool = is_user
 
-        # Initialize the database connection
-        self.get_database()
-
     def get_database(self) -> Database:
         """
-        Convert the person details to a dictionary for storage.
+        Build a database object holding the current person data.
 
         Returns:
-            dict: A dictionary containing all relevant person data.
+            Database: The database object for storing/retrieving person data.
+        """
+        return Database(self.DB_LOCATION, self.to_record(), Person.__name__)
+
+    @property
+    def database(self) -> Database:
         """
-        self.database = Database(self.DB_LOCATION, self.to_dict(), Person.__name__)
+        Database: The database object for the person, built on each access
+        instead of being kept on the person.
+        """
+        return self.get_database()
+
+    @property
+    def address(self) -> dict:
+        """
+        dict: The address of the person, decoded from the stored JSON on
+        first access.
+        """
+        if self._stored_address is not None:
+            self._address = FieldCodec.decode(self._stored_address)
+            self._stored_address = None
+        return self._address
+
+    @address.setter
+    def address(self, address) -> None:
+        # A dictionary, or the stored JSON kept until it is accessed
+        if isinstance(address, str):
+            self._address, self._stored_address = None, address
+        else:
+            self._address, self._stored_address = address, None
 
     def to_dict(self) -> dict:
         """
@@ -62,6 +168,24 @@ class Person(Customer):
             'is_user': self.is_user
         }
 
+    def to_record(self) -> dict:
+        """
+        Converts the Person instance into a record for storage, with the
+        address as JSON.
+
+        Returns:
+            dict: The record of the Person instance.
+        """
+        return {
+            'id': self.id,
+            'full_name': self.full_name,
+            'address': FieldCodec.encode(self.address),
+            'mobile_number': self.mobile_number,
+            'email': self.email,
+            'password': self.password,
+            'is_user': self.is_user
+        }
+
     def from_dict_to_self(self, dictionary: dict) -> None:
         """
         Populates the Person instance with data from a dictionary.
@@ -84,15 +208,62 @@ class Person(Customer):
         """
         Adds the current person instance to the database.
         """
-        self.get_database()  # Ensure the database is set up
-        self.database.add()  # Add the company data to the database
+        # Add the person data to the database and the loaded indexes
+        TableIndex.write_through(self.INDEXES, self.to_record(), self.database.add)
+
+    @staticmethod
+    def add_many(persons: list) -> int:
+        """
+        Adds several new persons with one append to the database and its
+        loaded indexes. Their IDs are not checked.
+
+        Args:
+            persons (list): The Person objects.
+
+        Returns:
+            int: The number of persons added.
+        """
+        if len(persons) == 0:
+            return 0
+        records = [person.to_record() for person in persons]
+        database = Database(Person.DB_LOCATION, records[0], Person.__name__)
+        return TableIndex.write_many_through(Person.INDEXES, records,
+                                             lambda: database.add_many(records))
 
-    def delete(self) -> None:
+    def delete(self) -> bool:
         """
         Deletes the current person instance from the database.
+
+        A person with orders is kept, its orders must be deleted first. A
+        deleted user is removed from the related users of its companies.
+        Both are found through indexes instead of scanning the order and
+        company tables.
+
+        Returns:
+            bool: True if the person was deleted.
+
+        Raises:
+            ValueError: If the person still has orders.
         """
-        self.get_database()  # Ensure the database is set up
-        self.database.delete()  # Delete the company data from the database
+        order_ids = self.get_order_ids()
+        if len(order_ids) > 0:
+            raise ValueError(f"[i] Person with id {self.id} has "
+                             f"{len(order_ids)} orders")
+
+        # Delete the person data from the database and the loaded indexes
+        if not TableIndex.delete_through(self.INDEXES, self.id,
+                                         self.database.delete):
+            return False
+
+        for company_id in Company.find_company_ids_by_user(self.id):
+            company = Company(company_id)
+            if company.find():
+                company.related_users = [
+                    user_id for user_id in Company.parse_related_users(company.related_users)
+                    if user_id != self.id
+                ]
+                company.update()
+        return True
 
     def find(self) -> bool:
         """
@@ -101,16 +272,63 @@ class Person(Customer):
         Returns:
             bool: True if the person is found, False otherwise.
         """
-        self.get_database()  # Ensure database is initialized
-        response = self.database.find_by_id(self.id)  # Search by ID
+        response = PersonIndex.get().get_record(self.id)  # Search by ID
         if response is not None:
             self.from_dict_to_self(response)  # Populate instance with data
             return True
         return False
 
+    @staticmethod
+    def authenticate(identifier: str, password: str) -> "Person":
+        """
+        Finds a user by ID or email and checks the password.
+
+        Args:
+            identifier (str): The personal number or the email of the user.
+            password (str): The password to check.
+
+        Returns:
+            Person: The user, or None if the user doesn't exist, is not a
+            user or the password is wrong.
+        """
+        person_index = PersonIndex.get()
+        record = person_index.get_record(identifier)
+        if record is None:
+            record = person_index.get_record_by_email(identifier)
+        if record is None:
+            return None
+
+        person = Person()
+        person.from_dict_to_self(record)
+        if not person.is_user or not hmac.compare_digest(
+                str(person.password).encode(), str(password).encode()):
+            return None
+        return person
+
+    @staticmethod
+    def find_many(ids) -> dict:
+        """
+        Find several persons in the person index.
+
+        Args:
+            ids (iterable): The IDs of the persons.
+
+        Returns:
+            dict: The found IDs mapped to their Person object.
+        """
+        person_index = PersonIndex.get()
+        persons = {}
+        for id in set(ids):
+            record = person_index.get_record(id)
+            if record is not None:
+                person = Person()
+                person.from_dict_to_self(record)
+                persons[id] = person
+        return persons
+
     def update(self) -> None:
         """
         Update the person in the database with its current details.
         """
-        self.get_database()  # Ensure database is initialized
-        self.database.update()  # Update the record
+        # Update the record and the loaded indexes
+        TableIndex.write_through(self.INDEXES, self.to_record(), self.database.update)
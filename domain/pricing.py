@@ -0,0 +1,145 @@
+import threading
+import numpy as np
+from domain.item import ItemCatalog
+from helpers.item_codec import ItemCodec
+
+
+class PricingEngine:
+    """
+    Computes the weight and price of orders from catalog arrays.
+
+    The weight and the price of one unit of every catalog item are kept in
+    NumPy arrays indexed by the position of the item, so the totals of an
+    order are a single dot product, and the totals of a batch of orders a
+    single weighted bincount, whatever the number of order lines. The
+    arrays are rebuilt when the item catalog is reloaded.
+
+    Attributes:
+        instance (PricingEngine): The engine shared by the process.
+    """
+
+    instance = None
+    lock = threading.Lock()
+
+    def __init__(self, item_catalog: ItemCatalog) -> None:
+        """
+        Initializes the engine from the items of a catalog.
+
+        Args:
+            item_catalog (ItemCatalog): The catalog to price from.
+        """
+        self.items = item_catalog.items
+        self.positions = {item.id: position
+                          for position, item in enumerate(self.items)}
+        self.weights = np.array([item.weight for item in self.items],
+                                dtype=float)
+        self.prices = self.weights * np.array(
+            [item.price_per_kg for item in self.items], dtype=float
+        )
+
+    @classmethod
+    def get(cls) -> "PricingEngine":
+        """
+        Gets the engine of the process, rebuilt if the catalog has changed.
+
+        Returns:
+            PricingEngine: The pricing engine.
+        """
+        item_catalog = ItemCatalog.get()
+        engine = cls.instance
+        if engine is None or engine.items is not item_catalog.items:
+            with cls.lock:
+                engine = cls.instance = cls(item_catalog)
+        return engine
+
+    def get_lines(self, items) -> tuple:
+        """
+        Converts order items to catalog positions and quantities.
+
+        Args:
+            items (str | list): The items in any form accepted by
+                ItemCodec.decode.
+
+        Returns:
+            tuple: The catalog positions and quantities as NumPy arrays.
+
+        Raises:
+            ValueError: If the items are not valid, see ItemCodec.decode, or
+                an item ID is not in the catalog.
+        """
+        pairs = ItemCodec.decode(items)
+        unknown = [item_id for item_id, _ in pairs if item_id not in self.positions]
+        if len(unknown) > 0:
+            raise ValueError(f"[i] Items not found: {', '.join(unknown)}")
+
+        positions = np.fromiter((self.positions[item_id] for item_id, _ in pairs),
+                                dtype=np.intp, count=len(pairs))
+        quantities = np.fromiter((quantity for _, quantity in pairs),
+                                 dtype=float, count=len(pairs))
+        return positions, quantities
+
+    def quote(self, items) -> tuple:
+        """
+        Computes the total weight and price of one order.
+
+        Args:
+            items (str | list): The items in any form accepted by
+                ItemCodec.decode.
+
+        Returns:
+            tuple: The total weight in kg and the total price.
+
+        Raises:
+            ValueError: If the items are not valid, see get_lines.
+        """
+        positions, quantities = self.get_lines(items)
+        total_weight = float(quantities @ self.weights[positions])
+        total_price = float(quantities @ self.prices[positions])
+        return round(total_weight, 2), round(total_price, 2)
+
+    def quote_items(self, items: list) -> tuple:
+        """
+        Computes the total weight and price of a list of Item objects.
+
+        Args:
+            items (list): The items of the order.
+
+        Returns:
+            tuple: The total weight in kg and the total price.
+        """
+        return self.quote([item.id for item in items])
+
+    def quote_many(self, orders: list) -> tuple:
+        """
+        Computes the total weight and price of a batch of orders at once.
+
+        Args:
+            orders (list): The items of each order, in any form accepted by
+                ItemCodec.decode.
+
+        Returns:
+            tuple: The total weights and the total prices as NumPy arrays,
+            one value per order.
+
+        Raises:
+            ValueError: If the orders are not a list, or the items of an
+                order are not valid, see get_lines.
+        """
+        if not isinstance(orders, list):
+            raise ValueError(f"[i] Invalid orders: {orders!r}")
+        lines = [self.get_lines(items) for items in orders]
+        if len(lines) == 0:
+            return np.zeros(0), np.zeros(0)
+
+        order_indexes = np.repeat(np.arange(len(lines)),
+                                  [len(positions) for positions, _ in lines])
+        positions = np.concatenate([positions for positions, _ in lines])
+        quantities = np.concatenate([quantities for _, quantities in lines])
+
+        total_weights = np.bincount(order_indexes,
+                                    weights=quantities * self.weights[positions],
+                                    minlength=len(lines))
+        total_prices = np.bincount(order_indexes,
+                                   weights=quantities * self.prices[positions],
+                                   minlength=len(lines))
+        return total_weights.round(2), total_prices.round(2)
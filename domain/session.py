@@ -0,0 +1,114 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from domain.person import Person, PersonIndex
+
+
+class SessionStore:
+    """
+    The sessions of the logged in users, kept in memory by the server.
+
+    A session maps a random token to the ID of its user. It expires TTL
+    seconds after the login, and when there are more than MAX_SESSIONS the
+    least recently used ones are dropped. The user of a request is resolved
+    from the token and the person index, without reading the person table.
+
+    Sessions live in the memory of one process, like the fleet state.
+
+    Attributes:
+        TTL (float): Lifetime of a session in seconds.
+        MAX_SESSIONS (int): Maximum number of sessions kept.
+        instance (SessionStore): The session store of the process.
+    """
+
+    TTL = 3600.0
+    MAX_SESSIONS = 10000
+
+    instance = None
+    lock = threading.Lock()
+
+    def __init__(self, ttl: float = TTL, max_sessions: int = MAX_SESSIONS) -> None:
+        """
+        Initializes an empty session store.
+
+        Args:
+            ttl (float): Lifetime of a session in seconds.
+            max_sessions (int): Maximum number of sessions kept.
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()  # Token mapped to (user ID, expiry)
+        self.sessions_lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> "SessionStore":
+        """
+        Gets the session store of the process, created on first use.
+
+        Returns:
+            SessionStore: The session store.
+        """
+        if cls.instance is None:
+            with cls.lock:
+                if cls.instance is None:
+                    cls.instance = cls()
+        return cls.instance
+
+    def create(self, person: Person) -> str:
+        """
+        Starts a session for a user.
+
+        Args:
+            person (Person): The authenticated user.
+
+        Returns:
+            str: The token of the session.
+        """
+        token = secrets.token_urlsafe(32)
+        with self.sessions_lock:
+            self.sessions[token] = (person.id, time.monotonic() + self.ttl)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)  # Least recently used
+        return token
+
+    def resolve(self, token: str) -> Person:
+        """
+        Gets the user of a session.
+
+        Args:
+            token (str): The token of the session.
+
+        Returns:
+            Person: The user, or None if the session doesn't exist, has
+            expired or its user is no longer a user.
+        """
+        with self.sessions_lock:
+            session = self.sessions.get(token)
+            if session is None:
+                return None
+            person_id, expires_at = session
+            if expires_at <= time.monotonic():
+                del self.sessions[token]
+                return None
+            self.sessions.move_to_end(token)  # Most recently used
+
+        record = PersonIndex.get().get_record(person_id)
+        if record is None:
+            return None
+        person = Person()
+        person.from_dict_to_self(record)
+        return person if person.is_user else None
+
+    def revoke(self, token: str) -> bool:
+        """
+        Ends a session.
+
+        Args:
+            token (str): The token of the session.
+
+        Returns:
+            bool: True if the session existed.
+        """
+        with self.sessions_lock:
+            return self.sessions.pop(token, None) is not None
@@ -9,17 +9,26 @@ class Ship(Vehicle):
     Attributes:
         MAX_ITEM_CAPACITY (int): Maximum item capacity of the ship.
         MAX_KG_CAPACITY (int): Maximum weight capacity in kg for the ship.
+        MAX_VOLUME_CAPACITY (int): Maximum volume capacity in litres for the
+            ship, the unit of the item volumes.
+        TYPE (VehicleType): The vehicle type of the ship.
     """
     
     MAX_ITEM_CAPACITY = 1000   # Maximum items the ship can carry
     MAX_KG_CAPACITY = 100000   # Maximum weight the ship can carry in kg
+    # A 300 m3 hold: 1000 items of 480 l and 75 kg fit the weight, 625 the hold
+    MAX_VOLUME_CAPACITY = 300000  # Maximum volume the ship can carry in litres
+    TYPE = VehicleType.SHIP
+
+    __slots__ = ()  # The attributes are the slots of Vehicle
 
     def __init__(self,
                  id: str = None,
                  current_position: Location = None,
                  status: VehicleStatusType = VehicleStatusType.FREE,
                  remaining_item_capacity: int = MAX_ITEM_CAPACITY,
-                 remaining_kg_capacity: int = MAX_KG_CAPACITY):
+                 remaining_kg_capacity: int = MAX_KG_CAPACITY,
+                 remaining_volume_capacity: float = MAX_VOLUME_CAPACITY):
         """
         Initializes a Ship instance with specific capacities and status.
 
@@ -29,6 +38,7 @@ class Ship(Vehicle):
             status (VehicleStatusType): The current status of the ship.
             remaining_item_capacity (int): Remaining item capacity.
             remaining_kg_capacity (int): Remaining weight capacity in kg.
+            remaining_volume_capacity (float): Remaining volume capacity.
         """
         
         # Initialize parent class Vehicle with type set to SHIP
@@ -37,7 +47,5 @@ class Ship(Vehicle):
                          status=status,
                          remaining_item_capacity=remaining_item_capacity,
                          remaining_kg_capacity=remaining_kg_capacity,
+                         remaining_volume_capacity=remaining_volume_capacity,
                          type=VehicleType.SHIP)
-        
-        # Initialize the database connection
-        self.get_database()
@@ -9,17 +9,26 @@ class Truck(Vehicle):
     Attributes:
         MAX_ITEM_CAPACITY (int): Maximum item capacity of the truck.
         MAX_KG_CAPACITY (int): Maximum weight capacity in kg for the truck.
+        MAX_VOLUME_CAPACITY (int): Maximum volume capacity in litres for the
+            truck, the unit of the item volumes.
+        TYPE (VehicleType): The vehicle type of the truck.
     """
     
     MAX_ITEM_CAPACITY = 100    # Maximum items the truck can carry
     MAX_KG_CAPACITY = 3000     # Maximum weight the truck can carry in kg
+    # A 15 m3 box: 40 items of 480 l and 75 kg fit the weight, 31 the box
+    MAX_VOLUME_CAPACITY = 15000  # Maximum volume the truck can carry in litres
+    TYPE = VehicleType.TRUCK
+
+    __slots__ = ()  # The attributes are the slots of Vehicle
 
     def __init__(self,
                  id: str = None,
                  current_position: Location = None,
                  status: VehicleStatusType = VehicleStatusType.FREE,
                  remaining_item_capacity: int = MAX_ITEM_CAPACITY,
-                 remaining_kg_capacity: int = MAX_KG_CAPACITY):
+                 remaining_kg_capacity: int = MAX_KG_CAPACITY,
+                 remaining_volume_capacity: float = MAX_VOLUME_CAPACITY):
         """
         Initializes a Truck instance with specific capacities and status.
 
@@ -29,6 +38,7 @@ class Truck(Vehicle):
             status (VehicleStatusType): The current status of the truck.
             remaining_item_capacity (int): Remaining item capacity.
             remaining_kg_capacity (int): Remaining weight capacity in kg.
+            remaining_volume_capacity (float): Remaining volume capacity.
         """
         
         # Initialize parent class Vehicle with type set to TRUCK
@@ -37,7 +47,5 @@ class Truck(Vehicle):
                          status=status,
                          remaining_item_capacity=remaining_item_capacity,
                          remaining_kg_capacity=remaining_kg_capacity,
+                         remaining_volume_capacity=remaining_volume_capacity,
                          type=VehicleType.TRUCK)
-        
-        # Initialize the database connection
-        self.get_database()
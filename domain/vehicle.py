@@ -1,6 +1,12 @@
 from enum import Enum
+import numpy as np
 from database.database import Database
-from domain.location import Location
+from database.fixed_width_database import FixedWidthDatabase
+from database.fleet_state import FleetState
+from database.index import IdIndex, TableIndex
+from database.spatial_grid import SpatialGrid
+from domain.location import Location, LocationRegistry
+from helpers.allocation import Allocation
 
 # Enum for vehicle types
 class VehicleType(Enum):
@@ -15,9 +21,118 @@ class VehicleStatusType(Enum):
     BUSY = 3
     NOT_WORKING = 4
 
+class VehicleIdIndex(IdIndex):
+    """
+    The IDs of the vehicles of the vehicle table.
+    """
+
+    DB_LOCATION = "database/vehicle.csv"
+
+
+class FreeVehicleIndex(TableIndex):
+    """
+    The positions and capacities of the free vehicles, in a spatial grid.
+
+    Only free vehicles in a city with known coordinates are indexed. A
+    vehicle enters, moves in and leaves the grid as its records are
+    written, so the k nearest free vehicles with room for a load are found
+    without scanning the fleet.
+
+    When the fleet state engine is active it owns the vehicle table, so the
+    index is loaded from the engine instead of the file, and is then kept
+    in step by the writes alone.
+    """
+
+    DB_LOCATION = "database/vehicle.csv"
+    COLUMNS = ("id", "current_position_city", "current_position_country",
+               "status", "remaining_item_capacity", "remaining_kg_capacity",
+               "remaining_volume_capacity")
+
+    def __init__(self, path: str) -> None:
+        self.fleet_state = None  # The engine the index was loaded from
+        super().__init__(path)
+
+    def clear(self) -> None:
+        self.grid = SpatialGrid()
+
+    def add_record(self, record: dict) -> None:
+        id = str(record['id'])
+        self.grid.remove(id)
+        if int(record['status']) != VehicleStatusType.FREE.value:
+            return
+
+        location = LocationRegistry.get().resolve(record['current_position_city'],
+                                                  record['current_position_country'])
+        if location.latitude is not None:
+            self.grid.add(id, location.latitude, location.longitude,
+                          (float(record['remaining_item_capacity']),
+                           float(record['remaining_kg_capacity']),
+                           float(record['remaining_volume_capacity'])))
+
+    def remove_record(self, id: str) -> None:
+        self.grid.remove(id)
+
+    def refresh(self) -> None:
+        fleet_state = FleetState.active
+        if fleet_state is None:
+            if self.fleet_state is not None:
+                with self.lock:
+                    self.fleet_state = None
+                    self.signature = None  # Read the file again from the start
+            super().refresh()
+            return
+
+        if self.fleet_state is not fleet_state:
+            with self.lock:
+                if self.fleet_state is not fleet_state:
+                    self.clear()
+                    for record in fleet_state.iter_records():
+                        self.add_record(record)
+                    self.fleet_state = fleet_state
+
+    def find_nearest(self, location: Location, k: int = 1,
+                     number_of_items: int = 0, weight: float = 0,
+                     volume: float = 0) -> list:
+        """
+        Finds the k nearest free vehicles with room for a load.
+
+        Args:
+            location (Location): The location, with coordinates.
+            k (int): The number of vehicles to find.
+            number_of_items (int): The number of items to load.
+            weight (float): The weight to load in kg.
+            volume (float): The volume to load.
+
+        Returns:
+            list: The vehicle IDs and their distances in km, as
+            (id, distance) pairs, nearest first.
+        """
+        with self.lock:
+            return self.grid.nearest(location.latitude, location.longitude, k,
+                                     number_of_items, weight, volume)
+
+
 # Vehicle class representing different vehicle types and their status
 class Vehicle:
     DB_LOCATION = "database/vehicle.csv" 
+    INDEXES = (VehicleIdIndex, FreeVehicleIndex)
+
+    # Optional fixed-width layout of the table, with in-place updates
+    FIXED_WIDTH = False
+    FIELD_WIDTHS = {
+        'id': 16,
+        'current_position_city': 32,
+        'current_position_country': 32,
+        'status': 1,
+        'remaining_item_capacity': 8,
+        'remaining_kg_capacity': 16,
+        'remaining_volume_capacity': 16,
+        'type': 1,
+    }
+
+    # Slotted, so a large fleet in memory has no per-vehicle __dict__
+    __slots__ = ("id", "current_position", "status", "remaining_item_capacity",
+                 "remaining_kg_capacity", "remaining_volume_capacity", "type")
 
     def __init__(self, 
                     id: str = None,
@@ -25,6 +140,7 @@ class Vehicle:
                     status: VehicleStatusType = None,
                     remaining_item_capacity: int = None,
                     remaining_kg_capacity: int = None,
+                    remaining_volume_capacity: float = None,
                     type: VehicleType = None
                  ):
         self.id = id
@@ -32,6 +148,7 @@ class Vehicle:
         self.status = status
         self.remaining_item_capacity = remaining_item_capacity
         self.remaining_kg_capacity = remaining_kg_capacity
+        self.remaining_volume_capacity = remaining_volume_capacity
         self.type = type
 
     def to_dict(self) -> dict:
@@ -66,17 +183,29 @@ class Vehicle:
             'status': status,
             'remaining_item_capacity': self.remaining_item_capacity,
             'remaining_kg_capacity': self.remaining_kg_capacity,
+            'remaining_volume_capacity': self.remaining_volume_capacity,
             'type': type,
         }
     
     def get_database(self) -> Database:
         """
-        Initialize the database object with the vehicle data.
+        Build a database object holding the current vehicle data.
 
         Returns:
             Database: The database object for storing/retrieving vehicle data.
         """
-        self.database = Database(self.DB_LOCATION, self.to_dict(), Vehicle.__name__)
+        if Vehicle.FIXED_WIDTH:
+            return FixedWidthDatabase(self.DB_LOCATION, self.to_dict(),
+                                      Vehicle.__name__, self.FIELD_WIDTHS)
+        return Database(self.DB_LOCATION, self.to_dict(), Vehicle.__name__)
+
+    @property
+    def database(self) -> Database:
+        """
+        Database: The database object for the vehicle, built on each access
+        instead of being kept on the vehicle.
+        """
+        return self.get_database()
 
     def from_list_to_self(self, vehicle: list) -> None:
         """
@@ -94,14 +223,18 @@ class Vehicle:
             status_index = headers.index("status")
             ramaining_item_capacity_index = headers.index("remaining_item_capacity")
             remaining_kg_capacity_index = headers.index("remaining_kg_capacity")
+            remaining_volume_capacity_index = headers.index("remaining_volume_capacity")
             type_index = headers.index("type")
 
             # Assign values to the vehicle object based on the list
             self.id = vehicle[id_index]
-            self.current_position = Location(vehicle[city_index], vehicle[country_index])
+            self.current_position = LocationRegistry.get().resolve(
+                vehicle[city_index], vehicle[country_index]
+            )
             self.status = VehicleStatusType(int(vehicle[status_index]))
             self.remaining_item_capacity = int(vehicle[ramaining_item_capacity_index])
             self.remaining_kg_capacity = float(vehicle[remaining_kg_capacity_index])
+            self.remaining_volume_capacity = float(vehicle[remaining_volume_capacity_index])
             self.type = VehicleType(int(vehicle[type_index]))
 
     def from_dict_to_self(self, dictionary: dict) -> None:
@@ -116,18 +249,65 @@ class Vehicle:
             self.id = dictionary.get('id')
             city = dictionary.get('current_position_city')
             country = dictionary.get('current_position_country')
-            self.current_position = Location(city, country)
+            self.current_position = LocationRegistry.get().resolve(city, country)
             self.status = VehicleStatusType(int(dictionary.get('status')))
             self.remaining_item_capacity = int(dictionary.get('remaining_item_capacity'))
             self.remaining_kg_capacity = float(dictionary.get('remaining_kg_capacity'))
+            self.remaining_volume_capacity = float(dictionary.get('remaining_volume_capacity'))
             self.type = VehicleType(int(dictionary.get('type')))
 
     def add(self) -> None:
         """
         Adds the current vehicle instance to the database.
         """
-        self.get_database()  # Ensure the database is set up
-        self.database.add()  # Add vehicle data to the database
+        record = self.to_dict()
+        if FleetState.active is not None:
+            # Add vehicle data in memory and to the loaded grid
+            FreeVehicleIndex.write(record, lambda: FleetState.active.add(record))
+            return
+
+        # Add vehicle data to the database and the loaded indexes
+        TableIndex.write_through(self.INDEXES, record, self.database.add)
+
+    @staticmethod
+    def add_many(vehicles: list) -> int:
+        """
+        Adds several new vehicles with one append to the database. Their IDs
+        are not checked.
+
+        Args:
+            vehicles (list): The Vehicle objects.
+
+        Returns:
+            int: The number of vehicles added.
+        """
+        if len(vehicles) == 0:
+            return 0
+        records = [vehicle.to_dict() for vehicle in vehicles]
+        if FleetState.active is not None:
+            # Add vehicle data in memory and to the loaded grid
+            return FreeVehicleIndex.write_many(records, lambda: sum(
+                FleetState.active.add(record) for record in records
+            ))
+
+        database = vehicles[0].database
+        return TableIndex.write_many_through(Vehicle.INDEXES, records,
+                                             lambda: database.add_many(records))
+
+    @staticmethod
+    def exists(id: str) -> bool:
+        """
+        Checks if a vehicle exists, without reading the vehicle table.
+
+        Args:
+            id (str): The ID of the vehicle.
+
+        Returns:
+            bool: True if a vehicle has the ID.
+        """
+        if FleetState.active is not None:
+            return FleetState.active.find_by_id(id) is not None
+        return str(id) in VehicleIdIndex.get().ids
 
     def find(self) -> bool:
         """
@@ -136,47 +316,272 @@ class Vehicle:
         Returns:
             bool: True if the vehicle is found, False otherwise.
         """
-        self.get_database()  # Ensure the database is set up
-        response = self.database.find_by_id(self.id)
+        if FleetState.active is not None:
+            response = FleetState.active.find_by_id(self.id)  # Search in memory
+        else:
+            response = self.database.find_by_id(self.id)
         if response != None:
             self.from_dict_to_self(response)  # Populate object with found data
             return True
         return False
 
-    def get_first_available(self, number_of_items: int, weight: int):
+    @staticmethod
+    def find_many(ids) -> dict:
+        """
+        Find several vehicles in a single pass over the database.
+
+        Args:
+            ids (iterable): The IDs of the vehicles.
+
+        Returns:
+            dict: The found IDs mapped to their Vehicle object.
+        """
+        if FleetState.active is not None:
+            records = FleetState.active.find_by_ids(ids)  # Search in memory
+        else:
+            vehicle = Vehicle()
+            records = vehicle.database.find_by_ids(ids)
+
+        vehicles = {}
+        for id, record in records.items():
+            vehicle = Vehicle()
+            vehicle.from_dict_to_self(record)
+            vehicles[id] = vehicle
+        return vehicles
+
+    @staticmethod
+    def find_nearest_free(location: Location, k: int = 1,
+                          number_of_items: int = 0, weight: float = 0,
+                          volume: float = 0) -> list:
+        """
+        Finds the k nearest free vehicles with room for a load, through the
+        free vehicle grid.
+
+        Args:
+            location (Location): The location, or a known city without
+                coordinates.
+            k (int): The number of vehicles to find.
+            number_of_items (int): The number of items to load.
+            weight (float): The weight to load in kg.
+            volume (float): The volume to load.
+
+        Returns:
+            list: The vehicle IDs and their distances in km, as
+            (id, distance) pairs, nearest first.
+
+        Raises:
+            ValueError: If the location has no known coordinates.
+        """
+        if location is not None and location.latitude is None:
+            location = LocationRegistry.get().find(location.city)
+        if location is None or location.latitude is None:
+            raise ValueError("[i] The location has no known coordinates")
+        return FreeVehicleIndex.get().find_nearest(location, k, number_of_items,
+                                                   weight, volume)
+
+    def get_first_available(self, number_of_items: int, weight: float,
+                            volume: float = 0):
         """
-        Gets the first available vehicle with sufficient capacity.
-        
+        Gets the available vehicle that the load fills the most.
+
+        The item, kg and volume capacities of all free vehicles are checked
+        at once with NumPy, see Allocation.best_fit.
+
+        Args:
+            number_of_items (int): The number of items to load.
+            weight (float): The weight to load in kg.
+            volume (float): The volume to load.
+
         Returns:
-            Vehicle: The first available vehicle with sufficient capacity
+            Vehicle: The available vehicle with sufficient capacity
             None: if no vehicle is available.
         """
-        self.get_database()  # Ensure the database is set up
+        if FleetState.active is not None:
+            # Search the in-memory fleet
+            response = FleetState.active.find_first_available(
+                VehicleStatusType.FREE.value, number_of_items, weight, volume,
+                Vehicle.get_max_capacities()
+            )
+            if response is None:
+                return None
+            self.from_dict_to_self(response)  # Populate vehicle data
+            return self
+
         # Find all vehicles that are free
         available_vehicles = self.database.find_by_field_name("status", 
                                 VehicleStatusType.FREE.value)
+        if len(available_vehicles) == 0:
+            return None  # No available vehicle found
 
         # Get headers for capacity checks
         headers = list(self.to_dict())
-        ramaining_item_capacity_index = headers.index("remaining_item_capacity")
-        remaining_kg_capacity_index = headers.index("remaining_kg_capacity")
+        capacity_indexes = [headers.index("remaining_item_capacity"),
+                            headers.index("remaining_kg_capacity"),
+                            headers.index("remaining_volume_capacity")]
+        type_index = headers.index("type")
 
-        # Sort available vehicles by item capacity
-        available_vehicles = sorted(available_vehicles, 
-                                key=lambda x: int(x[ramaining_item_capacity_index]))
+        # Load the capacities of all available vehicles as one array
+        columns = np.array(available_vehicles)
+        capacities = columns[:, capacity_indexes].astype(float)
+        max_capacities = Allocation.max_capacities_by_type(
+            columns[:, type_index].astype(int), Vehicle.get_max_capacities()
+        )
 
         # Check if any vehicle meets the requirements
-        for vehicle in available_vehicles:
-            if int(vehicle[ramaining_item_capacity_index]) >= number_of_items \
-                and float(vehicle[remaining_kg_capacity_index]) >= weight:
-                    self.from_list_to_self(vehicle)  # Populate vehicle data
-                    return self  # Return the available vehicle
+        index = Allocation.best_fit(capacities[:, 0], capacities[:, 1],
+                                    capacities[:, 2], max_capacities,
+                                    number_of_items, weight, volume)
+        if index < 0:
+            return None  # No available vehicle found
+
+        self.from_list_to_self(available_vehicles[index])  # Populate vehicle data
+        return self  # Return the available vehicle
+
+    @staticmethod
+    def enable_fleet_state(checkpoint_interval: float = 60.0,
+                           dirty_threshold: int = 1000) -> FleetState:
+        """
+        Serves all vehicle operations from the in-memory fleet state engine.
+
+        Args:
+            checkpoint_interval (float): Maximum seconds between checkpoints
+                of the vehicle CSV file.
+            dirty_threshold (int): Number of changes that forces a checkpoint.
+
+        Returns:
+            FleetState: The active engine.
+        """
+        vehicle = Vehicle()
+        return FleetState.enable(vehicle.database, checkpoint_interval,
+                                 dirty_threshold)
+
+    @staticmethod
+    def get_max_capacities() -> dict:
+        """
+        Gets the maximum capacities of every vehicle type.
+
+        Returns:
+            dict: Vehicle type values mapped to the maximum item, kg and
+            volume capacity.
+        """
+        # Imported here because the vehicle subclasses import this module
+        from domain.bike import Bike
+        from domain.truck import Truck
+        from domain.ship import Ship
+
+        return {
+            vehicle_class.TYPE.value: (vehicle_class.MAX_ITEM_CAPACITY,
+                                       vehicle_class.MAX_KG_CAPACITY,
+                                       vehicle_class.MAX_VOLUME_CAPACITY)
+            for vehicle_class in (Bike, Truck, Ship)
+        }
+
+    def get_max_capacity(self) -> tuple:
+        """
+        Gets the maximum capacities of the vehicle based on its type.
+
+        Returns:
+            tuple: The maximum item, kg and volume capacity.
+        """
+        return Vehicle.get_max_capacities()[self.type.value]
+
+    def reserve_capacity(self, number_of_items: int, weight: float,
+                         volume: float = 0) -> bool:
+        """
+        Takes the capacity needed by an order from the vehicle and saves it.
+
+        Args:
+            number_of_items (int): The number of items to load.
+            weight (float): The weight to load in kg.
+            volume (float): The volume to load.
+
+        Returns:
+            bool: True if the vehicle was saved. Otherwise its capacities
+            are left as they were.
+        """
+        return self.adjust_capacities({
+            'remaining_item_capacity': -number_of_items,
+            'remaining_kg_capacity': -weight,
+            'remaining_volume_capacity': -volume,
+        })
+
+    def release_capacity(self, number_of_items: int, weight: float,
+                         volume: float = 0) -> bool:
+        """
+        Gives the capacity used by an order back to the vehicle and saves it.
+
+        The remaining capacities never grow above the maximum of the vehicle
+        type, so releasing an order that never reserved capacity is harmless.
+
+        Args:
+            number_of_items (int): The number of items to unload.
+            weight (float): The weight to unload in kg.
+            volume (float): The volume to unload.
+
+        Returns:
+            bool: True if the vehicle was saved. Otherwise its capacities
+            are left as they were.
+        """
+        max_item_capacity, max_kg_capacity, max_volume_capacity = \
+            self.get_max_capacity()
+        return self.adjust_capacities({
+            'remaining_item_capacity': number_of_items,
+            'remaining_kg_capacity': weight,
+            'remaining_volume_capacity': volume,
+        }, {
+            'remaining_item_capacity': max_item_capacity,
+            'remaining_kg_capacity': max_kg_capacity,
+            'remaining_volume_capacity': max_volume_capacity,
+        })
+
+    def adjust_capacities(self, deltas: dict, maximums: dict = None) -> bool:
+        """
+        Adds amounts to the stored capacities of the vehicle and takes the
+        stored result as its capacities.
+
+        The amounts are added to the capacities in the table or the fleet
+        state, not to the ones of this copy of the vehicle, so capacity
+        taken at the same time for other orders is kept.
+
+        Args:
+            deltas (dict): Capacity fields mapped to the amount to add.
+            maximums (dict, optional): Capacity fields mapped to a value
+                they never grow above.
 
-        return None  # No available vehicle found
+        Returns:
+            bool: True if the vehicle was saved.
+        """
+        record = {}
+
+        def adjust() -> dict:
+            storage = FleetState.active or self.database
+            adjusted = storage.adjust(self.id, deltas, maximums)
+            # Filled before the loaded grid applies the record
+            record.update(adjusted or {})
+            return adjusted
+
+        if not FreeVehicleIndex.write(record, adjust):
+            return False
+        self.remaining_item_capacity = int(record['remaining_item_capacity'])
+        self.remaining_kg_capacity = float(record['remaining_kg_capacity'])
+        self.remaining_volume_capacity = float(
+            record['remaining_volume_capacity']
+        )
+        return True
 
-    def update(self) -> None:
+    def update(self) -> bool:
         """
         Update the vehicle in the database with its current details.
+
+        Returns:
+            bool: True if the vehicle was updated.
         """
-        self.get_database()  # Ensure the database is set up
-        self.database.update()  # Update the vehicle in the database
+        record = self.to_dict()
+        if FleetState.active is not None:
+            # Update in memory and in the loaded grid
+            return bool(FreeVehicleIndex.write(
+                record, lambda: FleetState.active.update(record)
+            ))
+
+        # Update the vehicle in the database and the loaded grid
+        return bool(FreeVehicleIndex.write(record, self.database.update))
@@ -0,0 +1,56 @@
+import csv
+from domain.capacity import CapacityReconciler
+from domain.vehicle import Vehicle
+
+
+class VehicleVolumeMigration:
+    """
+    Brings a vehicle table written before vehicles had a volume capacity up
+    to date.
+
+    The remaining_volume_capacity column is added to the table, or filled
+    where it is empty, with the maximum volume of each vehicle type. The
+    remaining capacities are then recomputed from the open orders, which
+    also moves volumes written with the earlier capacities to litres.
+    Running it again changes nothing. Run it with the server stopped.
+
+    Attributes:
+        COLUMN (str): The field added to the vehicle table.
+    """
+
+    COLUMN = 'remaining_volume_capacity'
+
+    def migrate(self) -> int:
+        """
+        Adds the volume capacity to the vehicles without one.
+
+        Returns:
+            int: The number of vehicles given a volume capacity.
+        """
+        # Built first, a fixed-width table is converted with the column empty
+        database = Vehicle().database
+        content = [list(Vehicle().to_dict())]
+        migrated = 0
+
+        with open(database.path, mode='r', newline='') as csv_file:
+            csv_reader = csv.DictReader(csv_file, delimiter=',')
+            csv_reader.fieldnames = [name.strip()
+                                     for name in csv_reader.fieldnames or []]
+            for record in csv_reader:
+                record = {name: (value or "").strip()
+                          for name, value in record.items()}
+                if record.get(self.COLUMN, "") == "":
+                    max_capacities = Vehicle.get_max_capacities()
+                    record[self.COLUMN] = max_capacities[int(record['type'])][2]
+                    migrated += 1
+                content.append([record.get(name, "") for name in content[0]])
+
+        database.save_content(content)
+        print(f"[i] Volume capacity added to {migrated} vehicle(s)")
+
+        CapacityReconciler().reconcile()  # Takes off the open orders
+        return migrated
+
+
+if __name__ == "__main__":
+    VehicleVolumeMigration().migrate()
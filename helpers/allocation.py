@@ -0,0 +1,89 @@
+import numpy as np
+
+
+class Allocation:
+    """
+    A utility class with vectorized capacity checks for vehicle allocation.
+
+    The capacities of all candidate vehicles are given as NumPy arrays, so a
+    check across thousands of vehicles runs as a handful of array operations.
+    """
+
+    @staticmethod
+    def fits(item_capacities: np.ndarray, kg_capacities: np.ndarray,
+             volume_capacities: np.ndarray, number_of_items: int,
+             weight: float, volume: float) -> np.ndarray:
+        """
+        Checks which vehicles have room for a load in all three dimensions.
+
+        Args:
+            item_capacities (np.ndarray): Remaining item capacity per vehicle.
+            kg_capacities (np.ndarray): Remaining kg capacity per vehicle.
+            volume_capacities (np.ndarray): Remaining volume per vehicle.
+            number_of_items (int): The number of items to load.
+            weight (float): The weight to load in kg.
+            volume (float): The volume to load.
+
+        Returns:
+            np.ndarray: A boolean mask of the vehicles that fit the load.
+        """
+        return (item_capacities >= number_of_items) \
+            & (kg_capacities >= weight) \
+            & (volume_capacities >= volume)
+
+    @staticmethod
+    def best_fit(item_capacities: np.ndarray, kg_capacities: np.ndarray,
+                 volume_capacities: np.ndarray, max_capacities: np.ndarray,
+                 number_of_items: int, weight: float, volume: float,
+                 mask: np.ndarray = None) -> int:
+        """
+        Finds the vehicle that the load fills the most.
+
+        The space left after loading is measured as a share of each vehicle's
+        maximum capacity and summed over items, kg and volume. Picking the
+        vehicle with the least space left keeps the big vehicles free for the
+        big orders.
+
+        Args:
+            item_capacities (np.ndarray): Remaining item capacity per vehicle.
+            kg_capacities (np.ndarray): Remaining kg capacity per vehicle.
+            volume_capacities (np.ndarray): Remaining volume per vehicle.
+            max_capacities (np.ndarray): Maximum item, kg and volume capacity
+                per vehicle, with one row per vehicle.
+            number_of_items (int): The number of items to load.
+            weight (float): The weight to load in kg.
+            volume (float): The volume to load.
+            mask (np.ndarray, optional): Vehicles allowed to take the load.
+
+        Returns:
+            int: The index of the best vehicle, or -1 if no vehicle fits.
+        """
+        fits = Allocation.fits(item_capacities, kg_capacities, volume_capacities,
+                               number_of_items, weight, volume)
+        if mask is not None:
+            fits &= mask
+        if not fits.any():
+            return -1
+
+        space_left = (item_capacities - number_of_items) / max_capacities[:, 0] \
+            + (kg_capacities - weight) / max_capacities[:, 1] \
+            + (volume_capacities - volume) / max_capacities[:, 2]
+        return int(np.argmin(np.where(fits, space_left, np.inf)))
+
+    @staticmethod
+    def max_capacities_by_type(types: np.ndarray, max_capacities: dict) -> np.ndarray:
+        """
+        Looks up the maximum capacities of each vehicle from its type.
+
+        Args:
+            types (np.ndarray): The vehicle type value per vehicle.
+            max_capacities (dict): Vehicle type values mapped to their
+                maximum item, kg and volume capacity.
+
+        Returns:
+            np.ndarray: The maximum capacities with one row per vehicle.
+        """
+        table = np.ones((max(max_capacities) + 1, 3))
+        for type, capacities in max_capacities.items():
+            table[type] = capacities
+        return table[types.astype(np.intp)]
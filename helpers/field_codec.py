@@ -0,0 +1,64 @@
+import ast
+import json
+
+
+class FieldCodec:
+    """
+    A utility class to store nested fields, like addresses, as JSON.
+
+    Nested values are written as compact JSON, for example
+    '{"city":"Malmö","country":"Sweden"}'. Records written in the old form,
+    the Python representation of the dictionary, are still decoded, and
+    encoded as JSON again the next time they are written. A plain string
+    is stored as a JSON string.
+
+    Every value comes back as it was encoded: decode(encode(value)) ==
+    value.
+    """
+
+    @staticmethod
+    def encode(value) -> str:
+        """
+        Encodes a nested value for storage.
+
+        Strings are values like any other and are always encoded as JSON
+        strings, so decoding gives back the exact string, even one like
+        "123" or "null". Stored text must be decoded before it is encoded
+        again.
+
+        Args:
+            value (dict | list | str): The value.
+
+        Returns:
+            str: The value as JSON, or an empty string for no value.
+        """
+        if value is None:
+            return ""
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def decode(value):
+        """
+        Decodes a stored nested value, in JSON or in the old form.
+
+        Args:
+            value (str | dict | list): The value as stored, or already
+                decoded.
+
+        Returns:
+            dict | list | str: The value, the string itself if it is in no
+            stored form, or None if there is no value.
+        """
+        if not isinstance(value, str):
+            return value
+        if value == "":
+            return None
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+        try:
+            return ast.literal_eval(value)  # Old form
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            return value  # Plain string, kept as it is
+
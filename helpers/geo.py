@@ -0,0 +1,41 @@
+import numpy as np
+
+
+class Geo:
+    """
+    A utility class with vectorized great-circle distances.
+
+    Coordinates are latitudes and longitudes in degrees. Arrays of
+    coordinates are broadcast against each other, so one call computes the
+    distances between a point and thousands of points.
+
+    Attributes:
+        EARTH_RADIUS_KM (float): The mean radius of the Earth in km.
+    """
+
+    EARTH_RADIUS_KM = 6371.0
+
+    @staticmethod
+    def haversine(latitudes_1, longitudes_1, latitudes_2, longitudes_2) -> np.ndarray:
+        """
+        Computes the great-circle distances between points with the
+        haversine formula.
+
+        Args:
+            latitudes_1: Latitudes of the first points, in degrees.
+            longitudes_1: Longitudes of the first points, in degrees.
+            latitudes_2: Latitudes of the second points, in degrees.
+            longitudes_2: Longitudes of the second points, in degrees.
+
+        Returns:
+            np.ndarray: The distances in km, broadcast over the inputs.
+        """
+        latitudes_1, longitudes_1, latitudes_2, longitudes_2 = (
+            np.radians(np.asarray(values, dtype=np.float64))
+            for values in (latitudes_1, longitudes_1, latitudes_2, longitudes_2)
+        )
+        a = np.sin((latitudes_2 - latitudes_1) / 2) ** 2 \
+            + np.cos(latitudes_1) * np.cos(latitudes_2) \
+            * np.sin((longitudes_2 - longitudes_1) / 2) ** 2
+        # Rounding can push a slightly over 1 for antipodal points
+        return 2 * Geo.EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+
+
+class IdGenerator:
+    """
+    A utility class to generate unique, time-ordered IDs.
+
+    An ID is made of the creation time in milliseconds, the ID of the worker
+    process and a sequence number within the millisecond, encoded in
+    Crockford base32. The fields have a fixed width and the alphabet is in
+    ASCII order, so IDs sort by creation time as plain strings, and two
+    workers can never build the same ID.
+
+    The worker ID is read from the TRANSPORTER_WORKER_ID environment
+    variable, and defaults to the process ID. Forked processes pick up their
+    own process ID on their first ID.
+
+    Attributes:
+        ALPHABET (str): The Crockford base32 digits, in ASCII order.
+        TIME_LENGTH (int): Number of digits of the timestamp.
+        WORKER_LENGTH (int): Number of digits of the worker ID.
+        SEQUENCE_LENGTH (int): Number of digits of the sequence number.
+        LENGTH (int): Number of digits of an ID.
+    """
+
+    ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+    TIME_LENGTH = 10      # 50 bits, milliseconds until year 37648
+    WORKER_LENGTH = 5     # 25 bits, enough for any process ID
+    SEQUENCE_LENGTH = 3   # 15 bits, 32768 IDs per millisecond and worker
+    LENGTH = TIME_LENGTH + WORKER_LENGTH + SEQUENCE_LENGTH
+
+    lock = threading.Lock()
+    process_id = None
+    worker = None
+    last_timestamp = -1
+    sequence = 0
+
+    @staticmethod
+    def encode(value: int, length: int) -> str:
+        """
+        Encodes a number in base32 with a fixed number of digits.
+
+        Args:
+            value (int): The number to encode.
+            length (int): The number of digits.
+
+        Returns:
+            str: The encoded number, left padded with zeros.
+        """
+        digits = []
+        for _ in range(length):
+            value, digit = divmod(value, 32)
+            digits.append(IdGenerator.ALPHABET[digit])
+        return "".join(reversed(digits))
+
+    @staticmethod
+    def get_worker_id() -> int:
+        """
+        Gets the ID of the current worker process.
+
+        Returns:
+            int: The configured worker ID, or the process ID.
+        """
+        worker_id = int(os.environ.get("TRANSPORTER_WORKER_ID", os.getpid()))
+        return worker_id % (32 ** IdGenerator.WORKER_LENGTH)
+
+    @classmethod
+    def new_id(cls) -> str:
+        """
+        Generates a new ID.
+
+        Returns:
+            str: The ID, unique across the worker processes.
+        """
+        with cls.lock:
+            if cls.process_id != os.getpid():
+                # First ID of this process, possibly forked from another one
+                cls.process_id = os.getpid()
+                cls.worker = cls.encode(cls.get_worker_id(), cls.WORKER_LENGTH)
+                cls.last_timestamp = -1
+
+            # Never go back in time, even if the clock does
+            timestamp = max(time.time_ns() // 1_000_000, cls.last_timestamp)
+            if timestamp == cls.last_timestamp:
+                cls.sequence += 1
+                if cls.sequence == 32 ** cls.SEQUENCE_LENGTH:
+                    # Sequence used up, borrow the next millisecond instead
+                    # of waiting for it, the clock catches up later
+                    timestamp = cls.last_timestamp + 1
+                    cls.sequence = 0
+            else:
+                cls.sequence = 0
+            cls.last_timestamp = timestamp
+
+            return (cls.encode(timestamp, cls.TIME_LENGTH) + cls.worker
+                    + cls.encode(cls.sequence, cls.SEQUENCE_LENGTH))
+
+    @staticmethod
+    def get_timestamp(id: str) -> int:
+        """
+        Reads the creation time of a generated ID.
+
+        Args:
+            id (str): The ID.
+
+        Returns:
+            int: The creation time in milliseconds since the epoch.
+        """
+        timestamp = 0
+        for digit in id[:IdGenerator.TIME_LENGTH]:
+            timestamp = timestamp * 32 + IdGenerator.ALPHABET.index(digit)
+        return timestamp
+
+    @staticmethod
+    def get_first_id(timestamp: int) -> str:
+        """
+        Gets the lowest ID that can be generated at a time, to split IDs in
+        time ranges.
+
+        Args:
+            timestamp (int): The time in milliseconds since the epoch.
+
+        Returns:
+            str: The ID, lower than or equal to any ID generated from then on.
+        """
+        return (IdGenerator.encode(timestamp, IdGenerator.TIME_LENGTH)
+                + "0" * (IdGenerator.WORKER_LENGTH + IdGenerator.SEQUENCE_LENGTH))
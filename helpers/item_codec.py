@@ -0,0 +1,139 @@
+from collections import Counter
+
+
+class ItemCodec:
+    """
+    A utility class to encode the items of an order in a compact form.
+
+    Each distinct item ID is stored once with its quantity, for example
+    "0025:1;0500:2" for one 0025 item and two 0500 items. Records written in
+    the old list form, like "['0025', '0500', '0500']", are still decoded.
+
+    Attributes:
+        SEPARATOR (str): Separates the entries of the encoded items.
+        QUANTITY_SEPARATOR (str): Separates an item ID from its quantity.
+    """
+
+    SEPARATOR = ";"
+    QUANTITY_SEPARATOR = ":"
+
+    @staticmethod
+    def encode(item_ids: list) -> str:
+        """
+        Encodes a list of item IDs.
+
+        Args:
+            item_ids (list): The item IDs, repeated once per item.
+
+        Returns:
+            str: The encoded items, in the order each ID first appears.
+        """
+        return ItemCodec.SEPARATOR.join(
+            f"{item_id}{ItemCodec.QUANTITY_SEPARATOR}{quantity}"
+            for item_id, quantity in Counter(item_ids).items()
+        )
+
+    @staticmethod
+    def get_max_length(item_ids: list, max_quantity: int) -> int:
+        """
+        Gets the longest encoding of items with the given IDs.
+
+        Args:
+            item_ids (list): The distinct item IDs that can be ordered.
+            max_quantity (int): The largest quantity of one item ID.
+
+        Returns:
+            int: The length of the encoding with every ID at the largest
+            quantity.
+        """
+        if len(item_ids) == 0:
+            return 0
+        quantity_length = len(ItemCodec.QUANTITY_SEPARATOR) + len(str(max_quantity))
+        return sum(len(item_id) + quantity_length for item_id in item_ids) \
+            + len(ItemCodec.SEPARATOR) * (len(item_ids) - 1)
+
+    @staticmethod
+    def decode(record) -> list:
+        """
+        Decodes encoded items, in the compact or the old list form.
+
+        Args:
+            record (str | list | dict): The encoded items, or as sent in
+                JSON a plain list of item IDs or item IDs mapped to quantities.
+
+        Returns:
+            list: (item_id, quantity) pairs, one per distinct item ID.
+
+        Raises:
+            ValueError: If the items are not a string, a list or a
+                dictionary, an item ID is not a string, or a quantity is not
+                a positive whole number.
+        """
+        if record is None:
+            return []
+        if not isinstance(record, (str, list, dict)):
+            raise ValueError(f"[i] Invalid items: {record!r}")
+        if not record:
+            return []
+
+        if isinstance(record, list):
+            for item_id in record:
+                ItemCodec.check_item_id(item_id)
+            return list(Counter(record).items())
+
+        if isinstance(record, dict):
+            return [(item_id, ItemCodec.get_quantity(item_id, quantity))
+                    for item_id, quantity in record.items()]
+
+        if record.startswith("["):
+            # Old list form, one quoted ID per item
+            item_ids = [item_id.strip("'\" ")
+                        for item_id in record.strip("[]").split(",")]
+            return list(Counter(item_id for item_id in item_ids if item_id).items())
+
+        pairs = []
+        for entry in record.split(ItemCodec.SEPARATOR):
+            item_id, _, quantity = entry.partition(ItemCodec.QUANTITY_SEPARATOR)
+            pairs.append((item_id, ItemCodec.get_quantity(item_id, quantity)
+                          if quantity else 1))
+        return pairs
+
+    @staticmethod
+    def check_item_id(item_id) -> None:
+        """
+        Checks the type of an item ID.
+
+        Args:
+            item_id: The item ID.
+
+        Raises:
+            ValueError: If the item ID is not a string.
+        """
+        if not isinstance(item_id, str):
+            raise ValueError(f"[i] Invalid item id: {item_id!r}")
+
+    @staticmethod
+    def get_quantity(item_id: str, quantity) -> int:
+        """
+        Reads the quantity of an item.
+
+        Args:
+            item_id (str): The item ID, for the error message.
+            quantity (int | str): The quantity, as a number or as stored.
+
+        Returns:
+            int: The quantity.
+
+        Raises:
+            ValueError: If the quantity is not a positive whole number.
+        """
+        ItemCodec.check_item_id(item_id)
+        if isinstance(quantity, int) and not isinstance(quantity, bool):
+            value = quantity
+        elif isinstance(quantity, str) and quantity.strip().isdigit():
+            value = int(quantity)
+        else:
+            value = 0
+        if value <= 0:
+            raise ValueError(f"[i] Invalid quantity of item {item_id}: {quantity!r}")
+        return value
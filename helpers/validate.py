@@ -1,9 +1,14 @@
 import re
+from concurrent.futures import ProcessPoolExecutor
 
 class Validate:
     """
     A utility class for validating various input formats using regular expressions.
 
+    The patterns are compiled once. Besides the validators of single values,
+    column() validates a whole column at once, without printing, and can
+    spread large columns over a pool of processes.
+
     Methods:
         Various static methods to validate input strings against specific formats.
     """
@@ -17,6 +22,16 @@ class Validate:
     )
     VEHICLE_NUMBER_REGEX = r"^([A-Z]{3}[0-9]{2}[A-Z0-9]{1})$"
 
+    # Compiled once, instead of going through the cache of re on every call
+    COMPANY_NUMBER_PATTERN = re.compile(COMPANY_NUMBER_REGEX)
+    EMAIL_PATTERN = re.compile(EMAIL_REGEX)
+    MOBILE_NUMBER_PATTERN = re.compile(MOBILE_NUMBER_REGEX)
+    PERSONAL_NUMBER_PATTERN = re.compile(PERSONAL_NUMBER_REGEX)
+    VEHICLE_NUMBER_PATTERN = re.compile(VEHICLE_NUMBER_REGEX)
+
+    # Columns shorter than this are validated in the calling process
+    POOL_MIN_SIZE = 100000
+
     @staticmethod
     def company_number(input) -> bool:
         """
@@ -28,7 +43,7 @@ class Validate:
         Returns:
             bool: True if the input matches the company number format, otherwise False.
         """
-        return Validate.regex(input, Validate.COMPANY_NUMBER_REGEX)
+        return Validate.COMPANY_NUMBER_PATTERN.fullmatch(input) is not None
 
     @staticmethod
     def email(input) -> bool:
@@ -41,7 +56,7 @@ class Validate:
         Returns:
             bool: True if the input matches the email format, otherwise False.
         """
-        return Validate.regex(input, Validate.EMAIL_REGEX)
+        return Validate.EMAIL_PATTERN.fullmatch(input) is not None
 
     @staticmethod
     def mobile(input) -> bool:
@@ -54,7 +69,7 @@ class Validate:
         Returns:
             bool: True if the input matches the mobile number format, otherwise False.
         """
-        return Validate.regex(input, Validate.MOBILE_NUMBER_REGEX)
+        return Validate.MOBILE_NUMBER_PATTERN.fullmatch(input) is not None
 
     @staticmethod
     def number(input) -> bool:
@@ -84,12 +99,7 @@ class Validate:
         Returns:
             bool: True if the name contains only letters and single spaces, False otherwise.
         """
-        space_count = input.count("  ")  # Check for multiple spaces
-        is_not_alpha = any(
-            not part_of_name.isalpha() for part_of_name in input.split(" ")
-        )
-
-        if is_not_alpha or space_count > 0:
+        if not Validate.is_person_full_name(input):
             print(
                 "[i] The name should contain only letters and "
                 "no more than one whitespace in between."
@@ -98,6 +108,21 @@ class Validate:
         else:
             return True
 
+    @staticmethod
+    def is_person_full_name(input: str) -> bool:
+        """
+        Checks a person's full name, like person_full_name() but without
+        printing.
+
+        Args:
+            input (str): The input string to validate.
+
+        Returns:
+            bool: True if the name contains only letters and single spaces, False otherwise.
+        """
+        # Words of letters only, separated by single spaces
+        return all(part_of_name.isalpha() for part_of_name in input.split(" "))
+
     @staticmethod
     def personal_number(input) -> bool:
         """
@@ -109,7 +134,7 @@ class Validate:
         Returns:
             bool: True if the input matches the personal number format, otherwise False.
         """
-        return Validate.regex(input, Validate.PERSONAL_NUMBER_REGEX)
+        return Validate.PERSONAL_NUMBER_PATTERN.fullmatch(input) is not None
 
     @staticmethod
     def regex(input, regex) -> bool:
@@ -126,6 +151,89 @@ class Validate:
         result = re.fullmatch(regex, input)  # Perform regex matching
         return result is not None  # Return True if match found, otherwise False
 
+    @staticmethod
+    def get_check(kind: str):
+        """
+        Gets the check of a kind of value, for the validation of columns.
+
+        Args:
+            kind (str): The kind of value: company_number, email, mobile,
+                person_full_name, personal_number or vehicle_number.
+
+        Returns:
+            The function checking a string.
+
+        Raises:
+            ValueError: If the kind is unknown.
+        """
+        checks = {
+            "company_number": Validate.COMPANY_NUMBER_PATTERN.fullmatch,
+            "email": Validate.EMAIL_PATTERN.fullmatch,
+            "mobile": Validate.MOBILE_NUMBER_PATTERN.fullmatch,
+            "person_full_name": Validate.is_person_full_name,
+            "personal_number": Validate.PERSONAL_NUMBER_PATTERN.fullmatch,
+            "vehicle_number": Validate.VEHICLE_NUMBER_PATTERN.fullmatch,
+        }
+        if kind not in checks:
+            raise ValueError(f"[i] Unknown kind of value: {kind}")
+        return checks[kind]
+
+    @staticmethod
+    def get_mask(values: list, kind: str, allow_empty: bool = False) -> list:
+        """
+        Checks every value of a column.
+
+        Args:
+            values (list): The values.
+            kind (str): The kind of value, see get_check().
+            allow_empty (bool): Accept None and empty strings.
+
+        Returns:
+            list: True for each valid value. Values that are not strings are
+            not valid.
+        """
+        check = Validate.get_check(kind)
+        return [(allow_empty and (value is None or value == ""))
+                or (isinstance(value, str) and bool(check(value)))
+                for value in values]
+
+    @staticmethod
+    def column(values: list, kind: str, allow_empty: bool = False,
+               processes: int = None) -> tuple:
+        """
+        Validates a whole column of values at once, without printing.
+
+        Args:
+            values (list): The values.
+            kind (str): The kind of value: company_number, email, mobile,
+                person_full_name, personal_number or vehicle_number.
+            allow_empty (bool): Accept None and empty strings, for optional
+                fields.
+            processes (int, optional): Spread a column of at least
+                POOL_MIN_SIZE values over this many processes.
+
+        Returns:
+            tuple: The mask, a list with True for each valid value, and the
+            errors, a list of (position, message) pairs for the invalid
+            values.
+        """
+        values = list(values)
+        if processes is not None and processes > 1 \
+                and len(values) >= Validate.POOL_MIN_SIZE:
+            chunk_size = -(-len(values) // (processes * 4))
+            chunks = [values[start:start + chunk_size]
+                      for start in range(0, len(values), chunk_size)]
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                masks = pool.map(Validate.get_mask, chunks,
+                                 [kind] * len(chunks), [allow_empty] * len(chunks))
+                mask = [valid for chunk_mask in masks for valid in chunk_mask]
+        else:
+            mask = Validate.get_mask(values, kind, allow_empty)
+
+        errors = [(position, f"[i] Invalid {kind}: {values[position]!r}")
+                  for position, valid in enumerate(mask) if not valid]
+        return mask, errors
+
     @staticmethod
     def user_entry(entry: str, expected_entry: str) -> bool:
         """
@@ -155,4 +263,4 @@ class Validate:
         Returns:
             bool: True if the input matches the vehicle number format, otherwise False.
         """
-        return Validate.regex(input, Validate.VEHICLE_NUMBER_REGEX)
+        return Validate.VEHICLE_NUMBER_PATTERN.fullmatch(input) is not None
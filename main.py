@@ -1,15 +1,78 @@
-from flask import Flask
+import os
+from flask import Flask, g
 from api.user import user
 from api.customer import customer
 from api.vehicle import vehicle
 from api.order import order
+from database.identity_map import IdentityMap
+from domain.item import ItemCatalog
+from domain.order import Order
+from domain.vehicle import Vehicle
 
-app = Flask(__name__)
+def create_app() -> Flask:
+    """
+    Builds the application with its routes and storage options.
 
-app.register_blueprint(user, url_prefix='/user')
-app.register_blueprint(customer, url_prefix='/customer')
-app.register_blueprint(vehicle, url_prefix='/vehicle')
-app.register_blueprint(order, url_prefix='/order')
+    The in-memory fleet is not enabled here, since the module may be
+    imported by more than one process. See enable_fleet_state.
+
+    Returns:
+        Flask: The application.
+    """
+    app = Flask(__name__)
+
+    app.register_blueprint(user, url_prefix='/user')
+    app.register_blueprint(customer, url_prefix='/customer')
+    app.register_blueprint(vehicle, url_prefix='/vehicle')
+    app.register_blueprint(order, url_prefix='/order')
+
+    @app.before_request
+    def begin_identity_map():
+        """
+        Starts a new identity map for the lazy references of the request.
+        """
+        g.identity_map_token = IdentityMap.begin()
+
+    @app.teardown_request
+    def end_identity_map(error=None):
+        """
+        Drops the identity map of the request.
+        """
+        token = g.pop("identity_map_token", None)
+        if token is not None:
+            IdentityMap.end(token)
+
+    # Load the item catalog once at startup
+    ItemCatalog.get()
+
+    # Store orders and vehicles in fixed-width records, updated in place
+    if os.environ.get("TRANSPORTER_FIXED_WIDTH") == "1":
+        Order.FIXED_WIDTH = True
+        Vehicle.FIXED_WIDTH = True
+
+    return app
+
+
+def enable_fleet_state() -> None:
+    """
+    Keeps the fleet in memory when TRANSPORTER_FLEET_STATE is 1.
+
+    The engine owns the vehicle table, so it must be enabled in the one
+    process serving the requests, never at import time. A server with a
+    single worker calls this in that worker.
+    """
+    if os.environ.get("TRANSPORTER_FLEET_STATE") == "1":
+        Vehicle.enable_fleet_state(
+            checkpoint_interval=float(os.environ.get("TRANSPORTER_CHECKPOINT_INTERVAL", 60)),
+            dirty_threshold=int(os.environ.get("TRANSPORTER_CHECKPOINT_THRESHOLD", 1000)),
+        )
+
+
+app = create_app()
 
 if __name__ == "__main__":
+    # The debug reloader serves from a child process and only watches the
+    # files in this one, so only the child owns the fleet
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        enable_fleet_state()
     app.run(debug=True)
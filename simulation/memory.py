@@ -0,0 +1,158 @@
+import argparse
+import os
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+from domain.company import Company
+from domain.item import Item, ItemType, Volume
+from domain.location import Location
+from domain.order import Order
+from domain.person import Person
+from domain.truck import Truck
+
+
+class MemoryProfiler:
+    """
+    Measures the memory taken per domain object.
+
+    Each domain class is measured twice with tracemalloc: as it is, with
+    slots, and in the layout it had before, with a per-instance __dict__ and,
+    for the classes stored in a table, a Database object holding a copy of
+    the record. The difference is the saving per object.
+
+    The measurement runs in a temporary working directory, because building
+    a Database object creates its file when it is missing.
+
+    Attributes:
+        FACTORIES (dict): Builds the n-th sample object of each class.
+    """
+
+    FACTORIES = {
+        Location: lambda n: Location(f"City{n}", "Sweden"),
+        Volume: lambda n: Volume(1.0, 2.0, float(n)),
+        Item: lambda n: Item(f"{n:04d}", 10.0, Volume(1.0, 1.0, 1.0),
+                             0.25, ItemType.SOLID),
+        Truck: lambda n: Truck(f"TRK{n:07d}", Location("Lerum", "Sweden")),
+        Person: lambda n: Person(f"{n:06d}-1234", f"Name {n}", None,
+                                 "0700000000", f"person{n}@example.com",
+                                 "password", True),
+        Company: lambda n: Company(f"{n:06d}-0000", f"Company {n}", None, None,
+                                   f"invoice{n}@example.com", []),
+        Order: lambda n: MemoryProfiler.build_order(n),
+    }
+
+    @staticmethod
+    def build_order(n: int) -> Order:
+        """
+        Builds a sample order, referring to its customer and vehicle by ID
+        like an order read from the database.
+
+        Args:
+            n (int): The number of the sample.
+
+        Returns:
+            Order: The sample order.
+        """
+        order = Order(f"{n:08x}", items=[], total_weight=1.25,
+                      delivery_location=Location("Lerum", "Sweden"),
+                      order_date="20991230", delivery_date="20991231")
+        Order.customer.set_id(order, f"{n:06d}-1234")
+        Order.vehicle.set_id(order, f"TRK{n:07d}")
+        return order
+
+    @staticmethod
+    def to_dict_layout(object) -> SimpleNamespace:
+        """
+        Copies an object to the layout used before slots, with the same
+        attribute values in a per-instance __dict__.
+
+        Args:
+            object: A slotted domain object.
+
+        Returns:
+            SimpleNamespace: The object in the __dict__ layout.
+        """
+        attributes = {}
+        for cls in type(object).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                attributes[name] = getattr(object, name, None)
+        if hasattr(object, "get_database"):
+            attributes["database"] = object.get_database()
+        return SimpleNamespace(**attributes)
+
+    @staticmethod
+    def measure(build, count: int) -> float:
+        """
+        Measures the memory taken by a batch of objects.
+
+        Args:
+            build: Builds the n-th object.
+            count (int): The number of objects in the batch.
+
+        Returns:
+            float: The average number of bytes per object.
+        """
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            objects = [build(n) for n in range(count)]
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del objects
+        return (after - before) / count
+
+    def run(self, count: int) -> list:
+        """
+        Measures every domain class.
+
+        Args:
+            count (int): The number of objects per measurement.
+
+        Returns:
+            list: A result per class, with the bytes per object in both
+            layouts and the saving.
+        """
+        working_directory = os.getcwd()
+        results = []
+        with tempfile.TemporaryDirectory() as profile_directory:
+            os.chdir(profile_directory)
+            os.mkdir("database")
+            try:
+                for cls, build in self.FACTORIES.items():
+                    slotted = self.measure(build, count)
+                    dict_layout = self.measure(
+                        lambda n: self.to_dict_layout(build(n)), count
+                    )
+                    results.append({
+                        'class': cls.__name__,
+                        'slotted_bytes': slotted,
+                        'dict_bytes': dict_layout,
+                        'saving': 1 - slotted / dict_layout,
+                    })
+            finally:
+                os.chdir(working_directory)
+        return results
+
+
+def print_report(results: list) -> None:
+    """
+    Prints the results of a profile as a table.
+
+    Args:
+        results (list): The result dictionaries of MemoryProfiler.run.
+    """
+    print(f"{'class':<10}{'slotted B':>11}{'__dict__ B':>12}{'saving':>9}")
+    for result in results:
+        print(f"{result['class']:<10}{result['slotted_bytes']:>11.0f}"
+              f"{result['dict_bytes']:>12.0f}{result['saving']:>9.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the memory taken per domain object."
+    )
+    parser.add_argument("--count", type=int, default=10000)
+    arguments = parser.parse_args()
+
+    print_report(MemoryProfiler().run(arguments.count))
@@ -0,0 +1,240 @@
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from api.order import from_data_to_order
+from database.fleet_state import FleetState
+from domain.bike import Bike
+from domain.item import ItemList
+from domain.location import LocationList
+from domain.ship import Ship
+from domain.truck import Truck
+from domain.vehicle import Vehicle
+
+
+class OrderStreamSimulator:
+    """
+    Replays a seeded stream of orders against a synthetic fleet.
+
+    The simulation runs in a temporary working directory, so the database
+    files of the application are never touched. Each order goes through
+    from_data_to_order, which allocates a vehicle, and the capacity of the
+    vehicle is reserved, so the fleet fills up like it does in production.
+
+    Attributes:
+        VEHICLE_MIX (dict): Share of each vehicle class in the fleet.
+        ALLOCATION_PATHS (tuple): The allocation paths that can be measured.
+    """
+
+    VEHICLE_MIX = {Bike: 0.5, Truck: 0.4, Ship: 0.1}
+    ALLOCATION_PATHS = ("csv", "fleet_state")
+
+    def __init__(self, fleet_size: int, number_of_orders: int,
+                 seed: int = 42, allocation_path: str = "fleet_state",
+                 max_items_per_order: int = 8) -> None:
+        """
+        Initializes the simulator.
+
+        Args:
+            fleet_size (int): The number of vehicles in the fleet.
+            number_of_orders (int): The number of orders to replay.
+            seed (int): Seed for the fleet and the order stream.
+            allocation_path (str): One of ALLOCATION_PATHS.
+            max_items_per_order (int): Maximum number of items in an order.
+        """
+        if allocation_path not in self.ALLOCATION_PATHS:
+            raise ValueError(f"[i] Unknown allocation path: {allocation_path}")
+
+        self.fleet_size = fleet_size
+        self.number_of_orders = number_of_orders
+        self.seed = seed
+        self.allocation_path = allocation_path
+        self.max_items_per_order = max_items_per_order
+        self.cities = LocationList().cities
+        self.item_ids = [item.id for item in ItemList().items]
+
+    def build_fleet(self, random_generator: random.Random) -> list:
+        """
+        Builds the synthetic fleet spread over the known cities.
+
+        Args:
+            random_generator (random.Random): The seeded generator.
+
+        Returns:
+            list: The Vehicle objects of the fleet.
+        """
+        vehicle_classes = random_generator.choices(
+            list(self.VEHICLE_MIX), weights=list(self.VEHICLE_MIX.values()),
+            k=self.fleet_size
+        )
+        return [
+            vehicle_class(f"SIM{number:07d}",
+                          random_generator.choice(self.cities))
+            for number, vehicle_class in enumerate(vehicle_classes)
+        ]
+
+    def save_fleet(self, fleet: list) -> None:
+        """
+        Writes the whole fleet to the vehicle database at once.
+
+        Args:
+            fleet (list): The Vehicle objects of the fleet.
+        """
+        vehicle = Vehicle()
+        content = [list(vehicle.to_dict())]
+        content += [list(fleet_vehicle.to_dict().values()) for fleet_vehicle in fleet]
+        vehicle.database.save_content(content)
+
+    def build_orders(self, random_generator: random.Random) -> list:
+        """
+        Builds the order stream from the item catalog.
+
+        Args:
+            random_generator (random.Random): The seeded generator.
+
+        Returns:
+            list: Order data dictionaries, like the body of POST /order/.
+        """
+        orders = []
+        for _ in range(self.number_of_orders):
+            number_of_items = random_generator.randint(1, self.max_items_per_order)
+            location = random_generator.choice(self.cities)
+            orders.append({
+                'customer_id': "",
+                'priority': random_generator.randint(1, 3),
+                'items': str(random_generator.choices(self.item_ids,
+                                                      k=number_of_items)),
+                'delivery_city': location.city,
+                'delivery_country': location.country,
+                'delivery_date': "20991231",
+            })
+        return orders
+
+    def get_utilization(self) -> dict:
+        """
+        Calculates the share of the fleet capacity in use.
+
+        Returns:
+            dict: The used share of the item, kg and volume capacity.
+        """
+        if FleetState.active is not None:
+            records = FleetState.active.iter_records()
+        else:
+            records = Vehicle().database.iter_records()
+
+        remaining = np.zeros(3)
+        maximum = np.zeros(3)
+        max_capacities = Vehicle.get_max_capacities()
+        for record in records:
+            remaining += [float(record['remaining_item_capacity']),
+                          float(record['remaining_kg_capacity']),
+                          float(record['remaining_volume_capacity'])]
+            maximum += max_capacities[int(record['type'])]
+
+        used = 1 - remaining / maximum
+        return {'items': float(used[0]), 'kg': float(used[1]),
+                'volume': float(used[2])}
+
+    def run(self) -> dict:
+        """
+        Runs the simulation.
+
+        Returns:
+            dict: Throughput, latency percentiles, utilization and
+            rejection rate of the run.
+        """
+        random_generator = random.Random(self.seed)
+        working_directory = os.getcwd()
+
+        with tempfile.TemporaryDirectory() as simulation_directory:
+            os.chdir(simulation_directory)
+            os.mkdir("database")
+            try:
+                self.save_fleet(self.build_fleet(random_generator))
+                orders = self.build_orders(random_generator)
+
+                if self.allocation_path == "fleet_state":
+                    # Checkpoints are left out of the measured run
+                    Vehicle.enable_fleet_state(checkpoint_interval=24 * 3600,
+                                               dirty_threshold=2 ** 62)
+
+                latencies = np.empty(len(orders))
+                rejected = 0
+                started = time.perf_counter()
+                # Keep the per-record database messages out of the report
+                with open(os.devnull, 'w') as devnull, \
+                     contextlib.redirect_stdout(devnull):
+                    for index, data in enumerate(orders):
+                        order_started = time.perf_counter()
+                        order = from_data_to_order(data)
+                        if order.vehicle is not None:
+                            order.vehicle.reserve_capacity(
+                                len(order.items), order.total_weight,
+                                order.get_total_volume()
+                            )
+                        else:
+                            rejected += 1
+                        latencies[index] = time.perf_counter() - order_started
+                elapsed = time.perf_counter() - started
+
+                utilization = self.get_utilization()
+            finally:
+                FleetState.disable()
+                os.chdir(working_directory)
+
+        p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+        return {
+            'fleet_size': self.fleet_size,
+            'orders': len(orders),
+            'allocation_path': self.allocation_path,
+            'orders_per_second': len(orders) / elapsed,
+            'latency_p50_ms': float(p50),
+            'latency_p95_ms': float(p95),
+            'latency_p99_ms': float(p99),
+            'utilization': utilization,
+            'rejection_rate': rejected / len(orders),
+        }
+
+
+def print_report(results: list) -> None:
+    """
+    Prints the results of several runs as a table.
+
+    Args:
+        results (list): The result dictionaries of OrderStreamSimulator.run.
+    """
+    print(f"{'path':<12}{'fleet':>9}{'orders':>8}{'orders/s':>11}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'util kg':>9}{'util vol':>9}{'rejected':>10}")
+    for result in results:
+        print(f"{result['allocation_path']:<12}{result['fleet_size']:>9}"
+              f"{result['orders']:>8}{result['orders_per_second']:>11.1f}"
+              f"{result['latency_p50_ms']:>9.2f}{result['latency_p95_ms']:>9.2f}"
+              f"{result['latency_p99_ms']:>9.2f}"
+              f"{result['utilization']['kg']:>9.1%}"
+              f"{result['utilization']['volume']:>9.1%}"
+              f"{result['rejection_rate']:>10.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the order allocation throughput of the fleet."
+    )
+    parser.add_argument("--fleet-sizes", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--paths", nargs="+", default=["fleet_state"],
+                        choices=OrderStreamSimulator.ALLOCATION_PATHS)
+    arguments = parser.parse_args()
+
+    results = []
+    for allocation_path in arguments.paths:
+        for fleet_size in arguments.fleet_sizes:
+            simulator = OrderStreamSimulator(fleet_size, arguments.orders,
+                                             arguments.seed, allocation_path)
+            results.append(simulator.run())
+    print_report(results)
@@ -0,0 +1,34 @@
+import os
+import shutil
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database.fleet_state import FleetState
+from database.index import TableIndex
+from domain.item import ItemCatalog
+from domain.location import LocationRegistry
+from domain.pricing import PricingEngine
+
+
+@pytest.fixture(autouse=True)
+def workspace(tmp_path, monkeypatch):
+    """
+    Runs each test in an empty working directory with only the item
+    catalog, since the tables are found by relative paths, and with fresh
+    process-wide state.
+    """
+    os.makedirs(tmp_path / "database")
+    shutil.copy(os.path.join(ROOT, "database", "items.csv"),
+                tmp_path / "database" / "items.csv")
+    monkeypatch.chdir(tmp_path)
+
+    TableIndex.instances.clear()
+    ItemCatalog.instance = None
+    PricingEngine.instance = None
+    LocationRegistry.instance = None
+    yield tmp_path
+    FleetState.disable()
+    TableIndex.instances.clear()
@@ -0,0 +1,46 @@
+import numpy as np
+from domain.bike import Bike
+from domain.location import LocationRegistry
+from domain.truck import Truck
+from domain.vehicle import Vehicle, VehicleStatusType
+from helpers.allocation import Allocation
+
+
+MAX_CAPACITIES = np.array([[2, 10, 60], [100, 3000, 15000]], dtype=float)
+
+
+def test_a_vehicle_fits_a_load_in_all_three_dimensions():
+    fits = Allocation.fits(np.array([2, 100, 100]), np.array([10.0, 3000.0, 3000.0]),
+                           np.array([60.0, 15000.0, 10.0]), 2, 10.0, 50.0)
+    assert fits.tolist() == [True, True, False]
+
+
+def test_best_fit_picks_the_vehicle_the_load_fills_the_most():
+    items, kg, volume = np.array([2, 100]), np.array([10.0, 3000.0]), \
+        np.array([60.0, 15000.0])
+    assert Allocation.best_fit(items, kg, volume, MAX_CAPACITIES, 1, 5.0, 10.0) == 0
+    # Too heavy for the bike
+    assert Allocation.best_fit(items, kg, volume, MAX_CAPACITIES, 1, 50.0, 10.0) == 1
+    # Left out by the mask, or too big for any vehicle
+    assert Allocation.best_fit(items, kg, volume, MAX_CAPACITIES, 1, 5.0, 10.0,
+                               mask=np.array([False, True])) == 1
+    assert Allocation.best_fit(items, kg, volume, MAX_CAPACITIES, 1, 5000.0, 1.0) == -1
+
+
+def test_max_capacities_are_looked_up_by_type():
+    table = Allocation.max_capacities_by_type(
+        np.array([2, 1, 2], dtype=np.int8), {1: (2, 10, 60), 2: (100, 3000, 15000)}
+    )
+    assert table.tolist() == [[100, 3000, 15000], [2, 10, 60], [100, 3000, 15000]]
+
+
+def test_first_available_vehicle_is_the_best_free_fit():
+    gothenburg = LocationRegistry.get().find("Gothenburg")
+    Truck(id="T1", current_position=gothenburg).add()
+    Bike(id="B1", current_position=gothenburg).add()
+    Bike(id="B2", current_position=gothenburg,
+         status=VehicleStatusType.NOT_WORKING).add()
+
+    assert Vehicle().get_first_available(1, 5.0, 10.0).id == "B1"
+    assert Vehicle().get_first_available(3, 5.0, 10.0).id == "T1"
+    assert Vehicle().get_first_available(1, 5000.0, 10.0) is None
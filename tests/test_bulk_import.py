@@ -0,0 +1,103 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from flask import Flask
+from api.vehicle import vehicle as vehicle_routes
+from domain.bulk_import import CompanyImport, PersonImport, VehicleImport
+from domain.company import Company
+from domain.person import Person
+from domain.vehicle import Vehicle
+from helpers.validate import Validate
+
+
+def to_lines(*rows) -> list:
+    return [row if isinstance(row, str) else json.dumps(row) for row in rows]
+
+
+def test_each_row_gets_a_result_in_order():
+    Person(id="8501011234", full_name="Ada Lovelace").add()
+    lines = to_lines(
+        {"id": "9001011234", "full_name": "Grace Hopper", "email": "grace@navy.mil"},
+        "",                                   # Blank lines are skipped
+        "{not json",
+        ["a list"],
+        {"id": "8501011234", "full_name": "Ada Lovelace"},  # Stored already
+        {"id": "9001011234", "full_name": "Grace Hopper"},  # Twice in the batch
+        {"id": "123", "full_name": "R2 D2", "email": "no"},
+    )
+    results = list(PersonImport(batch_size=2).run(lines))
+
+    assert [result["line"] for result in results] == [1, 3, 4, 5, 6, 7]
+    assert [result["status"] for result in results] == \
+        ["created", "error", "error", "error", "error", "error"]
+    assert "already exists" in results[3]["error"]
+    assert results[5]["error"] == "[i] Invalid id, full_name, email"
+    assert Person("9001011234").find()
+
+
+def test_users_need_a_password():
+    rows = to_lines({"id": "9001011234", "full_name": "Grace Hopper"},
+                    {"id": "8501011234", "full_name": "Ada Lovelace",
+                     "password": "secret"})
+    results = list(PersonImport(is_user=True).run(rows))
+    assert [result["status"] for result in results] == ["error", "created"]
+    assert results[0]["error"] == "[i] Invalid password"
+
+
+def test_companies_are_checked_by_field():
+    rows = to_lines(
+        {"id": "556677-8899", "company_name": "Acme", "invoice_email": "a@acme.se",
+         "related_users": ["8501011234"]},
+        {"id": "556677-8800", "company_name": "Acme  AB", "related_users": "all"},
+    )
+    results = list(CompanyImport().run(rows))
+    assert results[0]["status"] == "created"
+    assert results[1]["error"] == "[i] Invalid company_name, related_users"
+    assert Company("556677-8899").find()
+
+
+def test_vehicles_are_streamed_through_the_endpoint():
+    app = Flask(__name__)
+    app.register_blueprint(vehicle_routes, url_prefix='/vehicle')
+    body = "\n".join(to_lines(
+        {"id": "ABC123", "type": "truck", "current_position": "gothenburg"},
+        {"id": "ABC124", "type": "boat", "current_position": "Gothenburg"},
+        {"id": "ABC125", "type": "bike", "current_position": "Atlantis"},
+    ))
+    response = app.test_client().post("/vehicle/bulk", data=body)
+
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [result["status"] for result in results] == ["created", "error", "error"]
+    assert results[1]["error"] == "[i] Type boat does not exist"
+    assert results[2]["error"] == "[i] Invalid current_position"
+    vehicle = Vehicle(id="ABC123")
+    assert vehicle.find() and vehicle.current_position.city == "Gothenburg"
+
+
+def test_a_failed_write_fails_the_rows_of_the_batch(monkeypatch):
+    monkeypatch.setattr(VehicleImport, "add_many", lambda self, objects: 0)
+    rows = to_lines({"id": "ABC123", "type": "truck", "current_position": "Malmo"})
+    results = list(VehicleImport().run(rows))
+    assert results == [{"line": 1, "status": "error", "id": "ABC123",
+                        "error": "[i] Failed to write the batch"}]
+
+
+def test_batches_are_validated_over_processes(monkeypatch):
+    pools = []
+
+    class CountedPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(Validate, "POOL_MIN_SIZE", 10)
+    monkeypatch.setattr("helpers.validate.ProcessPoolExecutor", CountedPool)
+    rows = [{"id": f"ABC{number:02}A", "type": "truck",
+             "current_position": "Lerum"}
+            for number in range(12)] + [{"id": "abc", "type": "truck"}]
+
+    importer = VehicleImport(batch_size=4, processes=2)
+    results = list(importer.run(to_lines(*rows)))
+
+    assert importer.batch_size == 10  # Large enough to reach the pool
+    assert len(pools) == 1            # The id column of the first batch
+    assert [result["status"] for result in results] == ["created"] * 12 + ["error"]
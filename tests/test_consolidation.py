@@ -0,0 +1,80 @@
+from domain.bike import Bike
+from domain.consolidation import ShipmentConsolidator
+from domain.item import ItemCatalog
+from domain.location import LocationRegistry
+from domain.order import Order
+from domain.truck import Truck
+from domain.vehicle import Vehicle, VehicleStatusType
+
+
+def make_pending_order(id: str, city: str, number_of_items: int = 1) -> Order:
+    item = ItemCatalog.get().get_item_by_id("0025")
+    order = Order(id=id, delivery_location=LocationRegistry.get().find(city),
+                  items=[item] * number_of_items,
+                  total_weight=item.weight * number_of_items,
+                  delivery_date="20261020")
+    assert order.add(skip_existence_check=True)
+    return order
+
+
+def find_vehicle(id: str) -> Vehicle:
+    vehicle = Vehicle(id=id)
+    assert vehicle.find()
+    return vehicle
+
+
+def test_a_vehicle_serves_one_group_per_run():
+    Truck(id="T1", current_position=LocationRegistry.get().find("Gothenburg")).add()
+    make_pending_order("A", "Gothenburg")
+    make_pending_order("B", "Malmo")
+
+    summaries = ShipmentConsolidator().consolidate()
+
+    assert sorted(len(summary['vehicles']) for summary in summaries) == [0, 1]
+    assert sorted(len(summary['pending_orders']) for summary in summaries) == [0, 1]
+
+
+def test_groups_are_split_over_the_free_vehicles():
+    gothenburg = LocationRegistry.get().find("Gothenburg")
+    Truck(id="T1", current_position=gothenburg).add()
+    Bike(id="B1", current_position=gothenburg).add()
+    make_pending_order("A", "Gothenburg", 50)
+    make_pending_order("B", "Malmo")
+
+    summaries = {summary['delivery_city']: summary
+                 for summary in ShipmentConsolidator().consolidate()}
+
+    assert summaries["Gothenburg"]['vehicles'] == ["T1"]
+    assert summaries["Malmo"]['vehicles'] == ["B1"]
+    assert summaries["Malmo"]['pending_orders'] == []
+
+
+def test_used_vehicles_keep_the_capacity_they_have_left():
+    Truck(id="T1", current_position=LocationRegistry.get().find("Gothenburg")).add()
+    make_pending_order("A", "Gothenburg")
+    ShipmentConsolidator().consolidate()
+
+    truck = find_vehicle("T1")
+    assert truck.status == VehicleStatusType.FREE
+    assert truck.remaining_item_capacity == Truck.MAX_ITEM_CAPACITY - 1
+
+    # A later run fills the rest of the truck
+    make_pending_order("B", "Malmo", Truck.MAX_ITEM_CAPACITY)
+    make_pending_order("C", "Malmo", Truck.MAX_ITEM_CAPACITY - 1)
+    summaries = ShipmentConsolidator().consolidate()
+    assert summaries[0]['vehicles'] == ["T1"]
+    assert summaries[0]['pending_orders'] == ["B"]
+    assert find_vehicle("T1").remaining_item_capacity == 0
+
+
+def test_orders_stay_pending_when_their_vehicle_is_not_saved(monkeypatch):
+    Truck(id="T1", current_position=LocationRegistry.get().find("Gothenburg")).add()
+    make_pending_order("A", "Gothenburg")
+    monkeypatch.setattr(Vehicle, "reserve_capacity",
+                        lambda self, number_of_items, weight, volume=0: False)
+
+    summaries = ShipmentConsolidator().consolidate()
+
+    assert summaries[0]['vehicles'] == []
+    assert summaries[0]['pending_orders'] == ["A"]
+    assert Order.find_many(["A"])[0].vehicle is None
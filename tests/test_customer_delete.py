@@ -0,0 +1,115 @@
+import pytest
+from flask import Flask
+from api.customer import customer as customer_routes
+from domain.company import Company
+from domain.item import ItemCatalog
+from domain.location import LocationRegistry
+from domain.order import Order, OrderStatusLog
+from domain.person import Person
+from domain.truck import Truck
+from domain.vehicle import Vehicle
+
+
+def make_order(id: str, customer) -> Order:
+    item = ItemCatalog.get().get_item_by_id("0100")
+    vehicle = Vehicle(id="T1")
+    order = Order(id=id, customer=customer, items=[item], total_weight=item.weight,
+                  vehicle=vehicle if vehicle.find() else None)
+    assert order.place(skip_existence_check=True)
+    return order
+
+
+def find_person(id: str) -> Person:
+    person = Person(id)
+    return person if person.find() else None
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(customer_routes, url_prefix='/customer')
+    return app.test_client()
+
+
+def test_a_person_with_orders_is_kept():
+    person = Person(id="P1", full_name="Ada Lovelace")
+    person.add()
+    order = make_order("A", person)
+
+    with pytest.raises(ValueError):
+        person.delete()
+    assert find_person("P1") is not None
+
+    assert order.delete()
+    assert person.delete()
+    assert find_person("P1") is None
+
+
+def test_a_company_with_orders_is_kept():
+    company = Company(id="C1", company_name="Acme", related_users=[])
+    company.add()
+    make_order("A", company)
+
+    with pytest.raises(ValueError):
+        company.delete()
+    assert Company("C1").find()
+
+
+def test_a_deleted_user_leaves_its_companies():
+    Person(id="U1", full_name="Ada Lovelace", is_user=True).add()
+    Company(id="C1", company_name="Acme", related_users=["U1", "U2"]).add()
+
+    assert Person("U1").delete()
+    company = Company("C1")
+    assert company.find()
+    assert Company.parse_related_users(company.related_users) == ["U2"]
+
+
+def test_the_endpoint_refuses_or_cascades(client):
+    Truck(id="T1", current_position=LocationRegistry.get().find("Gothenburg")).add()
+    person = Person(id="P1", full_name="Ada Lovelace")
+    person.add()
+    make_order("A", person)
+    make_order("B", person)
+
+    assert client.delete("/customer/private/P1").status_code == 409
+    assert find_person("P1") is not None
+
+    assert client.delete("/customer/private/P1?cascade=true").status_code == 200
+    assert find_person("P1") is None
+    assert not Order("A").find() and not Order("B").find()
+    truck = Vehicle(id="T1")
+    assert truck.find() and truck.remaining_item_capacity == Truck.MAX_ITEM_CAPACITY
+
+
+@pytest.mark.parametrize("fixed_width", [False, True])
+def test_a_cascade_deletes_the_orders_at_once(monkeypatch, fixed_width):
+    monkeypatch.setattr(Order, "FIXED_WIDTH", fixed_width)
+    gothenburg = LocationRegistry.get().find("Gothenburg")
+    Truck(id="T1", current_position=gothenburg).add()
+    person = Person(id="P1", full_name="Ada Lovelace")
+    person.add()
+    make_order("A", person)
+    make_order("B", person)
+    Truck(id="T2", current_position=gothenburg).add()
+    item = ItemCatalog.get().get_item_by_id("0100")
+    order = Order(id="C", customer=person, items=[item], total_weight=item.weight,
+                  vehicle=Vehicle(id="T2"))
+    assert order.vehicle.find() and order.place(skip_existence_check=True)
+
+    releases = []
+    release_capacity = Vehicle.release_capacity
+    monkeypatch.setattr(Order, "delete", lambda self: pytest.fail("one by one"))
+    monkeypatch.setattr(Vehicle, "release_capacity", lambda self, *load: (
+        releases.append(self.id) or release_capacity(self, *load)
+    ))
+
+    assert Order.delete_by_customer("P1") == 3
+
+    assert sorted(releases) == ["T1", "T2"]  # One save per vehicle
+    assert Order.find_many(["A", "B", "C"]) == []
+    assert OrderStatusLog.get().get_status("A") is None
+    for id in ("T1", "T2"):
+        truck = Vehicle(id=id)
+        assert truck.find()
+        assert truck.remaining_item_capacity == Truck.MAX_ITEM_CAPACITY
@@ -0,0 +1,45 @@
+import json
+from domain.person import Person
+from helpers.field_codec import FieldCodec
+
+
+def test_nested_values_are_stored_as_json():
+    address = {'city': "Malmö", 'country': "Sweden"}
+    stored = FieldCodec.encode(address)
+    assert stored == '{"city":"Malmö","country":"Sweden"}'
+    assert FieldCodec.decode(stored) == address
+
+
+def test_old_form_is_decoded_and_stored_as_json_again():
+    old = "{'city': 'Lerum', 'country': 'Sweden'}"
+    address = FieldCodec.decode(old)
+    assert address == {'city': "Lerum", 'country': "Sweden"}
+    assert FieldCodec.encode(address) == '{"city":"Lerum","country":"Sweden"}'
+
+
+def test_plain_strings_are_kept():
+    for plain in ("Storgatan 1, Malmö", "{not json", "[1, 2"):
+        stored = FieldCodec.encode(plain)
+        assert json.loads(stored) == plain
+        assert FieldCodec.decode(stored) == plain
+    # Written before plain strings were encoded
+    assert FieldCodec.decode("Storgatan 1") == "Storgatan 1"
+
+
+def test_every_string_comes_back_as_it_was():
+    for value in ("123", "true", "null", "1.5", '"quoted"', "[1, 2]",
+                  "{'a': 1}", "", " ", "Malmö"):
+        assert FieldCodec.decode(FieldCodec.encode(value)) == value
+
+
+def test_no_value_is_stored_empty():
+    assert FieldCodec.encode(None) == ""
+    assert FieldCodec.decode("") is None
+
+
+def test_a_stored_field_is_written_back_unchanged():
+    person = Person(id="19900101-1234")
+    person.from_dict_to_self({'id': "19900101-1234", 'address': '"123"',
+                              'is_user': "False"})
+    assert person.to_record()['address'] == '"123"'
+    assert person.address == "123"
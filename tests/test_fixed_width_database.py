@@ -0,0 +1,94 @@
+import pytest
+from flask import Flask
+from api.order import order as order_routes
+from database.fixed_width_database import FixedWidthDatabase
+from domain.item import ItemCatalog
+from domain.location import LocationRegistry
+from domain.order import Order
+from domain.truck import Truck
+from domain.vehicle import Vehicle
+
+
+@pytest.fixture
+def fixed_width(monkeypatch):
+    monkeypatch.setattr(Order, "FIXED_WIDTH", True)
+    monkeypatch.setattr(Vehicle, "FIXED_WIDTH", True)
+    monkeypatch.setattr(Order, "field_widths", None)
+
+
+def make_database(record: dict) -> FixedWidthDatabase:
+    return FixedWidthDatabase("database/table.csv", record, "Table",
+                              {'id': 4, 'name': 8})
+
+
+def test_records_are_updated_in_place():
+    make_database({'id': "1", 'name': "first"}).add()
+    make_database({'id': "2", 'name': "second"}).add()
+    with open("database/table.csv", "rb") as table:
+        before = table.read()
+
+    assert make_database({'id': "1", 'name': "renamed"}).update()
+    with open("database/table.csv", "rb") as table:
+        after = table.read()
+
+    # Same length, only the first record changed
+    assert len(after) == len(before)
+    assert after.splitlines()[2] == before.splitlines()[2]
+    assert make_database({'id': "1", 'name': ""}).find_by_id("1")['name'] == "renamed"
+
+
+def test_a_value_too_wide_is_not_added():
+    assert not make_database({'id': "1", 'name': "much too long"}).add()
+    assert make_database({'id': "1", 'name': ""}).find_by_id("1") is None
+
+
+def test_a_csv_file_is_converted_to_the_layout():
+    with open("database/table.csv", "w") as table:
+        table.write("id,name\n1,first\n")
+    database = make_database({'id': "", 'name': ""})
+    assert database.has_layout()
+    assert database.find_by_id("1")['name'] == "first"
+
+
+def test_items_width_fits_the_largest_order_of_the_catalog(fixed_width):
+    catalog_items = ItemCatalog.get().items
+    max_quantity = max(capacities[0] for capacities
+                       in Vehicle.get_max_capacities().values())
+    items = [item for item in catalog_items for _ in range(max_quantity)]
+
+    order = Order(id="A", items=items, total_weight=0)
+    assert order.add(skip_existence_check=True)
+    found = Order(id="A")
+    assert found.find() and len(found.items) == len(items)
+
+
+def test_items_width_grows_with_the_catalog(fixed_width):
+    ItemCatalog.get()
+    width = Order.get_field_widths()['items']
+    with open(ItemCatalog.DB_LOCATION, "a") as catalog_file:
+        for number in range(100):
+            catalog_file.write(f"\n9{number:03},10,1,1,1,1.00,SOLID")
+    ItemCatalog.instance.load()
+
+    assert Order.get_field_widths()['items'] > width
+    assert Order.FIELD_WIDTHS['items'] == 240  # The class layout is kept
+
+
+def test_a_failed_add_returns_an_error_and_reserves_nothing(fixed_width):
+    truck = Truck(id="T1", current_position=LocationRegistry.get().find("Gothenburg"))
+    truck.add()
+
+    app = Flask(__name__)
+    app.register_blueprint(order_routes, url_prefix='/order')
+    response = app.test_client().post("/order/", json={
+        'priority': 1,
+        'delivery_city': "A city name longer than its field",
+        'delivery_country': "Sweden",
+        'items': ["0025"],
+    })
+
+    assert response.status_code == 500
+    assert "error" in response.get_json()
+    found = Vehicle(id="T1")
+    assert found.find()
+    assert found.remaining_item_capacity == Truck.MAX_ITEM_CAPACITY
@@ -0,0 +1,101 @@
+import os
+import pytest
+from database.fleet_state import FleetState
+from domain.capacity import CapacityReconciler
+from domain.location import LocationRegistry
+from domain.truck import Truck
+from domain.vehicle import Vehicle, VehicleStatusType
+from helpers.allocation import Allocation
+
+
+def add_trucks(*ids: str) -> None:
+    gothenburg = LocationRegistry.get().find("Gothenburg")
+    for id in ids:
+        Truck(id=id, current_position=gothenburg).add()
+
+
+def find_vehicle(id: str) -> Vehicle:
+    vehicle = Vehicle(id=id)
+    assert vehicle.find()
+    return vehicle
+
+
+def test_changes_are_journaled_and_replayed_after_a_crash():
+    add_trucks("T1")
+    Vehicle.enable_fleet_state(dirty_threshold=100)
+    add_trucks("T2")
+    find_vehicle("T1").reserve_capacity(10, 100.0, 50.0)
+
+    # A crash: the journal holds the changes, the CSV file does not
+    fleet_state = FleetState.active
+    FleetState.active = None
+    fleet_state.journal.close()
+    assert os.path.getsize(fleet_state.journal_path) > 0
+
+    Vehicle.enable_fleet_state(dirty_threshold=100)
+    truck = find_vehicle("T1")
+    assert truck.remaining_item_capacity == Truck.MAX_ITEM_CAPACITY - 10
+    assert truck.remaining_volume_capacity == Truck.MAX_VOLUME_CAPACITY - 50.0
+    assert find_vehicle("T2").find()
+
+
+def test_a_checkpoint_writes_the_table_and_empties_the_journal():
+    add_trucks("T1")
+    fleet_state = Vehicle.enable_fleet_state(dirty_threshold=2)
+    find_vehicle("T1").reserve_capacity(1, 1.0)
+    find_vehicle("T1").reserve_capacity(1, 1.0)  # Second change, checkpoints
+
+    assert os.path.getsize(fleet_state.journal_path) == 0
+    FleetState.disable()
+    assert find_vehicle("T1").remaining_item_capacity == Truck.MAX_ITEM_CAPACITY - 2
+
+
+def test_a_torn_journal_line_is_skipped():
+    add_trucks("T1")
+    fleet_state = Vehicle.enable_fleet_state()
+    FleetState.disable()
+    with open(fleet_state.journal_path, "a") as journal:
+        journal.write("update,T1,Gothenburg")
+
+    Vehicle.enable_fleet_state()
+    assert find_vehicle("T1").remaining_item_capacity == Truck.MAX_ITEM_CAPACITY
+
+
+def test_the_columns_can_grow_after_a_failed_search(monkeypatch):
+    add_trucks("T1")
+    Vehicle.enable_fleet_state()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("search failed")
+    with monkeypatch.context() as patch, pytest.raises(RuntimeError) as error:
+        patch.setattr(Allocation, "best_fit", fail)
+        Vehicle().get_first_available(1, 1.0)
+    assert error.value is not None  # The traceback is still held
+
+    add_trucks("T2")  # Appends to the column arrays
+    vehicle = Vehicle().get_first_available(1, 1.0)
+    assert vehicle is not None and vehicle.status == VehicleStatusType.FREE
+
+
+def test_importing_the_app_leaves_the_fleet_in_the_csv_file(monkeypatch):
+    monkeypatch.setenv("TRANSPORTER_FLEET_STATE", "1")
+    import main
+    main.create_app()
+    assert FleetState.active is None
+
+    main.enable_fleet_state()
+    assert FleetState.active is not None
+
+
+def test_a_reconcile_reaches_the_free_vehicle_grid():
+    add_trucks("T1")
+    Vehicle.enable_fleet_state()
+    gothenburg = LocationRegistry.get().find("Gothenburg")
+    find_vehicle("T1").reserve_capacity(Truck.MAX_ITEM_CAPACITY, 0.0)
+    assert Vehicle.find_nearest_free(gothenburg, number_of_items=1) == []
+
+    # No open order uses the truck, so it gets its whole capacity back
+    assert CapacityReconciler().reconcile() == 1
+
+    nearest = Vehicle.find_nearest_free(gothenburg, number_of_items=1)
+    assert [id for id, distance in nearest] == ["T1"]
@@ -0,0 +1,65 @@
+import threading
+from helpers.id_generator import IdGenerator
+
+
+def test_ids_are_unique_and_sort_by_creation():
+    ids = [IdGenerator.new_id() for _ in range(5000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    assert all(len(id) == IdGenerator.LENGTH for id in ids)
+
+
+def test_ids_are_unique_across_threads():
+    ids = []
+    def generate():
+        ids.extend(IdGenerator.new_id() for _ in range(1000))
+    threads = [threading.Thread(target=generate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(ids)) == 4000
+
+
+def test_the_timestamp_is_read_back(monkeypatch):
+    monkeypatch.setattr(IdGenerator, "last_timestamp", -1)
+    monkeypatch.setattr("time.time_ns", lambda: 1_760_000_000_123 * 1_000_000)
+    id = IdGenerator.new_id()
+    assert IdGenerator.get_timestamp(id) == 1_760_000_000_123
+    assert IdGenerator.get_first_id(1_760_000_000_123) <= id
+    assert IdGenerator.get_first_id(1_760_000_000_124) > id
+
+
+def test_ids_never_go_back_with_the_clock(monkeypatch):
+    first = IdGenerator.new_id()
+    monkeypatch.setattr("time.time_ns", lambda: 0)  # The clock jumps back
+    assert IdGenerator.new_id() > first
+
+
+def test_workers_build_different_ids(monkeypatch):
+    monkeypatch.setattr(IdGenerator, "worker", None)
+    monkeypatch.setenv("TRANSPORTER_WORKER_ID", "1")
+    monkeypatch.setattr(IdGenerator, "process_id", None)
+    first = IdGenerator.new_id()
+    monkeypatch.setenv("TRANSPORTER_WORKER_ID", "2")
+    monkeypatch.setattr(IdGenerator, "process_id", None)
+    second = IdGenerator.new_id()
+
+    worker = slice(IdGenerator.TIME_LENGTH,
+                   IdGenerator.TIME_LENGTH + IdGenerator.WORKER_LENGTH)
+    assert first[worker] == IdGenerator.encode(1, IdGenerator.WORKER_LENGTH)
+    assert second[worker] == IdGenerator.encode(2, IdGenerator.WORKER_LENGTH)
+
+
+def test_a_used_up_sequence_borrows_the_next_millisecond(monkeypatch):
+    monkeypatch.setattr(IdGenerator, "last_timestamp", -1)
+    monkeypatch.setattr("time.time_ns", lambda: 1_760_000_000_123 * 1_000_000)
+    first = IdGenerator.new_id()
+    monkeypatch.setattr(IdGenerator, "sequence",
+                        32 ** IdGenerator.SEQUENCE_LENGTH - 1)
+
+    # The clock is stopped, so waiting for it would never return
+    borrowed = IdGenerator.new_id()
+    assert IdGenerator.get_timestamp(borrowed) == 1_760_000_000_124
+    assert borrowed[-IdGenerator.SEQUENCE_LENGTH:] == "000"
+    assert IdGenerator.new_id() > borrowed > first
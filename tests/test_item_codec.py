@@ -0,0 +1,56 @@
+import pytest
+from flask import Flask
+from api.order import order as order_routes
+from helpers.item_codec import ItemCodec
+
+
+def test_items_are_encoded_once_per_id_with_their_quantity():
+    encoded = ItemCodec.encode(["0025", "0500", "0500"])
+    assert encoded == "0025:1;0500:2"
+    assert ItemCodec.decode(encoded) == [("0025", 1), ("0500", 2)]
+
+
+def test_old_list_form_and_json_values_are_decoded():
+    assert ItemCodec.decode("['0025', '0500', '0500']") == [("0025", 1), ("0500", 2)]
+    assert ItemCodec.decode(["0025", "0025"]) == [("0025", 2)]
+    assert ItemCodec.decode({"0100": "3"}) == [("0100", 3)]
+    assert ItemCodec.decode("") == []
+
+
+def test_max_length_bounds_every_encoding():
+    item_ids = ["0025", "0100", "0500"]
+    max_length = ItemCodec.get_max_length(item_ids, 1000)
+    assert max_length == len(ItemCodec.encode(["0025"] * 1000 + ["0100"] * 1000
+                                              + ["0500"] * 1000))
+    assert len(ItemCodec.encode(["0025"] * 999 + ["0500"] * 7)) <= max_length
+    assert ItemCodec.get_max_length([], 1000) == 0
+
+
+def test_quantities_must_be_positive_whole_numbers():
+    assert ItemCodec.decode({"0025": "3"}) == [("0025", 3)]
+    for items in ({"7500": -10}, {"7500": 0}, {"7500": 1.5}, {"7500": True},
+                  {"7500": "two"}, "0025:0", "0025:-1", [25]):
+        with pytest.raises(ValueError):
+            ItemCodec.decode(items)
+
+
+def test_items_of_another_type_are_refused():
+    assert ItemCodec.decode(None) == []
+    for items in (5, 1.5, True):
+        with pytest.raises(ValueError):
+            ItemCodec.decode(items)
+
+
+def test_invalid_items_are_a_bad_request():
+    app = Flask(__name__)
+    app.register_blueprint(order_routes, url_prefix='/order')
+    client = app.test_client()
+
+    response = client.post("/order/", json={'delivery_city': "Gothenburg",
+                                            'delivery_country': "Sweden",
+                                            'items': {"7500": -10}})
+    assert response.status_code == 400
+    assert client.post("/order/quote", json={'items': 5}).status_code == 400
+    assert client.post("/order/quote", json={'orders': 5}).status_code == 400
+    assert client.post("/order/quote", json={'items': {"0025": 2}}).get_json() == \
+        {'total_weight': 0.5, 'total_price': 5.0}
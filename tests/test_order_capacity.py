@@ -0,0 +1,119 @@
+import threading
+import pytest
+from domain.item import ItemCatalog
+from domain.location import LocationRegistry
+from domain.order import Order, OrderStatus, OrderStatusLog
+from domain.truck import Truck
+from domain.vehicle import Vehicle
+
+
+def make_order(id: str = "A") -> Order:
+    truck = Truck(id="T1", current_position=LocationRegistry.get().find("Gothenburg"))
+    if not Vehicle(id="T1").find():
+        truck.add()
+    item = ItemCatalog.get().get_item_by_id("0500")
+    return Order(id=id, items=[item, item], total_weight=2 * item.weight,
+                 vehicle=truck)
+
+
+def find_truck() -> Vehicle:
+    truck = Vehicle(id="T1")
+    assert truck.find()
+    return truck
+
+
+def find_order(id: str = "A") -> Order:
+    order = Order(id)
+    return order if order.find() else None
+
+
+def fail_vehicle_updates(monkeypatch) -> None:
+    monkeypatch.setattr(Vehicle, "adjust_capacities",
+                        lambda self, deltas, maximums=None: False)
+
+
+def test_placing_an_order_reserves_its_capacity():
+    assert make_order().place(skip_existence_check=True)
+    assert find_truck().remaining_item_capacity == Truck.MAX_ITEM_CAPACITY - 2
+    assert find_truck().remaining_volume_capacity == Truck.MAX_VOLUME_CAPACITY - 72
+
+
+def test_an_order_is_removed_when_its_vehicle_is_not_saved(monkeypatch):
+    order = make_order()
+    fail_vehicle_updates(monkeypatch)
+
+    assert not order.place(skip_existence_check=True)
+    assert find_order() is None
+    assert OrderStatusLog.get().get_status("A") is None
+    assert order.vehicle.remaining_item_capacity == Truck.MAX_ITEM_CAPACITY
+
+
+def test_status_changes_move_the_capacity():
+    order = make_order()
+    order.place(skip_existence_check=True)
+
+    assert order.change_status(OrderStatus.DELIVERED)
+    assert find_truck().remaining_item_capacity == Truck.MAX_ITEM_CAPACITY
+    assert order.change_status(OrderStatus.PROCESSING)
+    assert find_truck().remaining_item_capacity == Truck.MAX_ITEM_CAPACITY - 2
+
+
+def test_a_status_change_is_undone_when_the_vehicle_is_not_saved(monkeypatch):
+    order = make_order()
+    order.place(skip_existence_check=True)
+    with monkeypatch.context() as patch:
+        fail_vehicle_updates(patch)
+        assert not order.change_status(OrderStatus.CANCELLED)
+
+    assert order.order_status == OrderStatus.PROCESSING
+    assert OrderStatusLog.get().get_status("A") == OrderStatus.PROCESSING
+    assert find_truck().remaining_item_capacity == Truck.MAX_ITEM_CAPACITY - 2
+
+
+def test_a_delete_is_undone_when_the_vehicle_is_not_saved(monkeypatch):
+    order = make_order()
+    order.place(skip_existence_check=True)
+    order = find_order()
+    with monkeypatch.context() as patch:
+        fail_vehicle_updates(patch)
+        assert not order.delete()
+
+    assert find_order() is not None
+    assert OrderStatusLog.get().get_status("A") == OrderStatus.PROCESSING
+    assert find_truck().remaining_item_capacity == Truck.MAX_ITEM_CAPACITY - 2
+
+    assert order.delete()
+    assert find_order() is None
+    assert find_truck().remaining_item_capacity == Truck.MAX_ITEM_CAPACITY
+
+
+@pytest.mark.parametrize("storage", ["csv", "fixed_width", "fleet_state"])
+def test_reservations_made_at_the_same_time_are_all_kept(monkeypatch, storage):
+    monkeypatch.setattr(Vehicle, "FIXED_WIDTH", storage == "fixed_width")
+    make_order()
+    if storage == "fleet_state":
+        Vehicle.enable_fleet_state()
+    # Every thread holds its own copy of the truck, read before any change
+    trucks = [find_truck() for _ in range(8)]
+
+    threads = [threading.Thread(target=truck.reserve_capacity, args=(1, 1.5, 2))
+               for truck in trucks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    truck = find_truck()
+    assert truck.remaining_item_capacity == Truck.MAX_ITEM_CAPACITY - 8
+    assert truck.remaining_kg_capacity == Truck.MAX_KG_CAPACITY - 12
+    assert truck.remaining_volume_capacity == Truck.MAX_VOLUME_CAPACITY - 16
+
+
+def test_a_release_starts_from_the_stored_capacities():
+    make_order()
+    stale = find_truck()
+    find_truck().reserve_capacity(3, 30.0, 300)
+
+    assert stale.release_capacity(1, 10.0, 100)
+    assert stale.remaining_item_capacity == Truck.MAX_ITEM_CAPACITY - 2
+    assert find_truck().remaining_kg_capacity == Truck.MAX_KG_CAPACITY - 20
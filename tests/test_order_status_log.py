@@ -0,0 +1,83 @@
+import os
+from domain.order import Order, OrderStatus, OrderStatusLog
+
+
+def make_order(id: str) -> Order:
+    order = Order(id=id)
+    order.items = []
+    order.total_weight = 0
+    order.add(skip_existence_check=True)
+    return order
+
+
+def log_rows() -> int:
+    with open(OrderStatusLog.DB_LOCATION) as log_file:
+        return len(log_file.readlines()) - 1  # Without the header
+
+
+def test_compaction_truncates_the_log_and_keeps_the_state(monkeypatch):
+    monkeypatch.setattr(OrderStatusLog, "COMPACT_THRESHOLD", 4)
+    first, second = make_order("A"), make_order("B")
+    first.change_status(OrderStatus.DELIVERED)
+    second.change_status(OrderStatus.CANCELLED)  # Fourth change, compacts
+
+    assert log_rows() == 0
+    assert OrderStatusLog.get().pending_changes == 0
+    # The order table holds the statuses now
+    for id, order_status in (("A", OrderStatus.DELIVERED), ("B", OrderStatus.CANCELLED)):
+        found = Order(id)
+        assert found.find() and found.order_status == order_status
+
+    # A restart reads the snapshot and the empty log, without compacting
+    OrderStatusLog.instances.clear()
+    status_log = OrderStatusLog.get()
+    assert status_log.pending_changes == 0
+    assert status_log.current == {}
+
+
+def test_only_changes_since_the_compaction_are_pending(monkeypatch):
+    monkeypatch.setattr(OrderStatusLog, "COMPACT_THRESHOLD", 3)
+    order = make_order("A")
+    order.change_status(OrderStatus.DELIVERED)
+    order.change_status(OrderStatus.PROCESSING)  # Compacts
+    order.change_status(OrderStatus.CANCELLED)
+
+    OrderStatusLog.instances.clear()
+    status_log = OrderStatusLog.get()
+    assert status_log.pending_changes == 1
+    assert status_log.get_status("A") == OrderStatus.CANCELLED
+
+
+def test_time_stops_for_closed_and_deleted_orders():
+    status_log = OrderStatusLog.get()
+    status_log.add_record({'order_id': "A", 'order_status': 1, 'changed_at': 0})
+    status_log.add_record({'order_id': "B", 'order_status': 1, 'changed_at': 0})
+    status_log.add_record({'order_id': "A", 'order_status': 2, 'changed_at': 100})
+    status_log.add_record({'order_id': "B", 'order_status': "", 'changed_at': 300})
+
+    assert status_log.get_time_in_status(now=10_000) == {OrderStatus.PROCESSING: 400}
+    assert "B" not in status_log.current
+    assert status_log.open_count[OrderStatus.PROCESSING] == 0
+
+
+def test_deleting_an_order_ends_its_history():
+    order = make_order("A")
+    assert order.delete()
+
+    OrderStatusLog.instances.clear()
+    status_log = OrderStatusLog.get()
+    assert status_log.get_status("A") is None
+    assert status_log.open_count[OrderStatus.PROCESSING] == 0
+
+
+def test_snapshot_covers_the_log_when_it_was_not_started_over(monkeypatch):
+    make_order("A")
+    status_log = OrderStatusLog.get()
+    status_log.refresh()
+    status_log.save_snapshot()  # As if the compaction stopped here
+
+    OrderStatusLog.instances.clear()
+    status_log = OrderStatusLog.get()
+    assert status_log.pending_changes == 0
+    assert status_log.open_count[OrderStatus.PROCESSING] == 1
+    assert os.path.exists(status_log.snapshot_path)
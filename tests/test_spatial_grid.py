@@ -0,0 +1,75 @@
+import random
+import pytest
+from database.spatial_grid import SpatialGrid
+from helpers.allocation import Allocation
+from helpers.geo import Geo
+
+
+def test_nearest_matches_a_full_scan():
+    generator = random.Random(7)
+    grid = SpatialGrid()
+    points = {}
+    for number in range(2000):
+        # Half the points gather at a few positions, like vehicles in cities
+        if number % 2 == 0:
+            position = generator.choice([(57.7, 11.97), (59.33, 18.07), (55.6, 13.0)])
+        else:
+            position = (generator.uniform(55, 60), generator.uniform(11, 19))
+        capacities = (generator.randint(0, 100), generator.uniform(0, 3000),
+                      generator.uniform(0, 15000))
+        grid.add(f"V{number}", *position, capacities)
+        points[f"V{number}"] = (position, capacities)
+
+    for _ in range(50):
+        latitude, longitude = generator.uniform(55, 60), generator.uniform(11, 19)
+        load = (10, 500.0, 1000.0)
+        expected = sorted(
+            float(Geo.haversine(latitude, longitude, *position))
+            for position, capacities in points.values()
+            if all(capacity >= value for capacity, value in zip(capacities, load))
+        )[:5]
+        found = grid.nearest(latitude, longitude, 5, *load)
+        assert [distance for _, distance in found] == pytest.approx(expected)
+
+
+def test_points_of_a_site_are_ranked_by_least_kg_capacity():
+    for size in (4, SpatialGrid.SMALL_SITE_SIZE * 4):  # Python and NumPy paths
+        grid = SpatialGrid()
+        for number in range(size):
+            grid.add(f"V{number}", 57.7, 11.97, (10, 1000.0 + (number * 37) % size, 10.0))
+
+        found = grid.nearest(57.7, 11.97, 3, 1, 1000.0, 1.0)
+        assert [id for id, _ in found] == ["V0"] + [
+            f"V{number}" for number in sorted(range(1, size),
+                                              key=lambda n: (n * 37) % size)[:2]
+        ]
+
+
+def test_moved_and_removed_points_are_not_found():
+    grid = SpatialGrid()
+    grid.add("A", 57.7, 11.97, (1, 1.0, 1.0))
+    grid.add("B", 57.7, 11.97, (1, 1.0, 1.0))
+    grid.add("A", 59.33, 18.07, (1, 1.0, 1.0))  # Moved
+    assert grid.remove("B")
+    assert not grid.remove("B")
+
+    assert [id for id, _ in grid.nearest(57.7, 11.97, 5)] == ["A"]
+    assert len(grid) == 1
+    assert grid.nearest(57.7, 11.97, 0) == []
+
+
+def test_a_site_can_change_after_a_failed_search(monkeypatch):
+    grid = SpatialGrid()
+    for number in range(SpatialGrid.SMALL_SITE_SIZE + 1):
+        grid.add(f"V{number}", 57.7, 11.97, (1, 1.0, 1.0))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("search failed")
+    with monkeypatch.context() as patch, pytest.raises(RuntimeError) as error:
+        patch.setattr(Allocation, "fits", fail)
+        grid.nearest(57.7, 11.97, 1, 1, 1.0, 1.0)
+    assert error.value is not None  # The traceback is still held
+
+    grid.add("W", 57.7, 11.97, (1, 1.0, 1.0))  # Grows the capacities array
+    grid.remove("V0")
+    assert len(grid.nearest(57.7, 11.97, 100, 1, 1.0, 1.0)) == SpatialGrid.SMALL_SITE_SIZE + 1
@@ -0,0 +1,39 @@
+import pytest
+from helpers.validate import Validate
+
+
+def test_a_column_is_checked_at_once():
+    mask, errors = Validate.column(["ABC123", "abc123", "XYZ99A", None],
+                                   "vehicle_number")
+    assert mask == [True, False, True, False]
+    assert [position for position, _ in errors] == [1, 3]
+    assert errors[0][1] == "[i] Invalid vehicle_number: 'abc123'"
+
+
+def test_optional_columns_accept_empty_values():
+    mask, errors = Validate.column(["", None, "0701234567", "123"], "mobile",
+                                   allow_empty=True)
+    assert mask == [True, True, True, False]
+    assert len(errors) == 1
+
+
+def test_the_single_value_checks_match_the_column_checks():
+    values = ["850101-1234", "8501011234", "851301-1234", "850230-1234"]
+    mask, _ = Validate.column(values, "personal_number")
+    assert mask == [Validate.personal_number(value) for value in values]
+    assert mask == [True, True, False, False]
+    assert Validate.get_mask(["Ada Lovelace", "Ada  Lovelace", "R2 D2"],
+                             "person_full_name") == [True, False, False]
+
+
+def test_an_unknown_kind_is_refused():
+    with pytest.raises(ValueError):
+        Validate.column(["x"], "postcode")
+
+
+def test_large_columns_are_spread_over_processes(monkeypatch):
+    monkeypatch.setattr(Validate, "POOL_MIN_SIZE", 10)
+    values = ["a@b.se", "not an email"] * 50
+    mask, errors = Validate.column(values, "email", processes=2)
+    assert mask == [True, False] * 50
+    assert [position for position, _ in errors] == list(range(1, 100, 2))
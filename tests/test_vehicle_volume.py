@@ -0,0 +1,48 @@
+from domain.bike import Bike
+from domain.item import ItemCatalog
+from domain.location import LocationRegistry
+from domain.order import Order
+from domain.ship import Ship
+from domain.truck import Truck
+from domain.vehicle import Vehicle
+from domain.vehicle_migration import VehicleVolumeMigration
+
+
+def test_volume_limits_each_vehicle_type_before_weight():
+    catalog = ItemCatalog.get()
+    for vehicle_class, item_id in ((Bike, "0500"), (Truck, "7500"), (Ship, "7500")):
+        item = catalog.get_item_by_id(item_id)
+        by_weight = vehicle_class.MAX_KG_CAPACITY // item.weight
+        by_volume = vehicle_class.MAX_VOLUME_CAPACITY // item.volume.get_volume()
+        assert by_volume < min(by_weight, vehicle_class.MAX_ITEM_CAPACITY)
+
+
+def test_a_bike_is_not_given_more_than_its_box():
+    Bike(id="B1", current_position=LocationRegistry.get().find("Gothenburg")).add()
+    item = ItemCatalog.get().get_item_by_id("0500")
+    order = Order(items=[item, item])
+
+    # Within the item and weight capacity of the bike, not its volume
+    assert Vehicle().get_first_available(2, 10, order.get_total_volume()) is None
+    assert Vehicle().get_first_available(1, 5, item.volume.get_volume()) is not None
+
+
+def test_migration_adds_the_volume_capacity():
+    with open(Vehicle.DB_LOCATION, "w") as vehicle_file:
+        vehicle_file.write("id,current_position_city,current_position_country,"
+                           "status,remaining_item_capacity,remaining_kg_capacity,type\n"
+                           "T1,Gothenburg,Sweden,1,99,2925.0,2\n"
+                           "B1,Lerum,Sweden,1,2,10.0,1\n")
+    item = ItemCatalog.get().get_item_by_id("7500")
+    order = Order(id="A", items=[item], total_weight=item.weight)
+    order.vehicle = Vehicle(id="T1")
+    assert order.add(skip_existence_check=True)
+
+    assert VehicleVolumeMigration().migrate() == 2
+    truck, bike = Vehicle(id="T1"), Vehicle(id="B1")
+    assert truck.find() and bike.find()
+    assert truck.remaining_volume_capacity == Truck.MAX_VOLUME_CAPACITY - 480
+    assert truck.remaining_kg_capacity == 2925.0
+    assert bike.remaining_volume_capacity == Bike.MAX_VOLUME_CAPACITY
+
+    assert VehicleVolumeMigration().migrate() == 0
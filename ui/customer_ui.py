@@ -1,6 +1,7 @@
 from domain.person import Person
 from domain.company import Company
-from domain.customer import Customer
+from domain.customer import CustomerType
+from domain.customer_directory import CustomerDirectory
 from helpers.ui import UI
 from helpers.validate import Validate
 from ui.person_ui import PersonUI
@@ -43,62 +44,50 @@ class CustomerUI:
         """
         Deletes an existing customer (either a company or a private individual).
         """
-        while True:
-            menu_choice = input("[i] Customer type: C for company and P for private: ")
-            if Validate.user_entry(menu_choice, "cp"):  # Validate customer type
-                break
+        customer_id = input("[i] Customer id: ")
 
-        match menu_choice.lower():
-            case "c":  # Delete a company
-                customer_id = input("[i] Company id: ")
-                company = Company(customer_id)
-                company.delete()  # Delete the company record
-            case "p":  # Delete a person
-                customer_id = input("[i] Person id: ")
-                person = Person(customer_id)
-                person.delete()  # Delete the person record
+        # Find the type of the customer from its ID
+        match CustomerDirectory.get_type(customer_id):
+            case CustomerType.COMPANY:  # Delete a company
+                customer = Company(customer_id)
+            case CustomerType.PRIVATE:  # Delete a person
+                customer = Person(customer_id)
+            case _:
+                print("[i] Customer not found")
+                return
+
+        try:
+            customer.delete()  # Delete the customer record
+        except ValueError as error:
+            print(error)  # Orders still refer to the customer
 
     def update_customer(self) -> None:
         """
         Updates details of an existing customer (either a company or a person).
         """
         while True:
-            user_input = input("[i] Customer type: C for company and P for private: ")
-            if Validate.user_entry(user_input, "cp"):  # Validate customer type
+            user_input = input("[i] Customer id: ")
+            if user_input.lower() == "c":  # Allow cancellation
                 break
 
-        match user_input.lower():
-            case "c":  # Update a company
-                while True:
-                    user_input = input("[i] Company id: ")
-                    if user_input.lower() == "c":  # Allow cancellation
-                        break
-                    company_exists = Company(user_input).find()
-                    if company_exists:  # Check if the company exists
-                        UI.decorate_header("Update Company", with_footer_fill=True)
-                        company = CompanyUI().collect_data(is_updating=True)
-                        company.id = user_input  # Retain original ID
-                        company.update()  # Save updated details
-                        UI.decorate_header("Company updated", with_footer_fill=True)
-                        break
-                    else:
-                        print("[i] Company not found, please try again or (C)ancel")
-            case "p":  # Update a person
-                while True:
-                    user_input = input("[i] Person id: ")
-                    if user_input.lower() == "c":  # Allow cancellation
-                        break
-                    existing_person = Person(user_input)
-                    person_exists = existing_person.find()
-                    if person_exists:  # Check if the person exists
-                        UI.decorate_header("Update Person", with_footer_fill=True)
-                        person = PersonUI().collect_data(is_user=existing_person.is_user, is_updating=True)
-                        person.id = user_input  # Retain original ID
-                        person.update()  # Save updated details
-                        UI.decorate_header("Person updated", with_footer_fill=True)
-                        break
-                    else:
-                        print("[i] Person not found, please try again or (C)ancel")
+            # Find the customer, a company or a person, from its ID
+            customer = CustomerDirectory.find(user_input)
+            if isinstance(customer, Company):  # Update a company
+                UI.decorate_header("Update Company", with_footer_fill=True)
+                company = CompanyUI().collect_data(is_updating=True)
+                company.id = user_input  # Retain original ID
+                company.update()  # Save updated details
+                UI.decorate_header("Company updated", with_footer_fill=True)
+                break
+            elif isinstance(customer, Person):  # Update a person
+                UI.decorate_header("Update Person", with_footer_fill=True)
+                person = PersonUI().collect_data(is_user=customer.is_user, is_updating=True)
+                person.id = user_input  # Retain original ID
+                person.update()  # Save updated details
+                UI.decorate_header("Person updated", with_footer_fill=True)
+                break
+            else:
+                print("[i] Customer not found, please try again or (C)ancel")
 
     def get_customer_menu(self, user_name: str) -> None:
         """
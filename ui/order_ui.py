@@ -1,11 +1,12 @@
-import uuid
 from datetime import datetime
+from helpers.id_generator import IdGenerator
 from helpers.ui import UI
 from helpers.validate import Validate
-from domain.item import ItemList
-from domain.location import Location, LocationList
+from domain.customer_directory import CustomerDirectory
+from domain.item import ItemCatalog
+from domain.location import Location, LocationRegistry
 from domain.order import Order, Priority, OrderStatus
-from domain.person import Person
+from domain.pricing import PricingEngine
 from domain.vehicle import Vehicle
 
 class OrderUI:
@@ -16,12 +17,11 @@ class OrderUI:
 
     def set_id(self) -> str:
         """
-        Generate a unique 4-character identifier for an order.
+        Generate a unique, time-ordered identifier for an order.
         Returns:
-            str: A unique 4-character ID.
+            str: A unique ID.
         """
-        full_id = uuid.uuid4()
-        return str(full_id)[:4]
+        return IdGenerator.new_id()
     
 
     def get_order_menu(self, user_name) -> None:
@@ -94,16 +94,15 @@ class OrderUI:
         Prompt the user to provide a customer ID and validate its existence.
 
         Returns:
-            Person: The customer object.
+            Customer: The customer object, a person or a company.
         """
         while True:
             user_input = input("[i] Id of Customer: ")
-            person = Person(user_input)
-            person_exists = person.find()
-            if person_exists:
-                return person
+            customer = CustomerDirectory.find(user_input)
+            if customer is not None:
+                return customer
             else:
-                print("[i] User not found, please try again")
+                print("[i] Customer not found, please try again")
 
     def set_delivery_location(self) -> Location:
         """
@@ -114,7 +113,7 @@ class OrderUI:
         """
         while True:
             user_input = input("[i] Delivery location (City name): ")
-            delivery_location = LocationList().get_city_by_name(user_input)
+            delivery_location = LocationRegistry.get().find(user_input)
             if delivery_location is not None:
                 return delivery_location
             else:
@@ -135,7 +134,7 @@ class OrderUI:
                 break
 
             # Validate and add the item.
-            item = ItemList().get_item_by_id(user_input)
+            item = ItemCatalog.get().get_item_by_id(user_input)
             if item is not None:
                 items.append(item)
                 print(f"[i] Item {item.id} added")
@@ -167,19 +166,20 @@ class OrderUI:
             else:
                 print("[i] Wrong input, please try again")
 
-    def set_vehicle(self, number_of_items, weight) -> str:
+    def set_vehicle(self, number_of_items, weight, volume) -> str:
         """
         Find and return the first available vehicle that can handle the given 
-        order's items and weight.
+        order's items, weight and volume.
 
         Args:
             number_of_items (int): The number of items in the order.
             weight (float): The total weight of the items.
+            volume (float): The total volume of the items.
 
         Returns:
             str: The ID of the allocated vehicle.
         """
-        return Vehicle().get_first_available(number_of_items, weight)
+        return Vehicle().get_first_available(number_of_items, weight, volume)
 
     def is_valid_delivery_date(self, delivery_date):
         """
@@ -225,23 +225,28 @@ class OrderUI:
             if self.is_valid_delivery_date(user_input):
                 return user_input
 
-    def collect_data(self, order: Order) -> None:
+    def collect_data(self, order: Order) -> bool:
         """
         Collect and set all required data for creating a new order.
 
         Args:
             order (Order): The order object to populate.
+
+        Returns:
+            bool: True if the order was added to the database and its
+            capacity taken from its vehicle.
         """
         order.id = self.set_id()
         order.priority = self.set_priority()
         order.customer = self.set_customer()
         order.delivery_location = self.set_delivery_location()
         order.items = self.set_items()
-        order.total_weight = round(sum([item.weight for item in order.items]), 2)
-        order.vehicle = self.set_vehicle(len(order.items), order.total_weight)
+        order.total_weight, _ = PricingEngine.get().quote_items(order.items)
+        order.vehicle = self.set_vehicle(len(order.items), order.total_weight,
+                                         order.get_total_volume())
         order.delivery_date = self.set_delivery_date()
         order.order_date = datetime.today().strftime("%Y%m%d")
-        order.add()
+        return order.place(skip_existence_check=True)  # The generated ID is new
 
     def add_new_order(self, user_name) -> None:
         """
@@ -252,13 +257,9 @@ class OrderUI:
         """
         UI.decorate_header("New Order", user_name=user_name, with_footer_fill=True)
         order = Order()
-        self.collect_data(order)
-
-        if order.vehicle is not None:
-            # Update vehicle capacities after assignment.
-            order.vehicle.remaining_item_capacity -= len(order.items)
-            order.vehicle.remaining_kg_capacity -= order.total_weight
-            order.vehicle.update()
+        if not self.collect_data(order):
+            print(f"[i] Failed to add order with id:{order.id}")
+            return
 
         print(f"[i] Order with id:{order.id} added successfully")
 
@@ -288,6 +289,6 @@ class OrderUI:
         """
         UI.decorate_header("Retrieve Order Status", user_name=user_name, with_footer_fill=True)
         order = self.get_order()
-        order.order_status = self.set_order_status()
-        order.update()
         # Restore vehicle capacities if the order is completed or cancelled
+        if not order.change_status(self.set_order_status()):
+            print(f"[i] Failed to update order with id:{order.id}")
@@ -125,12 +125,10 @@ class PersonUI:
             user_id = input("[i] Your personal number YYMMDD-NNNN: ")
             user_password = input("[i] Your password: ")
 
-            person = Person(user_id)
-            person_exists = person.find()
+            # Look the user up in the person index
+            person = Person.authenticate(user_id, user_password)
 
-            if person_exists \
-                and user_password == person.password \
-                and person.is_user:
-                    return person
+            if person is not None:
+                return person
             else:
                 print("[i] Wrong user name or password, please try again")
\ No newline at end of file
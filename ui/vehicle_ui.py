@@ -1,6 +1,6 @@
 from helpers.ui import UI
 from helpers.validate import Validate
-from domain.location import Location, LocationList
+from domain.location import Location, LocationRegistry
 from domain.vehicle import Vehicle
 from domain.bike import Bike
 from domain.truck import Truck
@@ -23,9 +23,9 @@ class VehicleUI:
             bool: True if the vehicle number is valid and not in use, False otherwise.
         """
         valid_vehicle_number = Validate.vehicle_number(user_input)
-        response = vehicle.database.find_by_id(user_input)
+        vehicle_exists = Vehicle(user_input).find()
 
-        return valid_vehicle_number and response == None
+        return valid_vehicle_number and not vehicle_exists
 
     def set_id(self, vehicle: Vehicle) -> str:
         """
@@ -55,7 +55,7 @@ class VehicleUI:
         while True:
             user_input = input("[i] Current position (City name): ")
             
-            current_position = LocationList().get_city_by_name(user_input)
+            current_position = LocationRegistry.get().find(user_input)
             if current_position != None:
                 return current_position
             else: